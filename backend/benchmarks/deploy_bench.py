@@ -0,0 +1,203 @@
+"""
+Deploy benchmark'ı: 1, 10 ve 100 dosyalık siteler için deploy gecikmesi ve throughput
+
+deploy.py gerçek Netlify yerine yerel sahte Netlify API'sine (benchmarks/fake_netlify.py)
+karşı çalıştırılır; gecikme, hata oranı ve istek sınırı ayarlanabilir. Her site boyutu için:
+
+- fresh: tüm dosyaları yeni olan deploy (yükleme ve yayına girme süresi)
+- update: tek dosyası değişen deploy
+- burst: --concurrency kadar sitenin eş zamanlı deploy'u (deploy/sn ve dosya/sn)
+
+Sonuçlar JSON olarak yazılır. --api-url ile ayrı çalışan bir sunucu da kullanılabilir.
+
+Kullanım (backend klasöründen):
+    python benchmarks/deploy_bench.py [--files 1,10,100] [--runs 3] [--latency-ms 20] [--error-rate 0.01]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from fake_netlify import FakeNetlifyState, start_server  # noqa: E402
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+
+def summarize(values):
+    """Ölçüm listesinin özetini döndürür (ortalama, medyan, min, max)"""
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "mean": statistics.mean(values),
+        "median": statistics.median(values),
+        "min": min(values),
+        "max": max(values),
+    }
+
+
+def make_files(count, size, version):
+    """Verilen sürüm numarasıyla içerikleri farklılaşan HTML dosyaları üretir"""
+    files = {}
+    for i in range(count):
+        name = "index.html" if i == 0 else f"pages/page-{i}.html"
+        header = f"<!-- sürüm {version}, dosya {i} -->\n".encode()
+        files[name] = header + (b"<p>" + b"x" * 60 + b"</p>\n") * (size // 68)
+    return files
+
+
+async def timed_deploy(deploy, site_id, files, ready_timeout):
+    """
+    Tek bir deploy'u çalıştırır; yükleme ve yayına girme sürelerini ölçer
+
+    Returns:
+        dict: upload_seconds, ready_seconds (yayına girmediyse None), state
+    """
+    started = time.perf_counter()
+    url = await deploy.deploy_files(site_id, files)
+    upload = time.perf_counter() - started
+    record = await deploy.deploy_tracker.wait(deploy.deploy_tracker.latest_id(site_id), ready_timeout)
+    state = record["state"] if record else None
+    ready = record["timings"]["ready"] if record and state == "ready" else None
+    return {"ok": url is not None, "upload_seconds": upload, "ready_seconds": ready, "state": state}
+
+
+async def bench_size(deploy, count, args):
+    """
+    Bir site boyutu için fresh, update ve burst ölçümlerini yapar
+
+    Returns:
+        dict: Ölçüm özetleri
+    """
+    size = args.file_kb * 1024
+    site_id = await deploy.find_or_create_site(f"bench-{count}-{uuid.uuid4().hex[:6]}")
+    fresh, update = [], []
+    for run in range(args.runs):
+        files = make_files(count, size, f"{run}-fresh")
+        fresh.append(await timed_deploy(deploy, site_id, files, args.ready_timeout))
+        files[next(iter(files))] += f"<!-- güncelleme {run} -->".encode()
+        update.append(await timed_deploy(deploy, site_id, files, args.ready_timeout))
+
+    # Eş zamanlı deploy'lar: farklı siteler aynı anda yüklenir
+    site_ids = [await deploy.find_or_create_site(f"burst-{count}-{i}-{uuid.uuid4().hex[:6]}")
+                for i in range(args.concurrency)]
+    started = time.perf_counter()
+    burst = await asyncio.gather(*(timed_deploy(deploy, sid, make_files(count, size, f"burst-{i}"), args.ready_timeout)
+                                   for i, sid in enumerate(site_ids)))
+    wall = time.perf_counter() - started
+
+    def stats(results):
+        return {
+            "ok": sum(r["ok"] for r in results),
+            "ready": sum(r["state"] == "ready" for r in results),
+            "upload_seconds": summarize([r["upload_seconds"] for r in results]),
+            "ready_seconds": summarize([r["ready_seconds"] for r in results]),
+            "files_per_sec": summarize([count / r["upload_seconds"] for r in results]),
+        }
+
+    return {
+        "files": count,
+        "bytes_per_deploy": count * size,
+        "fresh": stats(fresh),
+        "update": stats(update),
+        "burst": {
+            **stats(burst),
+            "concurrency": args.concurrency,
+            "wall_seconds": wall,
+            "deploys_per_sec": len(burst) / wall,
+            "files_per_sec_total": len(burst) * count / wall,
+        },
+    }
+
+
+async def run(args):
+    # deploy modülü NETLIFY_API_URL'yi import sırasında okur
+    import deploy
+    results = [await bench_size(deploy, int(count), args) for count in args.files.split(",")]
+    client_stats = deploy.client.stats()
+    await deploy.client.aclose()
+    return results, client_stats
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", default="1,10,100", help="Denenecek site boyutları (dosya sayısı)")
+    parser.add_argument("--file-kb", type=int, default=8, help="Dosya başına boyut (KB)")
+    parser.add_argument("--runs", type=int, default=3, help="Boyut başına fresh/update tekrar sayısı")
+    parser.add_argument("--concurrency", type=int, default=4, help="Eş zamanlı deploy edilecek site sayısı")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Sahte API'nin istek başına gecikmesi (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Sahte API'nin rastgele 503 oranı (0-1)")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Sahte API'nin dakikalık istek sınırı (0 = sınırsız)")
+    parser.add_argument("--processing-ms", type=float, default=200.0, help="Deploy'un ready olma süresi (ms)")
+    parser.add_argument("--ready-timeout", type=float, default=30.0, help="Yayına girme için en fazla bekleme (sn)")
+    parser.add_argument("--mode", choices=["auto", "files", "zip"], default="auto", help="Deploy yöntemi")
+    parser.add_argument("--api-url", help="Ayrı çalışan sahte/gerçek API adresi (verilmezse sahte sunucu başlatılır)")
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: benchmarks/results/deploy-<zaman>.json)")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else os.path.join(
+        RESULTS_DIR, f"deploy-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+    state = None
+    if args.api_url:
+        api_url = args.api_url
+    else:
+        state = FakeNetlifyState(args.latency_ms / 1000, args.error_rate, args.rate_limit,
+                                 args.processing_ms / 1000, seed=0)
+        _, api_url = start_server(state)
+    os.environ["NETLIFY_API_URL"] = api_url
+    os.environ.setdefault("NETLIFY_TOKEN", "bench")
+    os.environ["NETLIFY_DEPLOY_MODE"] = args.mode
+    os.environ.setdefault("DEPLOY_POLL_INITIAL", "0.05")  # Yayına girme süresi hassas ölçülsün
+
+    started = time.perf_counter()
+    # deploy.py'nin çıktıları susturulur (eş zamanlı deploy'lar yüzünden tüm çalışma boyunca)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results, client_stats = asyncio.run(run(args))
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "api_url": api_url,
+        "settings": {key: getattr(args, key) for key in
+                     ("file_kb", "runs", "concurrency", "latency_ms", "error_rate", "rate_limit", "processing_ms", "mode")},
+        "results": results,
+        "client": client_stats,
+        "server": state.stats if state else None,
+        "bench_seconds": time.perf_counter() - started,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    for result in results:
+        print(f"{result['files']:4d} dosya: fresh yükleme {result['fresh']['upload_seconds']['median'] * 1000:7.0f} ms, "
+              f"update {result['update']['upload_seconds']['median'] * 1000:7.0f} ms, "
+              f"burst {result['burst']['deploys_per_sec']:.1f} deploy/sn "
+              f"({result['burst']['files_per_sec_total']:.0f} dosya/sn)")
+    print(f"İstemci: {client_stats}")
+    if state:
+        print(f"Sunucu: {state.stats}")
+    print(f"Sonuçlar kaydedildi: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Deploy yöntemi benchmark'ı: "files" (manifest + dosya başına PUT) ve "zip" karşılaştırması
+
+Netlify API'si, istek başına gecikme (RTT) ve paylaşılan bir bant genişliği ile
+bellekte taklit edilir (httpx.MockTransport). Farklı dosya sayıları ve değişen
+byte oranları için iki yöntem de ölçülür; zip'in daha hızlı olduğu en küçük
+dosya sayısı deploy.ZIP_MIN_FILES / ZIP_MIN_CHANGED_RATIO eşiklerini ayarlamak
+için raporlanır. Sonuçlar JSON olarak yazılır.
+
+Kullanım (backend klasöründen):
+    python benchmarks/deploy_mode_bench.py [--rtt-ms 80] [--mbps 20] [--files 1,10,25,50,100]
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import deploy  # noqa: E402
+from netlify_client import NetlifyClient  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+class FakeNetlify:
+    """
+    Deploy endpoint'lerini taklit eden sahte Netlify API'si
+
+    Her istek RTT kadar gecikir; gövdeler tek bir bağlantıyı paylaşıyormuş gibi
+    bant genişliğine göre sırayla aktarılır. Yüklenen dosyaların hash'leri
+    saklanır, böylece manifest'te yalnızca yeni hash'ler "required" döner.
+    """
+
+    def __init__(self, rtt, bytes_per_sec):
+        self.rtt = rtt
+        self.bytes_per_sec = bytes_per_sec
+        self.link_free_at = 0.0
+        self.stored = set()
+        self.requests = 0
+        self.bytes = 0
+
+    async def _transfer(self, size):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self.link_free_at)
+        self.link_free_at = start + size / self.bytes_per_sec
+        await asyncio.sleep(self.link_free_at - now + self.rtt)
+
+    async def handler(self, request):
+        body = request.content
+        self.requests += 1
+        self.bytes += len(body)
+        await self._transfer(len(body))
+        path = request.url.path
+        if request.method == "POST" and path.endswith("/deploys"):
+            if request.headers.get("Content-Type") == "application/zip":
+                return httpx.Response(200, json={"id": "zip-deploy", "state": "uploaded"})
+            files = json.loads(body)["files"]
+            required = sorted(set(sha for sha in files.values() if sha not in self.stored))
+            return httpx.Response(200, json={"id": "deploy", "required": required})
+        if request.method == "PUT" and "/files/" in path:
+            self.stored.add(hashlib.sha1(body).hexdigest())
+            return httpx.Response(200, json={})
+        if request.method == "GET" and "/sites/" in path:
+            return httpx.Response(200, json={"url": "https://bench.netlify.app"})
+        return httpx.Response(404)
+
+
+def make_files(count, size, rng):
+    """Yarı sıkıştırılabilir (HTML/CSS benzeri) içerikli dosyalar üretir"""
+    words = ["<div>", "</div>", "class=", "section", "color:", "margin", "padding", "#fff;", "{", "}"]
+    files = {}
+    for i in range(count):
+        text = " ".join(rng.choice(words) + str(rng.randint(0, 999)) for _ in range(size // 8))
+        files[f"assets/file-{i}.html"] = text.encode()[:size]
+    return files
+
+
+def mutate(files, ratio, rng):
+    """Dosyaların ratio kadarını değiştirir (eşit boyutlu dosyalarda byte oranı da ~ratio olur)"""
+    changed = dict(files)
+    for relpath in rng.sample(sorted(files), round(len(files) * ratio)):
+        changed[relpath] = files[relpath][:-8] + f"{rng.randint(0, 10 ** 7):08d}".encode()
+    return changed
+
+
+async def measure(mode, files, ratio, args, seed):
+    """
+    Tek bir deploy'u verilen yöntemle ölçer
+
+    Returns:
+        dict: Süre, istek sayısı ve gönderilen byte'lar
+    """
+    rng = random.Random(seed)
+    server = FakeNetlify(args.rtt_ms / 1000, args.mbps * 1024 ** 2 / 8)
+    deploy.client = NetlifyClient("bench", transport=httpx.MockTransport(server.handler))
+    deploy.client.limiter.capacity = deploy.client.limiter.tokens = 10 ** 6  # İstek sınırı ölçülmez
+    deploy.deploy_tracker.enabled = False  # Yayına girme süresi bu benchmark'ın konusu değil
+    deploy.last_manifests.clear()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        if ratio < 1:
+            # Önceki sürüm yüklenmiş olsun: yalnızca değişen dosyalar yeni sayılır
+            deploy.DEPLOY_MODE = "files"
+            await deploy.deploy_files("bench", files)
+            files = mutate(files, ratio, rng)
+        server.requests = server.bytes = 0
+        deploy.DEPLOY_MODE = mode
+        started = time.perf_counter()
+        await deploy.deploy_files("bench", files)
+        elapsed = time.perf_counter() - started
+    await deploy.client.aclose()
+    return {"seconds": elapsed, "requests": server.requests, "bytes": server.bytes}
+
+
+async def run(args):
+    file_counts = [int(n) for n in args.files.split(",")]
+    ratios = [float(r) for r in args.ratios.split(",")]
+    rows = []
+    for count in file_counts:
+        files = make_files(count, args.file_kb * 1024, random.Random(count))
+        for ratio in ratios:
+            row = {"file_count": count, "changed_ratio": ratio}
+            for mode in ("files", "zip"):
+                row[mode] = await measure(mode, files, ratio, args, seed=count)
+            row["zip_faster"] = row["zip"]["seconds"] < row["files"]["seconds"]
+            rows.append(row)
+            print(f"{count:5d} dosya, değişen %{ratio * 100:3.0f}: "
+                  f"files {row['files']['seconds'] * 1000:7.0f} ms ({row['files']['requests']} istek), "
+                  f"zip {row['zip']['seconds'] * 1000:7.0f} ms ({row['zip']['requests']} istek)"
+                  f"{'  <- zip' if row['zip_faster'] else ''}")
+
+    # Her oran için zip'in hızlı olduğu en küçük dosya sayısı - ZIP_MIN_FILES için öneri
+    crossover = {}
+    for ratio in ratios:
+        faster = [row["file_count"] for row in rows if row["changed_ratio"] == ratio and row["zip_faster"]]
+        crossover[str(ratio)] = min(faster) if faster else None
+    return rows, crossover
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rtt-ms", type=float, default=80.0, help="İstek başına gidiş-dönüş gecikmesi (ms)")
+    parser.add_argument("--mbps", type=float, default=20.0, help="Yükleme bant genişliği (Mbit/sn)")
+    parser.add_argument("--file-kb", type=int, default=16, help="Dosya başına boyut (KB)")
+    parser.add_argument("--files", default="1,5,10,25,50,100", help="Denenecek dosya sayıları")
+    parser.add_argument("--ratios", default="0.1,0.5,1.0", help="Denenecek değişen byte oranları")
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: benchmarks/results/deploy-mode-<zaman>.json)")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else os.path.join(
+        RESULTS_DIR, f"deploy-mode-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+    rows, crossover = asyncio.run(run(args))
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "rtt_ms": args.rtt_ms,
+        "mbps": args.mbps,
+        "file_kb": args.file_kb,
+        "upload_workers": deploy.UPLOAD_WORKERS,
+        "zip_compresslevel": deploy.ZIP_COMPRESSLEVEL,
+        "current_thresholds": {"zip_min_files": deploy.ZIP_MIN_FILES,
+                               "zip_min_changed_ratio": deploy.ZIP_MIN_CHANGED_RATIO},
+        "zip_faster_from_files": crossover,
+        "runs": rows,
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print("Zip'in daha hızlı olduğu en küçük dosya sayısı (değişen oran -> dosya):", crossover)
+    print(f"Sonuçlar kaydedildi: {output}")
+
+
+if __name__ == "__main__":
+    main()
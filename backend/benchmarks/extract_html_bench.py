@@ -0,0 +1,88 @@
+"""
+extract_html mikro benchmark'ı: tek geçişli HtmlExtractor ile eski regex tabanlı sürümü karşılaştırır
+
+Kullanım (backend klasöründen):
+    python benchmarks/extract_html_bench.py [--size 200000] [--repeat 5]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from html_extract import HtmlExtractor, extract_html  # noqa: E402
+
+
+def regex_extract_html(text):
+    """Karşılaştırma için eski, üç ayrı re.search geçişi yapan sürüm"""
+    m = re.search(r"<!DOCTYPE html>.*?</html>", text, re.DOTALL | re.IGNORECASE)
+    if m:
+        return m.group(0)
+    m = re.search(r"<html.*?>.*?</html>", text, re.DOTALL | re.IGNORECASE)
+    if m:
+        return "<!DOCTYPE html>\n" + m.group(0)
+    m = re.search(r"<body.*?>.*?</body>", text, re.DOTALL | re.IGNORECASE)
+    if m:
+        return f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset='UTF-8'>\n<title>Generated Page</title>\n</head>\n{m.group(0)}\n</html>"
+    return text
+
+
+def build_inputs(size):
+    """
+    Benchmark girdilerini oluşturur
+
+    Args:
+        size (int): Yaklaşık girdi boyutu (karakter)
+
+    Returns:
+        dict: girdi adı -> metin
+    """
+    row = "<div class='card'><h2>Başlık</h2><p>İçerik metni burada yer alır.</p></div>\n"
+    body = row * (size // len(row))
+    prose = "Bu sayfa modern ve duyarlı bir tasarıma sahiptir. " * (size // 50)
+    return {
+        # Normal model çıktısı: açıklama + tam doküman + açıklama
+        "full_document": f"İşte kodunuz:\n<!DOCTYPE html>\n<html><head></head><body>{body}</body></html>\nUmarım beğenirsiniz.",
+        # Büyük harfli varyant ve doctype olmadan
+        "html_only_upper": f"<HTML><BODY>{body}</BODY></HTML>",
+        # Hiç HTML içermeyen çıktı: regex sürümü metni üç kez tarar
+        "no_match": prose,
+        # Kesilmiş (truncated) çıktı: </html> hiç gelmemiş
+        "truncated": f"<!DOCTYPE html>\n<html><head></head><body>{body}",
+        # Düşmanca girdi: kapanmayan çok sayıda <html / <body etiketi
+        "adversarial_open_tags": "<html <body " * (size // 12),
+    }
+
+
+def bench(func, text, repeat):
+    return min(timeit.repeat(lambda: func(text), number=1, repeat=repeat))
+
+
+def streamed(text, chunk_size=16):
+    extractor = HtmlExtractor()
+    for i in range(0, len(text), chunk_size):
+        extractor.feed(text[i:i + chunk_size])
+    return extractor.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=200_000, help="Girdi boyutu (karakter)")
+    parser.add_argument("--repeat", type=int, default=5, help="Tekrar sayısı (en iyi süre alınır)")
+    args = parser.parse_args()
+
+    print(f"{'girdi':<24}{'regex (ms)':>12}{'tek geçiş (ms)':>16}{'stream (ms)':>14}{'hızlanma':>10}")
+    for name, text in build_inputs(args.size).items():
+        # Kapanışı olmayan girdilerde regex sürümü karesel çalışır; girdi küçültülmezse çok uzun sürer
+        if name in ("truncated", "adversarial_open_tags"):
+            text = text[:min(len(text), 20_000)]
+        old = bench(regex_extract_html, text, args.repeat)
+        new = bench(extract_html, text, args.repeat)
+        stream = bench(streamed, text, args.repeat)
+        print(f"{name:<24}{old * 1000:>12.2f}{new * 1000:>16.2f}{stream * 1000:>14.2f}{old / new:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Yerel Netlify API taklidi: deploy.py'nin kullandığı endpoint'leri gerçek Netlify'a gitmeden sunar
+
+Desteklenen endpoint'ler (/api/v1 altında): site listeleme/oluşturma/getirme/güncelleme,
+manifest ("required" hash'leri döner) ve zip deploy, dosya yükleme (PUT), deploy durumu,
+restore ve domain ekleme. İstek başına gecikme, rastgele 5xx hata oranı ve dakika bazlı
+istek sınırı (429 + X-RateLimit-* başlıkları) ayarlanabilir. Durum bellekte tutulur.
+
+Kullanım (backend klasöründen):
+    python benchmarks/fake_netlify.py [--port 8900] [--latency-ms 50] [--error-rate 0.02] [--rate-limit 500]
+    NETLIFY_API_URL=http://127.0.0.1:8900/api/v1 uvicorn main:app
+"""
+import argparse
+import hashlib
+import io
+import json
+import random
+import re
+import threading
+import time
+import uuid
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeNetlifyState:
+    """
+    Sahte Netlify'ın bellekteki durumu ve davranış ayarları
+
+    Args:
+        latency (float): İstek başına eklenecek gecikme (saniye)
+        error_rate (float): Rastgele 503 döndürülecek istek oranı (0-1)
+        rate_limit (int): Dakikada izin verilen istek sayısı (0 = sınırsız)
+        processing (float): Dosyalar tamamlandıktan sonra deploy'un "ready" olması için geçen süre (saniye)
+    """
+
+    def __init__(self, latency=0.0, error_rate=0.0, rate_limit=0, processing=0.2, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.processing = processing
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.sites = {}     # site ID -> site nesnesi
+        self.deploys = {}   # deploy ID -> deploy nesnesi (+ bekleyen hash'ler)
+        self.blobs = set()  # Yüklenmiş dosyaların SHA1 hash'leri (tüm siteler için ortak)
+        self.window_start = time.time()
+        self.window_count = 0
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0, "bytes_in": 0}
+
+    def rate_headers(self):
+        """Dakikalık pencereyi günceller; (izin verildi mi, X-RateLimit-* başlıkları) döndürür"""
+        with self.lock:
+            now = time.time()
+            if now - self.window_start >= 60:
+                self.window_start, self.window_count = now, 0
+            self.window_count += 1
+            if not self.rate_limit:
+                return True, {}
+            reset = int(self.window_start + 60)
+            remaining = max(0, self.rate_limit - self.window_count)
+            headers = {"X-RateLimit-Limit": str(self.rate_limit),
+                       "X-RateLimit-Remaining": str(remaining),
+                       "X-RateLimit-Reset": str(reset)}
+            return self.window_count <= self.rate_limit, headers
+
+    def deploy_state(self, deploy):
+        # Tüm dosyalar yüklendikten processing saniye sonra deploy yayına girer
+        if deploy["state"] != "ready" and deploy["_completed"] is not None \
+                and time.time() - deploy["_completed"] >= self.processing:
+            deploy["state"] = "ready"
+            site = self.sites[deploy["site_id"]]
+            site["published_deploy"] = {"id": deploy["id"]}
+        return deploy
+
+
+def public(obj):
+    """Alt çizgiyle başlayan iç alanları çıkarır"""
+    return {key: value for key, value in obj.items() if not key.startswith("_")}
+
+
+def deep_merge(target, changes):
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            deep_merge(target[key], value)
+        else:
+            target[key] = value
+
+
+class FakeNetlifyHandler(BaseHTTPRequestHandler):
+    """Sahte Netlify API istek işleyicisi (state sunucu nesnesinden alınır)"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive - istemcinin bağlantı havuzu gerçekçi çalışsın
+
+    def log_message(self, format, *args):
+        pass  # Benchmark çıktısını kirletmesin
+
+    def send_json(self, status, data=None, headers=None):
+        body = json.dumps(data if data is not None else {}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_request(self, method):
+        state = self.server.state
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        state.stats["requests"] += 1
+        state.stats["bytes_in"] += len(body)
+        if state.latency:
+            time.sleep(state.latency)
+
+        allowed, headers = state.rate_headers()
+        if not allowed:
+            state.stats["rate_limited"] += 1
+            retry_after = max(1, int(headers["X-RateLimit-Reset"]) - int(time.time()))
+            return self.send_json(429, {"message": "Rate limit exceeded"}, {**headers, "Retry-After": str(retry_after)})
+        if state.error_rate and state.random.random() < state.error_rate:
+            state.stats["errors"] += 1
+            return self.send_json(503, {"message": "Service unavailable"}, headers)
+
+        path, _, query = self.path.partition("?")
+        params = dict(part.split("=", 1) for part in query.split("&") if "=" in part)
+        if not path.startswith("/api/v1/"):
+            return self.send_json(404, {"message": "Not found"}, headers)
+        with state.lock:
+            status, data = self.route(state, method, path[len("/api/v1"):], params, body)
+        return self.send_json(status, data, headers)
+
+    def route(self, state, method, path, params, body):
+        if path == "/sites" and method == "GET":
+            sites = [public(site) for site in state.sites.values()]
+            if "name" in params:
+                sites = [site for site in sites if params["name"] in site["name"]]
+            page, per_page = int(params.get("page", 1)), int(params.get("per_page", 100))
+            return 200, sites[(page - 1) * per_page:page * per_page]
+
+        if path == "/sites" and method == "POST":
+            name = json.loads(body or b"{}").get("name") or f"site-{uuid.uuid4().hex[:8]}"
+            if any(site["name"] == name for site in state.sites.values()):
+                return 422, {"errors": {"subdomain": ["must be unique"]}, "message": "subdomain already in use"}
+            site_id = str(uuid.uuid4())
+            state.sites[site_id] = {
+                "id": site_id, "name": name, "url": f"http://{name}.netlify.app",
+                "ssl": False, "force_ssl": False, "processing_settings": {},
+                "deploy_id": None, "published_deploy": None, "domains": [],
+            }
+            return 201, public(state.sites[site_id])
+
+        match = re.fullmatch(r"/sites/([^/]+)(/.*)?", path)
+        if match:
+            site = state.sites.get(match.group(1))
+            if site is None:
+                return 404, {"message": "Not found"}
+            return self.route_site(state, method, site, match.group(2) or "", body)
+
+        match = re.fullmatch(r"/deploys/([^/]+)(?:/files/(.+))?", path)
+        if match:
+            deploy = state.deploys.get(match.group(1))
+            if deploy is None:
+                return 404, {"message": "Not found"}
+            if match.group(2) is None and method == "GET":
+                return 200, public(state.deploy_state(deploy))
+            if match.group(2) is not None and method == "PUT":
+                sha = hashlib.sha1(body).hexdigest()
+                if deploy["_files"].get("/" + match.group(2).lstrip("/")) != sha:
+                    return 422, {"message": "File does not match manifest"}
+                state.blobs.add(sha)
+                deploy["_pending"].discard(sha)
+                deploy["required"] = sorted(deploy["_pending"])
+                if not deploy["_pending"]:
+                    deploy["state"], deploy["_completed"] = "processing", time.time()
+                return 200, {"id": sha, "path": match.group(2)}
+        return 404, {"message": "Not found"}
+
+    def route_site(self, state, method, site, rest, body):
+        if rest == "" and method == "GET":
+            return 200, public(site)
+        if rest == "" and method == "PATCH":
+            deep_merge(site, json.loads(body or b"{}"))
+            if site.get("ssl"):
+                site["url"] = site["url"].replace("http://", "https://")
+            return 200, public(site)
+
+        if rest == "/deploys" and method == "POST":
+            if self.headers.get("Content-Type") == "application/zip":
+                with zipfile.ZipFile(io.BytesIO(body)) as archive:
+                    files = {"/" + name: hashlib.sha1(archive.read(name)).hexdigest() for name in archive.namelist()}
+                state.blobs.update(files.values())
+            else:
+                files = {"/" + path.lstrip("/"): sha for path, sha in json.loads(body)["files"].items()}
+            pending = set(files.values()) - state.blobs
+            deploy_id = uuid.uuid4().hex
+            state.deploys[deploy_id] = {
+                "id": deploy_id, "site_id": site["id"],
+                "state": "uploading" if pending else "processing",
+                "required": sorted(pending),
+                "_files": files, "_pending": pending,
+                "_completed": None if pending else time.time(),
+            }
+            site["deploy_id"] = deploy_id
+            return 200, public(state.deploys[deploy_id])
+
+        match = re.fullmatch(r"/deploys/([^/]+)/restore", rest)
+        if match and method == "POST":
+            if match.group(1) not in state.deploys:
+                return 404, {"message": "Not found"}
+            site["published_deploy"] = {"id": match.group(1)}
+            return 200, public(state.deploys[match.group(1)])
+
+        if rest == "/domains" and method == "POST":
+            hostname = json.loads(body or b"{}").get("hostname")
+            site["domains"].append(hostname)
+            return 201, {"hostname": hostname, "site_id": site["id"]}
+        match = re.fullmatch(r"/domain_aliases/([^/]+)/primary", rest)
+        if match and method == "POST":
+            if match.group(1) not in site["domains"]:
+                return 404, {"message": "Not found"}
+            site["custom_domain"] = match.group(1)
+            return 204, None
+        return 404, {"message": "Not found"}
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PUT(self):
+        self.handle_request("PUT")
+
+    def do_PATCH(self):
+        self.handle_request("PATCH")
+
+
+def start_server(state, host="127.0.0.1", port=0):
+    """
+    Sahte Netlify sunucusunu arka plan thread'inde başlatır
+
+    Args:
+        state (FakeNetlifyState): Sunucunun durumu ve ayarları
+        host (str): Dinlenecek adres
+        port (int): Dinlenecek port (0 = boş bir port seçilir)
+
+    Returns:
+        tuple: (sunucu, API adresi (örn. "http://127.0.0.1:8900/api/v1"))
+    """
+    server = ThreadingHTTPServer((host, port), FakeNetlifyHandler)
+    server.daemon_threads = True
+    server.state = state
+    threading.Thread(target=server.serve_forever, name="fake-netlify", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/api/v1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="İstek başına gecikme (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Rastgele 503 oranı (0-1)")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Dakikada izin verilen istek (0 = sınırsız)")
+    parser.add_argument("--processing-ms", type=float, default=200.0, help="Deploy'un ready olma süresi (ms)")
+    args = parser.parse_args()
+
+    state = FakeNetlifyState(args.latency_ms / 1000, args.error_rate, args.rate_limit, args.processing_ms / 1000)
+    server, url = start_server(state, args.host, args.port)
+    print(f"Sahte Netlify API çalışıyor: {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
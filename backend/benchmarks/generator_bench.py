@@ -0,0 +1,266 @@
+"""
+generator.py benchmark'ı: prompt oluşturma, TTFT, token/sn, extract_html hızı ve uçtan uca gecikme
+
+Varsayılan olarak gerçek model yerine kaydedilmiş çıktıları belirli bir token/sn
+hızında tekrar oynatan deterministik FakeLlama kullanılır; --model verilirse
+gerçek GGUF modeli yüklenir. Sonuçlar JSON olarak yazılır, böylece farklı
+çalıştırmalar karşılaştırılabilir.
+
+Kullanım (backend klasöründen):
+    python benchmarks/generator_bench.py [--tokens-per-sec 40] [--runs 3] [--output sonuc.json]
+    python benchmarks/generator_bench.py --model /yol/model.gguf
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import generator  # noqa: E402
+from html_extract import extract_html  # noqa: E402
+from result_cache import ResultCache  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "recorded_outputs.json")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Sahte tokenizer: metni en fazla 4 karakterlik parçalara böler (gerçek BPE token'larına yakın ortalama)
+FAKE_TOKEN_PATTERN = re.compile(r".{1,4}", re.DOTALL)
+
+
+class FakeLlama:
+    """
+    Kaydedilmiş çıktıları sabit bir token/sn hızında tekrar oynatan deterministik Llama yerine geçen sınıf
+
+    generator modülünün kullandığı create_chat_completion (stream ve normal),
+    create_completion ve tokenize metotlarını taklit eder. Çıktılar sırayla
+    döndürülür; stop dizileri ve max_tokens gerçek modeldeki gibi uygulanır.
+
+    Args:
+        outputs (list[str]): Sırayla tekrar oynatılacak model çıktıları
+        tokens_per_sec (float): Üretim hızı
+        prompt_tokens_per_sec (float): Prompt değerlendirme hızı (TTFT'yi belirler)
+    """
+
+    def __init__(self, outputs, tokens_per_sec=40.0, prompt_tokens_per_sec=400.0):
+        self.outputs = outputs
+        self.tokens_per_sec = tokens_per_sec
+        self.prompt_tokens_per_sec = prompt_tokens_per_sec
+        self.calls = 0
+        self.draft_model = None
+
+    def tokenize(self, text, add_bos=True):
+        if isinstance(text, bytes):
+            text = text.decode("utf-8", errors="ignore")
+        return FAKE_TOKEN_PATTERN.findall(text)
+
+    def create_completion(self, prompt, max_tokens=16, **kwargs):
+        return {"choices": [{"text": "", "finish_reason": "length"}],
+                "usage": {"prompt_tokens": len(self.tokenize(prompt)), "completion_tokens": 0}}
+
+    def _replay(self, messages, max_tokens, stop):
+        prompt = "".join(message["content"] for message in messages)
+        output = self.outputs[self.calls % len(self.outputs)]
+        self.calls += 1
+
+        finish_reason = "stop"
+        for sequence in stop or []:
+            index = output.find(sequence)
+            if index != -1:
+                output = output[:index]
+        tokens = self.tokenize(output)
+        if max_tokens and len(tokens) > max_tokens:
+            tokens, finish_reason = tokens[:max_tokens], "length"
+        prompt_tokens = len(self.tokenize(prompt))
+        return prompt_tokens, tokens, finish_reason
+
+    def create_chat_completion(self, messages, stream=False, max_tokens=None, stop=None, **kwargs):
+        prompt_tokens, tokens, finish_reason = self._replay(messages, max_tokens, stop)
+        time.sleep(prompt_tokens / self.prompt_tokens_per_sec)
+        if stream:
+            return self._stream(tokens, finish_reason)
+
+        time.sleep(len(tokens) / self.tokens_per_sec)
+        return {
+            "choices": [{"message": {"role": "assistant", "content": "".join(tokens)}, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens)},
+        }
+
+    def _stream(self, tokens, finish_reason):
+        yield {"choices": [{"delta": {"role": "assistant"}, "finish_reason": None}]}
+        interval = 1.0 / self.tokens_per_sec
+        next_token = time.perf_counter()
+        for token in tokens:
+            # Uyuma hatası birikmesin diye hedef zamana göre beklenir
+            next_token += interval
+            delay = next_token - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            yield {"choices": [{"delta": {"content": token}, "finish_reason": None}]}
+        yield {"choices": [{"delta": {}, "finish_reason": finish_reason}]}
+
+    def save_state(self):
+        raise NotImplementedError("FakeLlama model durumunu saklamaz")
+
+
+def summarize(values):
+    """Ölçüm listesinin özetini döndürür (ortalama, medyan, min, max)"""
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "mean": statistics.mean(values),
+        "median": statistics.median(values),
+        "min": min(values),
+        "max": max(values),
+    }
+
+
+def bench_prompt_build(histories, repeat):
+    """
+    Prompt geçmişi sıkıştırma + birleştirme süresini geçmiş uzunluğuna göre ölçer
+
+    Returns:
+        dict: revizyon sayısı -> prompt başına süre (ms)
+    """
+    results = {}
+    for history in histories:
+        def build():
+            compacted, _ = generator.fit_prompts(history, generator.MIN_COMPLETION_TOKENS, generator.INSTRUCTION_SUFFIX)
+            return generator.build_prompt(compacted)
+        seconds = min(timeit.repeat(build, number=repeat, repeat=3)) / repeat
+        results[str(len(history) - 1)] = seconds * 1000
+    return results
+
+
+def bench_extract(outputs, repeat):
+    """
+    extract_html hızını ölçer
+
+    Returns:
+        dict: MB/sn ve çağrı başına süre (ms)
+    """
+    total_bytes = sum(len(output.encode("utf-8")) for output in outputs)
+    seconds = min(timeit.repeat(lambda: [extract_html(o) for o in outputs], number=repeat, repeat=3)) / repeat
+    return {"mb_per_sec": total_bytes / seconds / 1024 ** 2, "ms_per_call": seconds / len(outputs) * 1000}
+
+
+def bench_stream(prompts_list, runs):
+    """
+    generate_html_stream ile TTFT ve token/sn ölçer
+
+    Returns:
+        dict: ttft, tokens_per_sec ve elapsed özetleri
+    """
+    ttfts, rates, elapsed = [], [], []
+    for _ in range(runs):
+        for prompts in prompts_list:
+            for event in generator.generate_html_stream(prompts, fresh=True):
+                if event["type"] != "done":
+                    continue
+                ttfts.append(event["ttft"])
+                elapsed.append(event["elapsed"])
+                generating = event["elapsed"] - (event["ttft"] or 0)
+                if generating > 0:
+                    rates.append(event["chunks"] / generating)
+    return {"ttft": summarize(ttfts), "tokens_per_sec": summarize(rates), "elapsed": summarize(elapsed)}
+
+
+def bench_end_to_end(prompts_list, runs):
+    """
+    generate_html_with_history ile uçtan uca gecikmeyi ölçer (önbellek atlanır)
+
+    Returns:
+        dict: Gecikme özeti (saniye)
+    """
+    latencies = []
+    for _ in range(runs):
+        for prompts in prompts_list:
+            started = time.perf_counter()
+            generator.generate_html_with_history(prompts, fresh=True, incremental=False)
+            latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="Gerçek GGUF model yolu (verilmezse FakeLlama kullanılır)")
+    parser.add_argument("--fixtures", default=FIXTURES, help="Kaydedilmiş model çıktıları (JSON)")
+    parser.add_argument("--tokens-per-sec", type=float, default=40.0, help="FakeLlama üretim hızı")
+    parser.add_argument("--prompt-tokens-per-sec", type=float, default=400.0, help="FakeLlama prompt değerlendirme hızı")
+    parser.add_argument("--runs", type=int, default=3, help="Üretim ölçümlerinin tekrar sayısı")
+    parser.add_argument("--output", help="Sonuç dosyası (varsayılan: benchmarks/results/generator-<zaman>.json)")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output) if args.output else os.path.join(
+        RESULTS_DIR, f"generator-{datetime.now():%Y%m%d-%H%M%S}.json")
+
+    with open(args.fixtures, encoding="utf-8") as f:
+        recorded = json.load(f)["outputs"]
+    outputs = [item["output"] for item in recorded]
+    prompts_list = [item["prompts"] for item in recorded]
+
+    if args.model:
+        generator.MODEL_PATH = args.model
+        if generator.load_model() is None:
+            sys.exit(f"Model yüklenemedi: {args.model}")
+        mode = "real"
+    else:
+        generator.model = FakeLlama(outputs, args.tokens_per_sec, args.prompt_tokens_per_sec)
+        generator.token_counter.tokenize = generator.model.tokenize
+        generator.model_loaded.set()
+        generator.model_ready.set()
+        mode = "fake"
+
+    # Ölçümler gerçek önbellekleri (ve SAVE_LOCAL_HTML açıksa website/index.html dosyasını) kirletmesin
+    workdir = tempfile.mkdtemp(prefix="generator-bench-")
+    generator.result_cache = ResultCache(cache_dir=os.path.join(workdir, "result_cache"))
+    os.chdir(workdir)
+
+    base = prompts_list[0][0]
+    histories = [[base] + [f"Revizyon {i}: bölüm {i} için renkleri ve yazı tipini değiştir." for i in range(n)]
+                 for n in (0, 5, 25, 100)]
+
+    started = time.perf_counter()
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "mode": mode,
+        "model": args.model,
+        "fake_tokens_per_sec": None if args.model else args.tokens_per_sec,
+        "runs": args.runs,
+        "prompt_build_ms": bench_prompt_build(histories, repeat=200),
+        "extract_html": bench_extract(outputs, repeat=200),
+        "stream": bench_stream(prompts_list, args.runs),
+        "end_to_end_seconds": bench_end_to_end(prompts_list, args.runs),
+        "token_usage": generator.drain_usage()[-len(prompts_list):],
+    }
+    results["bench_seconds"] = time.perf_counter() - started
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(json.dumps({k: results[k] for k in ("prompt_build_ms", "extract_html", "stream", "end_to_end_seconds")},
+                     indent=2))
+    print(f"Sonuçlar kaydedildi: {output}")
+
+
+if __name__ == "__main__":
+    main()
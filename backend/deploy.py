@@ -1,24 +1,57 @@
-import requests
+import asyncio
+import io
 import os
 import hashlib
+import time
+import zipfile
+
+from deploy_tracker import DeployTracker
+from netlify_client import NetlifyClient
+from site_index import SiteIndex
+from site_setup import SiteSetup
 
 # Netlify API erişimi için kişisel erişim tokeni
 # Bu token ile Netlify API'sine kimlik doğrulama yapılacak
-NETLIFY_TOKEN = "your token"  # kendi tokenını buraya koy!
+NETLIFY_TOKEN = os.environ.get("NETLIFY_TOKEN", "your token")  # kendi tokenını buraya koy!
 DIR = "../website"  # Deploy edilecek dosyaların bulunduğu klasör
 
-# Tüm API isteklerinde kullanılacak ortak header'lar
-headers = {
-    "Authorization": f"Bearer {NETLIFY_TOKEN}",  # Bearer token kimlik doğrulama
-    "Content-Type": "application/json"           # JSON formatında veri gönderimi
-}
+# Aynı anda yüklenecek en fazla dosya sayısı
+UPLOAD_WORKERS = int(os.environ.get("NETLIFY_UPLOAD_WORKERS", 8))
+
+# Deploy yöntemi: "files" (manifest + dosya başına PUT), "zip" (tek istekte zip arşivi) veya
+# "auto" (dosya sayısı ve değişen byte oranına göre seçilir, bkz. choose_deploy_mode)
+DEPLOY_MODE = os.environ.get("NETLIFY_DEPLOY_MODE", "auto")
+
+# "auto" modunda zip için gereken en az dosya sayısı ve değişen byte oranı -
+# benchmarks/deploy_mode_bench.py ile ölçülerek ayarlanabilir
+ZIP_MIN_FILES = int(os.environ.get("NETLIFY_ZIP_MIN_FILES", 10))
+ZIP_MIN_CHANGED_RATIO = float(os.environ.get("NETLIFY_ZIP_MIN_CHANGED_RATIO", 0.5))
+
+# Zip arşivinin sıkıştırma seviyesi (1 hızlı, 9 en küçük)
+ZIP_COMPRESSLEVEL = int(os.environ.get("NETLIFY_ZIP_COMPRESSLEVEL", 6))
+
+# Tüm Netlify isteklerinde kullanılan asenkron istemci - bağlantı havuzu, zaman aşımı,
+# tekrar deneme ve istek sınırı (rate limit) takibi burada yapılır
+client = NetlifyClient(NETLIFY_TOKEN)
 
-def find_existing_site(site_name):
+# Site adı -> site ID indeksi - her site adı kontrolünde tüm site listesinin çekilmemesi için
+site_index = SiteIndex(client)
+
+# Yüklenen deploy'ların Netlify'da işlenip yayına girmesini takip eder
+deploy_tracker = DeployTracker(lambda deploy_id: client.get_deploy(deploy_id))
+
+# Site kurulum motoru - onaylanan sitelerin ayarlarını ve production deploy'unu hazırlar
+site_setup = SiteSetup(client)
+
+# Site ID -> son başarılı deploy'un manifest'i - değişen byte oranı buna göre hesaplanır
+last_manifests = {}
+
+async def find_existing_site(site_name):
     """
     Netlify hesabında verilen isimde bir site olup olmadığını kontrol eder
     
-    Netlify API'sine istek göndererek tüm siteleri çeker ve
-    verilen site_name ile eşleşen bir site varsa onun ID'sini döndürür.
+    Arama site indeksinden yapılır: tüm siteler ilk kullanımda bir kez
+    listelenir, sonraki aramalar bellekten yanıtlanır (bkz. SiteIndex).
     
     Args:
         site_name (str): Aranacak site adı
@@ -26,19 +59,15 @@ def find_existing_site(site_name):
     Returns:
         str or None: Site bulunursa site ID'si, bulunamazsa None
     """
-    url = f"https://api.netlify.com/api/v1/sites"
-    resp = requests.get(url, headers=headers)
-    if resp.status_code != 200:
-        print("Sitelist alınamadı:", resp.text)
-        return None
-    for site in resp.json():
-        if site["name"] == site_name:
-            return site["id"]
-    return None
+    return await site_index.lookup(site_name)
 
-def create_site(site_name):
+async def create_site(site_name):
     """
     Verilen isimde yeni bir Netlify sitesi oluşturur
+
+    İsim kullanımdaysa (422) site hesapta tekrar aranır: site bu hesapta
+    oluşturulmuşsa (örn. zaman aşımına uğrayan önceki istekle veya eş zamanlı
+    başka bir istekle) onun ID'si döndürülür.
     
     Args:
         site_name (str): Oluşturulacak sitenin adı
@@ -46,22 +75,26 @@ def create_site(site_name):
     Returns:
         str or None: Başarılı olursa site ID'si, başarısız olursa None
     """
-    url = "https://api.netlify.com/api/v1/sites"
-    payload = {"name": site_name}  # Yeni site için gerekli minimum veri
-    resp = requests.post(url, headers=headers, json=payload)
+    resp = await client.create_site(site_name)  # Yeni site için gerekli minimum veri: isim
     
     if resp.status_code in [200, 201]:
         data = resp.json()
         print(f"✅ Yeni site oluşturuldu: {data['name']} (id: {data['id']})")
+        site_index.add(data['name'], data['id'])
         return data['id']
     elif resp.status_code == 422 and "already in use" in resp.text:
         # 422 hatası "unprocessable entity" - özellikle bu isimde bir site zaten varsa
-        print("Bu alt alan başka bir Netlify kullanıcısına ait.")
+        found, site_id = await site_index.fetch(site_name)
+        if site_id:
+            print(f"🟢 {site_name} adlı site bu hesapta zaten oluşturulmuş (ID: {site_id})")
+            return site_id
+        if found:
+            print("Bu alt alan başka bir Netlify kullanıcısına ait.")
     else:
         print("Beklenmeyen hata:", resp.status_code, resp.text)
     return None
 
-def find_or_create_site(site_name):
+async def find_or_create_site(site_name):
     """
     Verilen isimde site varsa bulur, yoksa yeni oluşturur
     
@@ -74,13 +107,13 @@ def find_or_create_site(site_name):
     Returns:
         str or None: Site ID'si, başarısız olursa None
     """
-    site_id = find_existing_site(site_name)
+    site_id = await find_existing_site(site_name)
     if site_id:
         print(f"🟢 {site_name} adlı site bulundu (ID: {site_id})")
         return site_id
     else:
         print(f"🔵 {site_name} adlı site bulunamadı, yeni site açılıyor...")
-        return create_site(site_name)
+        return await create_site(site_name)
 
 def sha1sum(filename):
     """
@@ -122,94 +155,329 @@ def collect_files(root_dir):
             files.append((relpath.replace("\\","/"), path))  # Windows/Unix uyumluluğu için \ → /
     return files
 
-def deploy_to_site(site_id, html_code=None):
+def read_file(path):
+    """Diskteki dosyanın içeriğini okur"""
+    with open(path, "rb") as f:
+        return f.read()
+
+async def upload_file(deploy_id, relpath, content):
     """
-    Dosyaları Netlify sitesine deploy eder
-    
-    Bu fonksiyon Netlify'ın iki aşamalı deploy mekanizmasını kullanır:
-    1. Dosya listesi ve hash'lerini göndererek hangi dosyaların yüklenmesi gerektiğini öğrenir
-    2. Sadece gereken dosyaları yükler
-    
+    Tek bir dosyayı deploy'a yükler
+
+    Geçici hatalarda tekrar deneme NetlifyClient tarafından yapılır.
+    Bellekteki içerik kopyalanmadan gönderilir.
+
+    Args:
+        deploy_id (str): Netlify deploy ID'si
+        relpath (str): Dosyanın sitedeki göreceli yolu
+        content (bytes or str): Dosyanın içeriği (bellekten deploy) veya diskteki yolu
+
+    Returns:
+        bool: Yükleme başarılıysa True
+    """
+    try:
+        if not isinstance(content, bytes):
+            content = await asyncio.to_thread(read_file, content)
+        put_resp = await client.upload_file(deploy_id, relpath, content)
+    except Exception as e:
+        print(f"Yükleme hatası: {relpath} -- {e}")
+        return False
+    if put_resp.status_code == 200:
+        print(f"Yüklendi: {relpath}")
+        return True
+    print(f"Hata: {relpath} -- Kod: {put_resp.status_code}", put_resp.text)
+    return False
+
+def choose_deploy_mode(file_count, changed_ratio):
+    """
+    Deploy yöntemini seçer
+
+    Zip arşivi tüm dosyaları tek istekte gönderir: dosya başına bir istek yapmaktan
+    kurtarır ama değişmeyen dosyaları da yükler. Bu yüzden dosya sayısı yüksek ve
+    dosyaların çoğu (byte olarak) değişmişse (örn. yeni site) zip seçilir.
+
+    Args:
+        file_count (int): Sitedeki dosya sayısı
+        changed_ratio (float): Son deploy'a göre değişen byte'ların toplam byte'lara oranı (0-1)
+
+    Returns:
+        str: "zip" veya "files"
+    """
+    if DEPLOY_MODE in ("zip", "files"):
+        return DEPLOY_MODE
+    if file_count >= ZIP_MIN_FILES and changed_ratio >= ZIP_MIN_CHANGED_RATIO:
+        return "zip"
+    return "files"
+
+def changed_ratio(site_id, manifest, sizes):
+    """
+    Son başarılı deploy'a göre değişen byte oranını hesaplar (önceki deploy bilinmiyorsa 1.0)
+
     Args:
         site_id (str): Netlify site ID'si
-        html_code (str, optional): Eğer verilirse index.html olarak kaydedilir ve deploy edilir
-        
+        manifest (dict): Göreceli yol -> SHA1 hash
+        sizes (dict): Göreceli yol -> dosya boyutu (byte)
+
     Returns:
-        str or None: Deploy başarılıysa site URL'i, değilse None
+        float: Değişen byte oranı (0-1)
     """
-    # Eğer yeni html_code verilirse, kaydet
-    if html_code:
-        os.makedirs(DIR, exist_ok=True)  # Klasör yoksa oluştur
-        with open(os.path.join(DIR, "index.html"), "w", encoding="utf-8") as f:
-            f.write(html_code)
-    
-    files = collect_files(DIR)  # Tüm dosyaları topla
-    if not files:
-        print(f"{DIR} klasöründe deploy edilecek dosya yok!")
-        return None
+    previous = last_manifests.get(site_id, {})
+    total = sum(sizes.values())
+    if not total:
+        return 1.0 if manifest != previous else 0.0
+    changed = sum(size for rel, size in sizes.items() if previous.get(rel) != manifest[rel])
+    return changed / total
 
-    # 1. Deploy başlat: Hash listesi paylaşılır
-    # Netlify'a dosya içeriklerini göndermeden önce hangi dosyaların değiştiğini belirlemek için
-    # dosya yolları ve hash değerlerinden oluşan bir manifest gönderilir
-    manifest = {rel: sha1sum(path) for rel, path in files}
-    deploy_resp = requests.post(
-        f"https://api.netlify.com/api/v1/sites/{site_id}/deploys",
-        headers=headers,
-        json={"files": manifest}
-    )
-    if deploy_resp.status_code not in [200, 201]:  # Düzeltildi: != yerine not in
-        print(f"Deploy başlatılırken hata! Kod: {deploy_resp.status_code}")
-        print(deploy_resp.text)
-        return None
+def build_zip(sources):
+    """
+    Dosyalardan bellekte zip arşivi oluşturur
 
-    deploy = deploy_resp.json()
-    required = deploy.get("required", [])  # Netlify'ın istediği dosyaların hash'leri
-    deploy_id = deploy.get("id")  # Deploy işleminin ID'si
-    
-    print(f"Deploy ID: {deploy_id}")
-    print(f"Yüklenmesi gereken dosyalar: {required}")
-
-    # 2. Eksik dosyaları upload et
-    for relpath in required:
-        abspath = None
-        # Hash'e karşılık gelen dosya yolunu bul
-        for file_rel, file_path in files:
-            if sha1sum(file_path) == relpath:
-                abspath = file_path
-                relpath = file_rel
-                break
-        
-        if not abspath:
-            print(f"Hata: {relpath} hash'ine sahip dosya bulunamadı!")
-            continue
-            
-        # Dosyayı API'ye gönder
-        with open(abspath, "rb") as f:
-            put_resp = requests.put(
-                f"https://api.netlify.com/api/v1/deploys/{deploy_id}/files/{relpath}",
-                headers={
-                    "Authorization": f"Bearer {NETLIFY_TOKEN}",
-                    "Content-Type": "application/octet-stream"  # Binary veri gönderimi
-                },
-                data=f
-            )
-            if put_resp.status_code == 200:
-                print(f"Yüklendi: {relpath}")
+    Bellekteki içerikler doğrudan, diskteki dosyalar yerinden okunarak arşive
+    yazılır; geçici dosya veya kopya klasör kullanılmaz.
+
+    Args:
+        sources (dict): Göreceli yol -> içerik (bytes) veya diskteki yol
+
+    Returns:
+        bytes: Zip arşivi
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=ZIP_COMPRESSLEVEL) as archive:
+        for relpath, content in sources.items():
+            if isinstance(content, bytes):
+                archive.writestr(relpath, content)
             else:
-                print(f"Hata: {relpath} -- Kod: {put_resp.status_code}", put_resp.text)
+                archive.write(content, relpath)
+    return buffer.getvalue()
+
+async def upload_required(deploy_id, required, sources, manifest):
+    """
+    Netlify'ın istediği (required) hash'lere sahip dosyaları paralel olarak yükler
 
+    Args:
+        deploy_id (str): Netlify deploy ID'si
+        required (list[str]): Yüklenmesi gereken dosyaların SHA1 hash'leri
+        sources (dict): Göreceli yol -> içerik (bytes) veya diskteki yol
+        manifest (dict): Göreceli yol -> SHA1 hash
+
+    Returns:
+        tuple: (yüklenen dosya sayısı, yüklenmesi gereken dosya sayısı)
+    """
+    # Netlify'ın istediği hash'lerin dosyalarını bulmak için hash -> dosya indeksi (bir kez oluşturulur)
+    sources_by_sha = {}
+    for relpath, sha in manifest.items():
+        sources_by_sha.setdefault(sha, (relpath, sources[relpath]))
+
+    uploads = []
+    for sha in required:
+        if sha not in sources_by_sha:
+            print(f"Hata: {sha} hash'ine sahip dosya bulunamadı!")
+            continue
+        uploads.append(sources_by_sha[sha])
+
+    slots = asyncio.Semaphore(UPLOAD_WORKERS)
+
+    async def upload(relpath, content):
+        async with slots:
+            return await upload_file(deploy_id, relpath, content)
+
+    uploaded = sum(await asyncio.gather(*(upload(*item) for item in uploads)))
+    return uploaded, len(uploads)
+
+async def run_deploy(site_id, manifest, sources, sizes, timings, started, note="", details=None):
+    """
+    Deploy'u başlatır, gereken dosyaları yükler ve site URL'ini döndürür
+
+    Deploy yöntemi choose_deploy_mode ile seçilir:
+    - "files": manifest gönderilir, Netlify'ın istediği dosyalar ayrı ayrı yüklenir
+    - "zip": tüm site tek bir zip arşivi olarak deploys endpoint'ine gönderilir
+
+    Yükleme bitince döner; deploy'un yayına girmesi deploy_tracker ile takip edilir.
+
+    Args:
+        site_id (str): Netlify site ID'si
+        manifest (dict): Göreceli yol -> SHA1 hash
+        sources (dict): Göreceli yol -> içerik (bytes) veya diskteki yol
+        sizes (dict): Göreceli yol -> dosya boyutu (byte)
+        timings (dict): Aşama süreleri (bu fonksiyon create, upload ve site_info ekler)
+        started (float): Deploy'un başlangıç zamanı (time.perf_counter)
+        note (str, optional): Süre loguna eklenecek not
+        details (dict, optional): Verilirse deploy ID'si ve yöntemi bu sözlüğe yazılır
+
+    Returns:
+        str or None: Deploy başarılıysa site URL'i; başlatılamadıysa veya gereken
+            dosyalardan biri yüklenemediyse None
+    """
+    ratio = changed_ratio(site_id, manifest, sizes)
+    mode = choose_deploy_mode(len(manifest), ratio)
+
+    step = time.perf_counter()
+    if mode == "zip":
+        # Zip arşivi CPU ve disk kullandığı için event loop'u bloklamadan thread'de oluşturulur
+        archive = await asyncio.to_thread(build_zip, sources)
+        timings["zip"] = time.perf_counter() - step
+        step = time.perf_counter()
+        deploy_resp = await client.deploy_zip(site_id, archive)
+        timings["upload"] = time.perf_counter() - step
+        if deploy_resp.status_code not in [200, 201]:
+            print(f"Zip deploy hatası! Kod: {deploy_resp.status_code}")
+            print(deploy_resp.text)
+            return None
+        deploy_id = deploy_resp.json().get("id")
+        print(f"Deploy ID: {deploy_id} (zip, {len(archive) / 1024:.0f} KB)")
+        uploaded = required = len(manifest)
+    else:
+        # 1. Deploy başlat: Hash listesi paylaşılır
+        # Netlify'a dosya içeriklerini göndermeden önce hangi dosyaların değiştiğini belirlemek için
+        # dosya yolları ve hash değerlerinden oluşan bir manifest gönderilir
+        deploy_resp = await client.create_deploy(site_id, manifest)
+        if deploy_resp.status_code not in [200, 201]:  # Düzeltildi: != yerine not in
+            print(f"Deploy başlatılırken hata! Kod: {deploy_resp.status_code}")
+            print(deploy_resp.text)
+            return None
+
+        deploy = deploy_resp.json()
+        deploy_id = deploy.get("id")  # Deploy işleminin ID'si
+        timings["create"] = time.perf_counter() - step
+
+        print(f"Deploy ID: {deploy_id}")
+        print(f"Yüklenmesi gereken dosyalar: {deploy.get('required', [])}")
+
+        # 2. Eksik dosyaları upload et
+        step = time.perf_counter()
+        uploaded, required = await upload_required(deploy_id, deploy.get("required", []), sources, manifest)
+        timings["upload"] = time.perf_counter() - step
+
+    if uploaded < required:
+        # Eksik dosyalı deploy Netlify'da hiç yayına girmez; takip edilmez ve başarısız sayılır
+        print(f"❌ Deploy başarısız: {required - uploaded}/{required} dosya yüklenemedi (deploy {deploy_id})")
+        return None
+    last_manifests[site_id] = manifest
+    if details is not None:
+        details.update({"deploy_id": deploy_id, "mode": mode})
+    # Netlify deploy'u bundan sonra işler; yayına girmesi arka planda takip edilir
+    deploy_tracker.track(deploy_id, site_id, mode, started, time.perf_counter())
     print(f"✅ Deploy tamamlandı!")
     
     # Yayın linkini bul ve döndür
-    site_info = requests.get(f"https://api.netlify.com/api/v1/sites/{site_id}", headers=headers)
+    step = time.perf_counter()
+    site_info = await client.get_site(site_id)
+    timings["site_info"] = time.perf_counter() - step
+    timings["total"] = time.perf_counter() - started
+    print(f"Deploy süreleri ({mode}, değişen byte oranı {ratio:.0%}): {len(manifest)} dosya, "
+          f"{uploaded}/{required} yüklendi{note} | "
+          + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings.items()))
     if site_info.status_code == 200:
+        site_setup.remember(site_info.json())  # Onay sırasında site bilgisi yeniden çekilmez
         site_url = site_info.json()["url"]
         print(f"🌐 Site linki: {site_url}")
         return site_url
     return None
 
+async def deploy_files(site_id, files, details=None):
+    """
+    Bellekteki dosyaları diske yazmadan Netlify sitesine deploy eder
+
+    Hash'ler doğrudan içeriklerden hesaplanır ve yüklemelerde aynı içerikler
+    kopyalanmadan gönderilir. Ortak bir klasör kullanılmadığından farklı
+    siteler aynı anda güvenle deploy edilebilir.
+
+    Args:
+        site_id (str): Netlify site ID'si
+        files (dict): Göreceli yol (örn. "index.html") -> dosya içeriği (bytes)
+        details (dict, optional): Verilirse deploy ID'si ve yöntemi bu sözlüğe yazılır
+
+    Returns:
+        str or None: Deploy başarılıysa site URL'i, değilse None
+    """
+    if not files:
+        print("Deploy edilecek dosya yok!")
+        return None
+
+    timings = {}
+    started = time.perf_counter()
+    sources = {relpath.replace("\\", "/").lstrip("/"): content for relpath, content in files.items()}
+    manifest = {relpath: hashlib.sha1(content).hexdigest() for relpath, content in sources.items()}
+    sizes = {relpath: len(content) for relpath, content in sources.items()}
+    timings["hash"] = time.perf_counter() - started
+    return await run_deploy(site_id, manifest, sources, sizes, timings, started, " (bellekten)", details)
+
+async def deploy_directory(site_id, root_dir=DIR, details=None):
+    """
+    Bir klasördeki dosyaları Netlify sitesine deploy eder
+
+    Uygulama içinden yalnızca deploy_to_site html_code olmadan çağrıldığında
+    kullanılır; prompt ve toplu üretim endpoint'leri sayfayı bellekten deploy eder.
+
+    Args:
+        site_id (str): Netlify site ID'si
+        root_dir (str): Deploy edilecek dosyaların bulunduğu klasör
+        details (dict, optional): Verilirse deploy ID'si ve yöntemi bu sözlüğe yazılır
+
+    Returns:
+        str or None: Deploy başarılıysa site URL'i, değilse None
+    """
+    timings = {}
+    started = time.perf_counter()
+    # Dosya tarama ve hash hesaplama diske eriştiği için event loop'u bloklamadan thread'de yapılır
+    manifest, sources, sizes = await asyncio.to_thread(build_manifest, root_dir)
+    if not manifest:
+        print(f"{root_dir} klasöründe deploy edilecek dosya yok!")
+        return None
+    timings["hash"] = time.perf_counter() - started
+    return await run_deploy(site_id, manifest, sources, sizes, timings, started, "", details)
+
+def build_manifest(root_dir):
+    """
+    Klasördeki dosyaların manifest'ini (göreceli yol -> SHA1) oluşturur
+
+    Args:
+        root_dir (str): Dosyaların bulunduğu klasör
+
+    Returns:
+        tuple: (manifest, göreceli yol -> diskteki yol, göreceli yol -> boyut)
+    """
+    manifest = {}
+    sources = {}
+    sizes = {}
+    for rel, path in collect_files(root_dir):  # Tüm dosyaları topla
+        manifest[rel] = sha1sum(path)
+        sources[rel] = path
+        sizes[rel] = os.path.getsize(path)
+    return manifest, sources, sizes
 
-def finalize_site_setup(site_id):
+async def deploy_to_site(site_id, html_code=None, details=None):
+    """
+    Dosyaları Netlify sitesine deploy eder
+    
+    İki deploy yöntemi vardır:
+    - "files" (dosya özeti): dosya listesi ve SHA1 hash'leri gönderilerek hangi
+      dosyaların yüklenmesi gerektiği öğrenilir, sadece gereken dosyalar ortak
+      istemci üzerinden, sınırlı sayıda paralel olarak yüklenir
+    - "zip": tüm site bellekte oluşturulan tek bir zip arşivi olarak gönderilir
+
+    Yöntem NETLIFY_DEPLOY_MODE ortam değişkeniyle seçilir: "files" veya "zip"
+    yöntemi zorlar, varsayılan "auto" ise dosya sayısına ve son deploy'a göre
+    değişen byte oranına bakar (bkz. choose_deploy_mode).
+
+    html_code verilirse index.html doğrudan bellekten deploy edilir (deploy_files);
+    verilmezse DIR klasörünün içeriği deploy edilir (deploy_directory).
+    
+    Args:
+        site_id (str): Netlify site ID'si
+        html_code (str, optional): Eğer verilirse index.html olarak deploy edilir
+        details (dict, optional): Verilirse dosyalar yüklendikten sonra şu anahtarlar
+            yazılır: "deploy_id" (Netlify deploy ID'si) ve "mode" ("files" veya "zip")
+        
+    Returns:
+        str or None: Deploy başarılıysa site URL'i, değilse None
+    """
+    if html_code:
+        return await deploy_files(site_id, {"index.html": html_code.encode("utf-8")}, details)
+    return await deploy_directory(site_id, DIR, details)
+
+
+async def finalize_site_setup(site_id):
     """
     Netlify sitesinin kurulum işlemlerini tamamlar
     
@@ -235,97 +503,16 @@ def finalize_site_setup(site_id):
         return None
         
     try:
-        # Site varlığını kontrol et - geçerli bir site ID'si mi?
-        site_check = requests.get(
-            f"https://api.netlify.com/api/v1/sites/{site_id}", 
-            headers=headers
-        )
-        
-        if site_check.status_code != 200:
-            print(f"Hata: Site bulunamadı (ID: {site_id})")
-            return None
-
-        # 1. HTTPS ayarlarını yapılandır - güvenli bağlantı
-        https_resp = requests.patch(
-            f"https://api.netlify.com/api/v1/sites/{site_id}",
-            headers=headers,
-            json={
-                "ssl": True,  # SSL sertifikası oluştur (Let's Encrypt)
-                "force_ssl": True,  # HTTP isteklerini HTTPS'ye yönlendir
-            }
-        )
-        
-        if https_resp.status_code not in [200, 201, 204]:
-            print(f"SSL yapılandırma hatası: {https_resp.status_code}")
-            print(https_resp.text)
-            return False
-            
-        print("✅ SSL yapılandırması tamamlandı")
-        
-        # 2. Site ayarlarını optimize et - daha iyi performans için
-        optimize_resp = requests.patch(
-            f"https://api.netlify.com/api/v1/sites/{site_id}",
-            headers=headers,
-            json={
-                "processing_settings": {
-                    "html": {
-                        "pretty_urls": True,  # .html uzantılarını gizle (örn. /about.html → /about)
-                    },
-                    "css": {
-                        "bundle": True,  # CSS dosyalarını tek dosya haline getir (daha az HTTP isteği)
-                        "minify": True   # CSS dosyalarını küçült (boşlukları ve yorumları kaldır)
-                    },
-                    "js": {
-                        "bundle": True,  # JS dosyalarını tek dosya haline getir
-                        "minify": True   # JS dosyalarını küçült
-                    },
-                    "images": {
-                        "optimize": True  # Görüntüleri sıkıştır ve optimize et
-                    }
-                }
-            }
-        )
-        
-        if optimize_resp.status_code not in [200, 201, 204]:
-            print(f"Site optimizasyon hatası: {optimize_resp.status_code}")
-            print(optimize_resp.text)
-            return False
-            
-        print("✅ Site optimizasyonu tamamlandı")
-        
-        # 3. Site bilgilerini al (güncel URL ve deploy ID için)
-        site_info = requests.get(
-            f"https://api.netlify.com/api/v1/sites/{site_id}", 
-            headers=headers
-        )
-        
-        if site_info.status_code == 200:
-            site_data = site_info.json()
-            site_url = site_data["url"]
-            site_name = site_data["name"]
-            
-            # 4. En son deploy'u "production" durumuna yükselt
-            # Bu, deploy'un önbelleğe alınmasını ve CDN üzerinde dağıtılmasını sağlar
-            deploy_resp = requests.post(
-                f"https://api.netlify.com/api/v1/sites/{site_id}/deploys/{site_data['deploy_id']}/restore",
-                headers=headers
-            )
-            
-            if deploy_resp.status_code in [200, 201, 204]:
-                print("✅ Deploy production'a yükseltildi")
-            
-            print(f"🌐 Site kurulumu tamamlandı: {site_url}")
-            return site_url
-        else:
-            print(f"Site bilgileri alınamadı: {site_info.status_code}")
-            return None
-            
+        # Ayarlar tek PATCH'te birleştirilir, deploy yükseltme ile eş zamanlı yapılır;
+        # site zaten istenen durumdaysa ilgili adımlar atlanır (bkz. SiteSetup)
+        site_url, _ = await site_setup.run(site_id)
+        return site_url
     except Exception as e:
         print(f"Site kurulum hatası: {str(e)}")
         return None
     
 
-def add_custom_domain(site_id, domain):
+async def add_custom_domain(site_id, domain):
     """
     Netlify sitesine özel domain ekler ve birincil domain olarak ayarlar
     
@@ -345,21 +532,14 @@ def add_custom_domain(site_id, domain):
     """
     try:
         # Domaini ekle
-        domain_resp = requests.post(
-            f"https://api.netlify.com/api/v1/sites/{site_id}/domains",
-            headers=headers,
-            json={"hostname": domain}  # Eklenecek domain adı
-        )
+        domain_resp = await client.add_domain(site_id, domain)  # Eklenecek domain adı
         
         if domain_resp.status_code in [200, 201]:
             print(f"✅ Domain eklendi: {domain}")
             
             # Domain'i birincil domain olarak ayarla
             # Bu, Netlify'ın *.netlify.app domaini yerine bu özel domaini ana URL olarak kullanmasını sağlar
-            primary_resp = requests.post(
-                f"https://api.netlify.com/api/v1/sites/{site_id}/domain_aliases/{domain}/primary",
-                headers=headers
-            )
+            primary_resp = await client.set_primary_domain(site_id, domain)
             
             if primary_resp.status_code in [200, 201, 204]:
                 print(f"✅ {domain} birincil domain olarak ayarlandı")
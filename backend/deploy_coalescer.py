@@ -0,0 +1,88 @@
+import asyncio
+
+
+class DeployCoalescer:
+    """
+    Aynı siteye art arda gelen deploy'ları birleştiren kuyruk
+
+    Her site için aynı anda yalnızca bir deploy çalışır. Bir site deploy
+    edilirken gelen yeni sürüm bekleyen sürümün yerine geçer; böylece deploy
+    bittiğinde yalnızca en son sürüm yüklenir, aradaki sürümler hiç
+    gönderilmez. Yerine geçilen sürümü bekleyen istekler en son sürümün
+    deploy sonucunu alır.
+
+    Args:
+        deploy_fn (callable): async deploy_fn(key, payload) - deploy'u yapan ve sonucunu döndüren fonksiyon
+    """
+
+    def __init__(self, deploy_fn):
+        self.deploy_fn = deploy_fn
+        self.pending = {}   # anahtar -> {"payload": en son sürüm, "futures": sonucu bekleyenler}
+        self.running = {}   # anahtar -> deploy'ları sırayla çalıştıran task
+        self.submitted = 0
+        self.deploys = 0
+        self.superseded = 0
+
+    async def submit(self, key, payload):
+        """
+        Deploy'u sıraya koyar ve sonucunu bekler
+
+        Args:
+            key (str): Deploy'ların birleştirileceği anahtar (site ID'si)
+            payload: deploy_fn'e verilecek içerik
+
+        Returns:
+            deploy_fn'in sonucu (bu sürüm yerine daha yeni bir sürüm deploy edildiyse onun sonucu)
+
+        Raises:
+            ValueError: Anahtar boşsa (farklı sitelerin deploy'ları birbirinin yerine geçmesin)
+        """
+        if not key:
+            raise ValueError("Deploy anahtarı (site ID'si) boş olamaz.")
+        self.submitted += 1
+        future = asyncio.get_running_loop().create_future()
+        slot = self.pending.get(key)
+        if slot is not None:
+            # Henüz başlamamış eski sürüm atlanır, bekleyenleri yeni sürümün sonucunu alır
+            self.superseded += 1
+            print(f"⏭️ {key} için bekleyen deploy daha yeni sürümle değiştirildi")
+            slot["payload"] = payload
+            slot["futures"].append(future)
+        else:
+            self.pending[key] = {"payload": payload, "futures": [future]}
+        if key not in self.running:
+            self.running[key] = asyncio.ensure_future(self._drain(key))
+        return await future
+
+    async def _drain(self, key):
+        try:
+            while key in self.pending:
+                slot = self.pending.pop(key)
+                self.deploys += 1
+                try:
+                    result = await self.deploy_fn(key, slot["payload"])
+                except Exception as e:
+                    for future in slot["futures"]:
+                        if not future.done():
+                            future.set_exception(e)
+                else:
+                    for future in slot["futures"]:
+                        if not future.done():  # İstemci bağlantıyı kapattıysa future iptal edilmiştir
+                            future.set_result(result)
+        finally:
+            del self.running[key]
+
+    def stats(self):
+        """
+        Birleştirme istatistiklerini döndürür
+
+        Returns:
+            dict: Gelen istek, yapılan deploy ve atlanan sürüm sayıları, birleştirme oranı
+        """
+        return {
+            "submitted": self.submitted,
+            "deploys": self.deploys,
+            "superseded": self.superseded,
+            "coalescing_ratio": self.superseded / self.submitted if self.submitted else 0.0,
+            "in_flight": len(self.running),
+        }
@@ -0,0 +1,240 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+# Deploy takibi açık mı (benchmark'larda ve sahte API ile çalışırken kapatılabilir)
+TRACKING_ENABLED = os.environ.get("DEPLOY_TRACKING", "1") == "1"
+
+# Deploy durumu sorgulama aralıkları (saniye): ilk bekleme, her sorguda çarpan ve üst sınır.
+# Webhook bildirimleri açıksa sorgulama yalnızca yedek olarak daha seyrek yapılır
+POLL_INITIAL = float(os.environ.get("DEPLOY_POLL_INITIAL", 0.5))
+POLL_BACKOFF = 1.5
+POLL_MAX = float(os.environ.get("DEPLOY_POLL_MAX", 5))
+POLL_MAX_WITH_WEBHOOK = 30.0
+
+# Deploy'un hazır olması en fazla ne kadar beklenecek (saniye)
+READY_TIMEOUT = float(os.environ.get("DEPLOY_READY_TIMEOUT", 300))
+
+# Netlify deploy bildirimlerinin (outgoing webhook) JWS imza anahtarı - boşsa webhook kullanılmaz.
+# Netlify'da Site settings > Deploy notifications altında "Deploy succeeded" ve "Deploy failed"
+# bildirimleri /api/netlify/deploy_hook adresine yönlendirilmelidir
+WEBHOOK_SECRET = os.environ.get("NETLIFY_WEBHOOK_SECRET", "")
+
+# Saklanacak en fazla deploy kaydı
+MAX_RECORDS = 200
+
+# Yeni sürümün yayında olduğu ve deploy'un başarısız olduğu durumlar
+READY_STATES = {"ready"}
+FAILED_STATES = {"error", "rejected"}
+
+
+def b64url_decode(text):
+    """Base64url (padding'siz) metni çözer"""
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def verify_signature(body, signature, secret=WEBHOOK_SECRET):
+    """
+    Netlify webhook isteğinin X-Webhook-Signature (JWS, HS256) imzasını doğrular
+
+    Args:
+        body (bytes): İsteğin ham gövdesi
+        signature (str): X-Webhook-Signature başlığı
+        secret (str): Netlify'da tanımlı JWS anahtarı
+
+    Returns:
+        bool: İmza ve gövde hash'i geçerliyse True
+    """
+    try:
+        header, payload, sig = signature.split(".")
+        expected = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, b64url_decode(sig)):
+            return False
+        claims = json.loads(b64url_decode(payload))
+    except (AttributeError, ValueError):
+        return False
+    return claims.get("iss") == "netlify" and claims.get("sha256") == hashlib.sha256(body).hexdigest()
+
+
+class DeployTracker:
+    """
+    Deploy'ların Netlify'da işlenip yayına girmesini takip eder
+
+    Dosyalar yüklendikten sonra Netlify deploy'u işler (processing) ve ancak
+    "ready" durumunda yeni sürüm yayına girer. Her deploy için arka planda bir
+    task durumu artan aralıklarla (adaptive backoff) sorgular; Netlify deploy
+    bildirimi (webhook) gelirse task hemen uyanır ve sorgu beklemeden sonuç
+    kaydedilir. Yükleme, işleme ve toplam hazır olma süreleri saklanır.
+
+    Args:
+        fetch (callable): async fetch(deploy_id) - deploy bilgisini döndüren (httpx.Response) fonksiyon
+    """
+
+    def __init__(self, fetch, max_records=MAX_RECORDS):
+        self.fetch = fetch
+        self.max_records = max_records
+        self.enabled = TRACKING_ENABLED
+        self.records = OrderedDict()  # deploy ID -> kayıt
+        self.latest = {}              # site ID -> son deploy ID
+        self.events = {}              # deploy ID -> sonuçlanınca set edilen asyncio.Event
+        self.tasks = {}
+        self.webhooks = 0
+
+    def track(self, deploy_id, site_id, mode, started, uploaded):
+        """
+        Yüklemesi biten bir deploy'u takibe alır
+
+        Args:
+            deploy_id (str): Netlify deploy ID'si
+            site_id (str): Netlify site ID'si
+            mode (str): Deploy yöntemi ("files" veya "zip")
+            started (float): Deploy'un başlangıç zamanı (time.perf_counter)
+            uploaded (float): Yüklemenin bittiği zaman (time.perf_counter)
+        """
+        if not self.enabled or not deploy_id:
+            return
+        self.records[deploy_id] = {
+            "id": deploy_id,
+            "site_id": site_id,
+            "mode": mode,
+            "state": "uploaded",
+            "started_at": datetime.now().isoformat(),
+            "timings": {"upload": uploaded - started, "processing": None, "ready": None},
+            "polls": 0,
+            "source": None,
+            "error_message": None,
+            "_started": started,
+            "_uploaded": uploaded,
+        }
+        self.latest[site_id] = deploy_id
+        self.events[deploy_id] = asyncio.Event()
+        while len(self.records) > self.max_records:
+            old_id, _ = self.records.popitem(last=False)
+            self.events.pop(old_id, None)
+        self.tasks[deploy_id] = asyncio.ensure_future(self._poll(deploy_id))
+
+    def _finished(self, deploy_id):
+        record = self.records.get(deploy_id)
+        return record is None or record["state"] in READY_STATES | FAILED_STATES | {"timeout"}
+
+    def _update(self, deploy_id, state, source, error_message=None):
+        record = self.records.get(deploy_id)
+        if record is None or self._finished(deploy_id) or not state:
+            return
+        record["state"] = state
+        if state in READY_STATES | FAILED_STATES or state == "timeout":
+            now = time.perf_counter()
+            record["source"] = source
+            record["error_message"] = error_message
+            if state in READY_STATES:
+                record["timings"]["processing"] = now - record["_uploaded"]
+                record["timings"]["ready"] = now - record["_started"]
+                print(f"✅ Deploy yayında: {deploy_id} ({record['timings']['ready']:.1f} sn, {source})")
+            else:
+                print(f"Deploy yayına alınamadı: {deploy_id} -- {state} {error_message or ''}")
+            self.events[deploy_id].set()
+
+    async def _poll(self, deploy_id):
+        delay = POLL_INITIAL
+        max_delay = POLL_MAX_WITH_WEBHOOK if WEBHOOK_SECRET else POLL_MAX
+        deadline = time.monotonic() + READY_TIMEOUT
+        try:
+            while not self._finished(deploy_id):
+                if time.monotonic() >= deadline:
+                    self._update(deploy_id, "timeout", "poll", "Deploy zamanında hazır olmadı")
+                    break
+                try:
+                    # Webhook bildirimi gelirse beklemeden uyanılır
+                    await asyncio.wait_for(self.events[deploy_id].wait(), delay)
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                try:
+                    resp = await self.fetch(deploy_id)
+                except Exception as e:
+                    print(f"Deploy durumu alınamadı ({deploy_id}): {e}")
+                else:
+                    if deploy_id in self.records:
+                        self.records[deploy_id]["polls"] += 1
+                    if resp.status_code == 200:
+                        data = resp.json()
+                        self._update(deploy_id, data.get("state"), "poll", data.get("error_message"))
+                    elif resp.status_code == 404:
+                        self._update(deploy_id, "error", "poll", "Deploy bulunamadı")
+                delay = min(max_delay, delay * POLL_BACKOFF)
+        finally:
+            self.tasks.pop(deploy_id, None)
+
+    def notify(self, payload):
+        """
+        Netlify deploy bildirimini (webhook gövdesi) işler
+
+        Args:
+            payload (dict): Netlify'ın gönderdiği deploy nesnesi
+
+        Returns:
+            bool: Bildirim takip edilen bir deploy'a aitse True
+        """
+        deploy_id = payload.get("id")
+        if deploy_id not in self.records:
+            return False
+        self.webhooks += 1
+        self._update(deploy_id, payload.get("state"), "webhook", payload.get("error_message"))
+        return True
+
+    def get(self, deploy_id):
+        """
+        Deploy kaydını döndürür
+
+        Returns:
+            dict or None: Durum ve süreler (upload, processing, ready), kayıt yoksa None
+        """
+        record = self.records.get(deploy_id)
+        if record is None:
+            return None
+        return {key: (dict(value) if key == "timings" else value)
+                for key, value in record.items() if not key.startswith("_")}
+
+    async def wait(self, deploy_id, timeout):
+        """
+        Deploy sonuçlanana (yayına girene veya başarısız olana) kadar en fazla timeout saniye bekler
+
+        Returns:
+            dict or None: Deploy kaydı (bkz. get)
+        """
+        event = self.events.get(deploy_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.get(deploy_id)
+
+    def latest_id(self, site_id):
+        """Sitenin takip edilen son deploy'unun ID'si (yoksa None)"""
+        return self.latest.get(site_id)
+
+    def stats(self):
+        """
+        Takip istatistiklerini döndürür
+
+        Returns:
+            dict: Takip edilen, yayına giren, başarısız ve bekleyen deploy sayıları, ortalama süreler
+        """
+        records = list(self.records.values())
+        ready = [r for r in records if r["state"] in READY_STATES]
+        return {
+            "tracked": len(records),
+            "ready": len(ready),
+            "failed": sum(r["state"] in FAILED_STATES | {"timeout"} for r in records),
+            "pending": len(self.tasks),
+            "webhooks": self.webhooks,
+            "avg_processing_seconds": sum(r["timings"]["processing"] for r in ready) / len(ready) if ready else None,
+            "avg_ready_seconds": sum(r["timings"]["ready"] for r in ready) / len(ready) if ready else None,
+        }
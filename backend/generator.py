@@ -1,28 +1,603 @@
+import hashlib
+import html
+import json
 import os
 import re
-from llama_cpp import Llama
+import threading
+import time
+from llama_cpp import Llama, LlamaGrammar
+from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+
+import html_patch
+from html_extract import HtmlExtractor, extract_html
+from prompt_cache import PromptStateCache
+from llama_server import LlamaServer, SERVER_MODEL
+from result_cache import ResultCache
+from token_budget import TokenCounter, compact_prompts, completion_budget
 
 # Model yolu - doğru yolu kullanın ve raw string (r"...") olarak tanımlayın
 # Raw string kullanımı Windows path'lerindeki ters slash (\) karakterlerinin escape karakter olarak algılanmasını önler
 MODEL_PATH = "model yolu"
 
 
-# Model yükleme - uygulama başladığında bir kere yapılır
-# Bu adım önemlidir çünkü her istek için modeli tekrar yüklemek performans açısından verimsiz olur
-print("Model yükleniyor...")
-try:
-    model = Llama(
-        model_path=MODEL_PATH,
-        n_ctx=4096,       # Context size - modelin bir seferde işleyebileceği token sayısı
-        n_gpu_layers=-1,  # Tüm GPU katmanlarını kullan (-1 parametresi tüm katmanları GPU'ya yükler)
-        verbose=True      # Verbose çıktı - yükleme sürecinde detaylı bilgi verir
-    )
-    print("Model başarıyla yüklendi!")
-except Exception as e:
-    # Model yükleme hatası durumunda fallback mekanizmasını devreye sokmak için
-    print(f"Model yükleme hatası: {e}")
-    model = None
-    print("Model yüklenemedi, alternatif yöntem kullanılacak.")
+# Model başına kullanılacak CPU thread sayısı - None ise llama.cpp kendisi belirler
+# Worker havuzu kullanıldığında her süreç çekirdeklerin bir kısmını alır
+N_THREADS = int(os.environ.get("LLAMA_N_THREADS", 0)) or None
+
+# Model dosyası belleğe mmap ile eşlensin mi / bellekte kilitlensin mi (swap'e düşmesin)
+USE_MMAP = os.environ.get("LLAMA_USE_MMAP", "1") == "1"
+USE_MLOCK = os.environ.get("LLAMA_USE_MLOCK", "0") == "1"
+
+# Prompt-lookup speculative decoding - revizyonlarda çıktı büyük ölçüde önceki sayfanın
+# kopyası olduğundan taslak token'lar prompt'taki n-gram'lardan alınır. llama-cpp-python
+# bunun için tüm pozisyonların logit'lerini tutar (logits_all); bu her istekte ek bellek ve
+# işlem süresi harcar ve save_state anlık görüntülerini büyütür. "1" açar, "0" kapatır;
+# varsayılan "auto" ise model yüklendikten sonra en az SPECULATIVE_MIN_FREE_RAM_BYTES boş
+# RAM kalıyorsa açar (bkz. speculative_enabled). Açıkken önceki HTML'i olan her üretimde kullanılır.
+SPECULATIVE_MODE = os.environ.get("LLAMA_SPECULATIVE", "auto")
+SPECULATIVE_MIN_FREE_RAM_BYTES = int(os.environ.get("LLAMA_SPECULATIVE_MIN_FREE_RAM_BYTES", 4 * 1024 ** 3))
+SPECULATIVE_DECODING = SPECULATIVE_MODE == "1"  # load_model modele göre günceller
+PROMPT_LOOKUP_TOKENS = int(os.environ.get("LLAMA_PROMPT_LOOKUP_TOKENS", 10))  # Adım başına taslak token
+
+# Model yüklenirken gelen isteklerin yüklemenin bitmesini en fazla ne kadar bekleyeceği (saniye)
+MODEL_LOAD_TIMEOUT = float(os.environ.get("MODEL_LOAD_TIMEOUT", 600))
+
+# Context boyutu - prompt ve üretilen token'lar birlikte bu sınıra sığmalıdır
+CONTEXT_TOKENS = int(os.environ.get("LLAMA_N_CTX", 4096))
+
+# Tam sayfa üretiminde çıktıya bırakılacak en az token - prompt geçmişi bu payı
+# bırakacak şekilde sıkıştırılır, max_tokens ise context'te kalan yere göre seçilir
+MIN_COMPLETION_TOKENS = int(os.environ.get("LLAMA_MIN_COMPLETION_TOKENS", 2500))
+
+# Chat şablonunun (rol etiketleri vb.) prompt'a eklediği token'lar için ayrılan pay
+CHAT_TEMPLATE_TOKENS = 32
+
+# Üretilen HTML'in debug için ortak website/index.html dosyasına da yazılması (varsayılan kapalı).
+# Deploy'lar HTML'i doğrudan bellekten gönderir; kalıcı kopya site bazında data/html'de tutulur
+SAVE_LOCAL_HTML = os.environ.get("SAVE_LOCAL_HTML", "0") == "1"
+
+model = None
+
+# Model yükleme durumu - yükleme arka planda yapılır, istekler bu olayları bekler
+model_loaded = threading.Event()  # Yükleme denemesi bitti (başarılı veya başarısız)
+model_ready = threading.Event()   # Model yüklendi ve warm-up çıkarımı tamamlandı
+load_thread = None
+load_stats = {"load_seconds": None, "warmup_seconds": None, "error": None}
+
+def load_model(n_threads=N_THREADS):
+    """
+    GGUF modelini yükler, warm-up çıkarımı yapar ve modül seviyesindeki model değişkenine atar
+
+    Yükleme başarısız olursa model None olarak kalır ve fallback yöntemi kullanılır.
+    Warm-up, ilk gerçek isteğin ağırlıkların diskten sayfalanmasını beklememesi içindir.
+
+    Args:
+        n_threads (int, optional): Modelin kullanacağı CPU thread sayısı
+
+    Returns:
+        Llama or None: Yüklenen model
+    """
+    global model, SPECULATIVE_DECODING
+    print("Model yükleniyor...")
+    started = time.perf_counter()
+    SPECULATIVE_DECODING = speculative_enabled()
+    try:
+        loaded = Llama(
+            model_path=MODEL_PATH,
+            n_ctx=CONTEXT_TOKENS,  # Context size - modelin bir seferde işleyebileceği token sayısı
+            n_gpu_layers=-1,  # Tüm GPU katmanlarını kullan (-1 parametresi tüm katmanları GPU'ya yükler)
+            n_threads=n_threads,  # Model başına CPU thread sayısı
+            use_mmap=USE_MMAP,    # Model dosyasını belleğe eşle (hızlı yükleme, paylaşılan sayfalar)
+            use_mlock=USE_MLOCK,  # Model ağırlıklarını RAM'de kilitle
+            logits_all=SPECULATIVE_DECODING,  # Speculative decoding taslak doğrulaması için gerekli (yalnızca açıkken)
+            verbose=True      # Verbose çıktı - yükleme sürecinde detaylı bilgi verir
+        )
+        load_stats["load_seconds"] = time.perf_counter() - started
+        print(f"Model başarıyla yüklendi! ({load_stats['load_seconds']:.1f} sn)")
+
+        # Warm-up: tek token'lık bir çıkarım ile modeli ilk isteğe hazırla
+        warmup_started = time.perf_counter()
+        loaded.create_completion("<!DOCTYPE html>", max_tokens=1)
+        load_stats["warmup_seconds"] = time.perf_counter() - warmup_started
+        print(f"Model warm-up tamamlandı ({load_stats['warmup_seconds']:.1f} sn)")
+
+        model = loaded
+        token_counter.tokenize = lambda text: loaded.tokenize(text.encode("utf-8"), add_bos=False)
+        model_ready.set()
+    except Exception as e:
+        # Model yükleme hatası durumunda fallback mekanizmasını devreye sokmak için
+        print(f"Model yükleme hatası: {e}")
+        load_stats["error"] = str(e)
+        model = None
+        print("Model yüklenemedi, alternatif yöntem kullanılacak.")
+    finally:
+        model_loaded.set()
+    return model
+
+def start_background_load(n_threads=N_THREADS):
+    """
+    Modeli arka plandaki bir thread'de yüklemeye başlar (birden fazla çağrılırsa etkisizdir)
+
+    Args:
+        n_threads (int, optional): Modelin kullanacağı CPU thread sayısı
+    """
+    global load_thread
+    if load_thread is None:
+        load_thread = threading.Thread(target=load_model, args=(n_threads,), name="model-loader", daemon=True)
+        load_thread.start()
+
+def wait_for_model(timeout=MODEL_LOAD_TIMEOUT):
+    """
+    Model yüklemesinin bitmesini bekler, yükleme başlamadıysa başlatır
+
+    Args:
+        timeout (float): Maksimum bekleme süresi (saniye)
+
+    Returns:
+        Llama or None: Yüklenen model (yükleme başarısızsa veya süre dolduysa None)
+    """
+    if not model_loaded.is_set():
+        start_background_load()
+        print("Model yüklemesi bekleniyor...")
+        model_loaded.wait(timeout)
+    return model
+
+def readiness():
+    """
+    Model yükleme durumunu döndürür
+
+    Returns:
+        dict: Hazır olma durumu, yükleme/warm-up süreleri ve varsa hata
+    """
+    return {
+        "ready": model_ready.is_set(),
+        "loading": load_thread is not None and not model_loaded.is_set(),
+        **load_stats
+    }
+
+# Prompt'un sonuna eklenen sabit talimat metni
+# Bu ekleme, modele daha net talimatlar vererek istenen çıktıyı alma olasılığını artırır
+INSTRUCTION_SUFFIX = (
+    "Lütfen tam ve çalışan bir HTML kodu ile cevap ver. "
+    "Kodu tam ve eksiksiz olarak yaz. <!DOCTYPE html> ile başla ve tüm HTML, CSS, JavaScript kodunu içer. "
+    "Sayfayı responsive tasarla ve modern tasarım prensiplerini kullan. "
+    "Açıklamalar veya gerekçeler ekleme, doğrudan çalışan kodu ver."
+)
+
+# Revizyon (düzenleme) modunda mevcut HTML ve yeni revizyonla birlikte gönderilen talimat
+# Model sayfayı baştan yazmak yerine yalnızca değişen kısımları döndürür
+EDIT_INSTRUCTION = (
+    "Yukarıda mevcut web sayfasının HTML kodu ve yapılması istenen değişiklik var. "
+    "Sayfayı baştan yazma. Sadece değişmesi gereken kısımları aşağıdaki formatta ver:\n"
+    "<<<<<<< ARA\n(mevcut koddan birebir kopyalanmış, değişecek kısım)\n=======\n"
+    "(yerine gelecek yeni kod)\n>>>>>>> DEGISTIR\n"
+    "Birden fazla yer değişecekse her biri için ayrı blok yaz. ARA kısmı mevcut kodda "
+    "tam olarak bir kez geçmeli. Açıklama ekleme, sadece blokları ver."
+)
+
+# Revizyon modunda üretilecek maksimum token sayısı - çıktı sadece değişikliklerden oluşur
+EDIT_MAX_TOKENS = 1500
+
+# Tam sayfa üretiminde </html> yazıldığı anda üretim durdurulur; sonrasındaki açıklamalara token harcanmaz
+# (llama-cpp-python durdurma dizisini çıktıdan çıkardığı için kapanış etiketi sonradan geri eklenir)
+HTML_STOP_SEQUENCES = ["</html>", "</HTML>"]
+
+# Grammar modu açıksa çıktı GBNF grammar ile <!DOCTYPE html> ile başlamaya zorlanır,
+# böylece HTML öncesi açıklama metnine de token harcanmaz
+HTML_GRAMMAR_MODE = os.environ.get("LLAMA_HTML_GRAMMAR", "0") == "1"
+HTML_GBNF = r"""
+root ::= "<!DOCTYPE html>" rest
+rest ::= [^\x00]*
+"""
+
+# Bölüm bazlı (section-parallel) üretimde kullanılan talimatlar ve token sınırları
+SECTION_PLAN_INSTRUCTION = (
+    "Yukarıdaki istek için bir web sayfası bölüm planı çıkar. Sadece şu formatta JSON ver, açıklama ekleme:\n"
+    '{"title": "sayfa başlığı", "theme": {"primary": "#renk", "secondary": "#renk", '
+    '"background": "#renk", "font": "yazı tipi"}, "sections": [{"id": "hero", "description": "bölümün içeriği"}]}\n'
+    "Bölüm id'leri küçük harf ve tire içersin (örn. topbar, navbar, hero, skills, projects, contact, footer)."
+)
+SECTION_INSTRUCTION = (
+    "Sadece bu bölümün HTML kodunu ver: tek bir <header>, <nav>, <section> veya <footer> elemanı. "
+    "<!DOCTYPE>, <html>, <head> veya <body> yazma. Bölüme özel stiller gerekiyorsa tek bir <style> "
+    "bloğunda ver ve tüm sınıf adlarını bölüm id'si ile başlat. Renkler için var(--primary), "
+    "var(--secondary), var(--background) CSS değişkenlerini kullan. Açıklama ekleme."
+)
+SHARED_CSS_INSTRUCTION = (
+    "Bu sayfanın tüm bölümlerinin paylaşacağı ortak CSS'i yaz: :root içinde --primary, --secondary, "
+    "--background değişkenleri, reset, tipografi, .container, buton ve responsive kurallar. "
+    "Sadece CSS kodunu ver, <style> etiketi veya açıklama ekleme."
+)
+SECTION_PLAN_MAX_TOKENS = 400
+SECTION_MAX_TOKENS = 1200
+SHARED_CSS_MAX_TOKENS = 800
+
+# Plan üretilemezse kullanılacak varsayılan bölümler
+DEFAULT_SECTIONS = [
+    {"id": "navbar", "description": "Logo ve menü bağlantıları içeren gezinme çubuğu"},
+    {"id": "hero", "description": "Başlık, kısa açıklama ve harekete geçirici buton içeren giriş bölümü"},
+    {"id": "features", "description": "İsteğe uygun öne çıkan içerik kartları"},
+    {"id": "contact", "description": "İletişim bilgileri ve form"},
+    {"id": "footer", "description": "Telif hakkı ve bağlantılar içeren alt bilgi"},
+]
+
+# Chat completion çağrılarında kullanılan örnekleme parametreleri
+SAMPLING_PARAMS = {
+    "temperature": 0.7,        # Yaratıcılık parametresi (0-1 arası)
+    "max_tokens": 4000,        # Üretilecek maksimum token sayısı
+    "repeat_penalty": 1.1,     # Tekrarları önlemek için ceza faktörü
+    "top_k": 40,               # Olasılık dağılımında dikkate alınacak en iyi k token
+    "top_p": 0.95,             # Nucleus sampling parametresi, çeşitliliği kontrol eder
+}
+
+# Site bazında model durumu (KV-cache) önbelleği - revizyonlarda prompt'un
+# yalnızca yeni eklenen kısmının değerlendirilmesini sağlar
+state_cache = PromptStateCache()
+loaded_site = None  # Modelin belleğinde şu an durumu bulunan site
+
+# Aynı prompt geçmişi ve parametrelerle üretilmiş HTML sonuçlarının önbelleği
+result_cache = ResultCache()
+
+# Model bu süreçte yüklenemezse kullanılan, arka planda sürekli çalışan llama.cpp sunucusu
+# (LLAMA_SERVER_MODEL ile farklı bir model, LLAMA_SERVER_URL ile ayrı çalışan bir sunucu kullanılabilir)
+fallback_server = LlamaServer(SERVER_MODEL or MODEL_PATH, CONTEXT_TOKENS)
+
+# Model tokenizer'ı ile token sayacı - revizyonların sayıları önbellekte tutulur
+token_counter = TokenCounter()
+
+# Bu süreçte son işten beri yapılan isteklerin token kayıtları (worker_pool.drain ile toplanır)
+usage_log = []
+
+def fit_prompts(prompts, completion_tokens, instruction=""):
+    """
+    Prompt geçmişini üretime completion_tokens kadar yer kalacak şekilde sıkıştırır
+
+    Args:
+        prompts (list[str]): Kullanıcı promptları listesi
+        completion_tokens (int): Çıktıya bırakılacak token sayısı
+        instruction (str): Geçmişle birlikte gönderilecek sabit talimat metni
+
+    Returns:
+        tuple: (sıkıştırılmış prompt listesi, sıkıştırma yapıldı mı (bool))
+    """
+    budget = CONTEXT_TOKENS - completion_tokens - CHAT_TEMPLATE_TOKENS - token_counter.count(instruction)
+    history, info = compact_prompts(prompts, budget, token_counter.count)
+    compacted = history != list(prompts)
+    if compacted:
+        print(f"Prompt geçmişi sıkıştırıldı: {info['original_tokens']} -> {info['tokens']} token "
+              f"(bütçe {budget}; {info['merged']} revizyon birleştirildi, {info['summarized']} özetlendi, "
+              f"{info['dropped']} atıldı)")
+    return history, compacted
+
+def completion_overrides(content, overrides):
+    """
+    İstek parametrelerine context'te kalan yere göre seçilen max_tokens değerini ekler
+
+    Args:
+        content (str): Kullanıcı mesajı
+        overrides (dict): SAMPLING_PARAMS üzerine yazılacak parametreler
+
+    Returns:
+        tuple: (prompt token sayısı, güncellenmiş parametreler)
+
+    Raises:
+        ValueError: Prompt context'e sığmıyorsa
+    """
+    prompt_tokens = token_counter.count(content, cache=False)
+    requested = overrides.get("max_tokens", SAMPLING_PARAMS["max_tokens"])
+    max_tokens = completion_budget(prompt_tokens, CONTEXT_TOKENS, requested, CHAT_TEMPLATE_TOKENS)
+    if max_tokens <= 0:
+        raise ValueError(f"Prompt ({prompt_tokens} token) context boyutuna ({CONTEXT_TOKENS}) sığmıyor.")
+    return prompt_tokens, {**overrides, "max_tokens": max_tokens}
+
+def record_usage(kind, prompt_tokens, completion_tokens, max_tokens, compacted):
+    """
+    Bir isteğin prompt ve completion token sayılarını kaydeder ve loglar
+
+    Args:
+        kind (str): İstek türü (html, revision, stream, section_plan, section, css)
+        prompt_tokens (int): Prompt token sayısı
+        completion_tokens (int): Üretilen token sayısı
+        max_tokens (int): İstekte kullanılan max_tokens
+        compacted (bool): Prompt geçmişi sıkıştırıldı mı?
+
+    Returns:
+        dict: Eklenen kayıt
+    """
+    record = {"kind": kind, "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+              "max_tokens": max_tokens, "compacted": compacted, "time": time.time()}
+    usage_log.append(record)
+    print(f"Token kullanımı [{kind}]: prompt {prompt_tokens}, completion {completion_tokens}/{max_tokens}"
+          f"{' (sıkıştırılmış geçmiş)' if compacted else ''}")
+    return record
+
+def drain_usage():
+    """
+    Son çağrıdan beri kaydedilen token kayıtlarını döndürür ve listeyi temizler
+
+    Returns:
+        list[dict]: record_usage kayıtları
+    """
+    global usage_log
+    records, usage_log = usage_log, []
+    return records
+
+def process_stats():
+    """
+    Bu süreçteki önbelleklerin istatistiklerini döndürür
+
+    Worker havuzu açıkken her worker kendi sayaçlarını tutar; bu özet her işten
+    sonra API sürecine gönderilir ve orada birleştirilir (bkz. worker_pool.process_stats).
+
+    Returns:
+        dict: Model durumu (prompt_state) ve üretim sonucu (results) önbelleklerinin,
+            decode modlarının (decoding), token tasarrufunun (token_savings) ve
+            llama-server yedeğinin (llama_server) istatistikleri
+    """
+    return {"prompt_state": state_cache.stats(), "results": result_cache.stats(),
+            "decoding": decoding_stats, "token_savings": token_savings,
+            "llama_server": fallback_server.stats()}
+
+class CountingPromptLookup(LlamaPromptLookupDecoding):
+    """
+    Önerdiği taslak token sayısını sayan prompt-lookup taslak modeli
+
+    Llama her decode adımında taslak modeli bir kez çağırır ve her adım en az bir
+    token üretir. Kabul edilen taslak token sayısı doğrudan ölçülemediği için
+    (üretilen token - adım sayısı) olarak tahmin edilir.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0     # Decode adımı (taslak modeli çağrısı) sayısı
+        self.drafted = 0   # Önerilen toplam taslak token
+
+    def __call__(self, input_ids, *args, **kwargs):
+        draft = super().__call__(input_ids, *args, **kwargs)
+        self.calls += 1
+        self.drafted += len(draft)
+        return draft
+
+# Decode moduna göre birikimli üretim istatistikleri
+decoding_stats = {
+    "standard": {"requests": 0, "tokens": 0, "seconds": 0.0},
+    "prompt_lookup": {"requests": 0, "tokens": 0, "seconds": 0.0, "drafted": 0, "accepted_estimate": 0},
+}
+
+def record_decoding(draft, completion_tokens, seconds):
+    """
+    Bir üretimin token/sn ve (speculative modda) tahmini taslak kabul oranını kaydeder ve loglar
+
+    Args:
+        draft (CountingPromptLookup or None): Kullanılan taslak modeli
+        completion_tokens (int): Üretilen token sayısı
+        seconds (float): Üretim süresi
+    """
+    mode = "prompt_lookup" if draft is not None else "standard"
+    stats = decoding_stats[mode]
+    stats["requests"] += 1
+    stats["tokens"] += completion_tokens
+    stats["seconds"] += seconds
+
+    message = f"[{mode}] {completion_tokens} token, {completion_tokens / seconds if seconds else 0:.1f} token/sn"
+    if draft is not None:
+        accepted = max(0, completion_tokens - draft.calls)
+        stats["drafted"] += draft.drafted
+        stats["accepted_estimate"] += accepted
+        rate = accepted / draft.drafted if draft.drafted else 0.0
+        message += f", tahmini taslak kabul oranı: {rate:.0%} (~{accepted}/{draft.drafted})"
+    total_rate = stats["tokens"] / stats["seconds"] if stats["seconds"] else 0.0
+    print(f"{message} | {mode} ortalaması: {total_rate:.1f} token/sn")
+
+def decoding_report(stats):
+    """
+    Decode modu istatistiklerine token/sn ve tahmini taslak kabul oranını ekler
+
+    Kabul edilen taslak token sayısı (bkz. CountingPromptLookup) bir tahmin olduğu
+    için oran acceptance_rate_estimate adıyla raporlanır.
+
+    Args:
+        stats (dict): decoding_stats biçiminde (bir veya birden çok süreçten toplanmış) sayaçlar
+
+    Returns:
+        dict: Mod bazında sayaçlar, token/sn ve speculative decoding'in açık olup olmadığı
+    """
+    report = {"speculative_enabled": SPECULATIVE_DECODING}
+    for mode, values in stats.items():
+        entry = dict(values)
+        entry["tokens_per_second"] = values["tokens"] / values["seconds"] if values["seconds"] else 0.0
+        if "drafted" in values:
+            entry["acceptance_rate_estimate"] = (
+                values["accepted_estimate"] / values["drafted"] if values["drafted"] else 0.0
+            )
+        report[mode] = entry
+    return report
+
+def speculative_enabled(mode=None):
+    """
+    Prompt-lookup speculative decoding'in (ve logits_all'un) açılıp açılmayacağına karar verir
+
+    "auto" modunda sistemdeki kullanılabilir RAM'den model dosyasının boyutu
+    düşülür; kalan bellek SPECULATIVE_MIN_FREE_RAM_BYTES'tan azsa logits_all'un
+    ek belleği harcanmaz. Kullanılabilir RAM ölçülemiyorsa açılır.
+
+    Args:
+        mode (str, optional): "auto", "1" veya "0" (varsayılan: LLAMA_SPECULATIVE)
+
+    Returns:
+        bool: Speculative decoding açılsın mı?
+    """
+    mode = SPECULATIVE_MODE if mode is None else mode
+    if mode in ("0", "1"):
+        return mode == "1"
+    try:
+        available = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return True
+    try:
+        model_bytes = os.path.getsize(MODEL_PATH)
+    except OSError:
+        model_bytes = 0
+    enabled = available - model_bytes >= SPECULATIVE_MIN_FREE_RAM_BYTES
+    print(f"Speculative decoding (auto): {'açık' if enabled else 'kapalı'} "
+          f"({(available - model_bytes) / 1024 ** 3:.1f} GB boş RAM kalıyor)")
+    return enabled
+
+def use_draft_model(speculative):
+    """
+    Bir sonraki üretim için taslak modelini ayarlar
+
+    Args:
+        speculative (bool): Prompt-lookup speculative decoding kullanılsın mı?
+
+    Returns:
+        CountingPromptLookup or None: Ayarlanan taslak modeli
+    """
+    draft = None
+    if speculative and SPECULATIVE_DECODING:
+        draft = CountingPromptLookup(num_pred_tokens=PROMPT_LOOKUP_TOKENS)
+    model.draft_model = draft
+    return draft
+
+def chat_completion(content, speculative=False, kind="html", compacted=False, **overrides):
+    """
+    Modele tek mesajlık bir chat completion isteği gönderir ve ölçümleri kaydeder
+
+    max_tokens, context'te prompt'tan sonra kalan yere göre sınırlanır.
+
+    Args:
+        content (str): Kullanıcı mesajı
+        speculative (bool): Prompt-lookup speculative decoding kullanılsın mı?
+        kind (str): Token kayıtlarında kullanılan istek türü
+        compacted (bool): Prompt geçmişi sıkıştırıldı mı? (token kayıtları için)
+        **overrides: SAMPLING_PARAMS üzerine yazılacak parametreler
+
+    Returns:
+        dict: llama-cpp-python chat completion yanıtı
+    """
+    prompt_tokens, overrides = completion_overrides(content, overrides)
+    draft = use_draft_model(speculative)
+    started = time.perf_counter()
+    try:
+        response = model.create_chat_completion(
+            messages=[
+                {"role": "user", "content": content}
+            ],
+            **{**SAMPLING_PARAMS, **overrides}
+        )
+    finally:
+        model.draft_model = None
+    usage = response["usage"]
+    record_decoding(draft, usage["completion_tokens"], time.perf_counter() - started)
+    record_usage(kind, usage.get("prompt_tokens", prompt_tokens), usage["completion_tokens"],
+                 overrides["max_tokens"], compacted)
+    usage["max_tokens"] = overrides["max_tokens"]
+    return response
+
+def chat_completion_stream(content, speculative=False, kind="stream", compacted=False, **overrides):
+    """
+    chat_completion'ın streaming versiyonu - parçaları üretildikçe döndürür
+
+    Args:
+        content (str): Kullanıcı mesajı
+        speculative (bool): Prompt-lookup speculative decoding kullanılsın mı?
+        kind (str): Token kayıtlarında kullanılan istek türü
+        compacted (bool): Prompt geçmişi sıkıştırıldı mı? (token kayıtları için)
+        **overrides: SAMPLING_PARAMS üzerine yazılacak parametreler
+
+    Yields:
+        dict: llama-cpp-python stream parçaları
+    """
+    prompt_tokens, overrides = completion_overrides(content, overrides)
+    draft = use_draft_model(speculative)
+    started = time.perf_counter()
+    tokens = 0
+    try:
+        for chunk in model.create_chat_completion(
+            messages=[
+                {"role": "user", "content": content}
+            ],
+            stream=True,
+            **{**SAMPLING_PARAMS, **overrides}
+        ):
+            if chunk["choices"][0].get("delta", {}).get("content"):
+                tokens += 1  # Stream parçalarının her biri bir token'a karşılık gelir
+            yield chunk
+    finally:
+        model.draft_model = None
+    record_decoding(draft, tokens, time.perf_counter() - started)
+    record_usage(kind, prompt_tokens, tokens, overrides["max_tokens"], compacted)
+
+html_grammar = None  # HTML_GBNF'den derlenen grammar (ilk kullanımda oluşturulur)
+
+# Durdurma dizisi ve grammar ile elde edilen birikimli token tasarrufu
+token_savings = {"requests": 0, "stopped_early": 0, "tokens_saved_upper_bound": 0, "prose_tokens": 0}
+
+def html_generation_params():
+    """
+    Tam sayfa HTML üretimi için durdurma dizisi ve (açıksa) grammar parametrelerini döndürür
+
+    Returns:
+        dict: chat_completion'a verilecek ek parametreler
+    """
+    global html_grammar
+    params = {"stop": HTML_STOP_SEQUENCES}
+    if HTML_GRAMMAR_MODE:
+        if html_grammar is None:
+            html_grammar = LlamaGrammar.from_string(HTML_GBNF, verbose=False)
+        params["grammar"] = html_grammar
+    return params
+
+def close_stopped_html(text, finish_reason):
+    """
+    Durdurma dizisi ile kesilen çıktıya </html> kapanış etiketini geri ekler
+
+    llama.cpp hem durdurma dizisine ulaşıldığında hem de model kendiliğinden
+    (EOS) bittiğinde finish_reason="stop" döndürür ve durdurma dizisini çıktıdan
+    çıkarır. Bu yüzden çıktı yalnızca </html>'den hemen önce gelen </body> ile
+    bitiyorsa durdurma dizisine ulaşıldığı kabul edilir; EOS ile yarıda biten
+    veya açıklama metniyle biten çıktıya etiket eklenmez.
+
+    Args:
+        text (str): Model çıktısı
+        finish_reason (str): Üretimin bitiş nedeni ("stop" veya "length")
+
+    Returns:
+        tuple: (tamamlanmış metin, durdurma dizisi ile mi bitti (bool))
+    """
+    lowered = text.lower()
+    if (finish_reason == "stop" and "<html" in lowered and "</html>" not in lowered
+            and lowered.rstrip().endswith("</body>")):
+        return text + "</html>", True
+    return text, False
+
+def report_token_savings(output, html_span, completion_tokens, stopped, max_tokens):
+    """
+    Bir isteğin token tasarrufunu hesaplar, loglar ve birikimli istatistiğe ekler
+
+    - tokens_saved_upper_bound: </html> ile erken durulduğunda max_tokens sınırına kadar harcanmayan
+      token. Model durdurma dizisi olmadan da kısa süre sonra bitebileceği için bu bir üst sınırdır.
+    - prose_tokens: Çıktıda HTML dışında kalan (extract_html'in attığı) açıklama token'ları;
+      yalnızca bu açıklama metni tokenize edilir
+
+    Args:
+        output (str): Modelin ham çıktısı
+        html_span (tuple): Ayıklanan HTML'in ham çıktıdaki (başlangıç, bitiş) aralığı (HtmlExtractor.span)
+        completion_tokens (int): Üretilen token sayısı
+        stopped (bool): Üretim </html> durdurma dizisi ile mi bitti?
+        max_tokens (int): İstekte kullanılan max_tokens
+    """
+    saved = max(0, max_tokens - completion_tokens) if stopped else 0
+    start, end = html_span
+    prose = output[:start] + output[end:]
+    prose_tokens = token_counter.count(prose, cache=False) if prose.strip() else 0
+
+    token_savings["requests"] += 1
+    token_savings["stopped_early"] += int(stopped)
+    token_savings["tokens_saved_upper_bound"] += saved
+    token_savings["prose_tokens"] += prose_tokens
+    print(f"Token raporu: {completion_tokens} üretildi, en fazla {saved} tasarruf edildi "
+          f"(erken durma: {'evet' if stopped else 'hayır'}), {prose_tokens} token açıklama metnine harcandı")
 
 def combine_prompts(prompts):
     """
@@ -44,51 +619,192 @@ def combine_prompts(prompts):
         rev_text += " Revizyon: " + rev
     return base + rev_text
 
-def extract_html(text):
+def build_prompt(prompts):
     """
-    HTML içeriğini metin içinden çıkarır
-    
-    Model genellikle HTML koduyla birlikte açıklamalar da verebilir. Bu fonksiyon,
-    sadece HTML kodunu ayıklayarak kullanılabilir bir web sayfası elde etmeyi sağlar.
-    
-    Metinde HTML kodu aramak için üç farklı regex deseni denenir:
-    1. <!DOCTYPE html> ile başlayan tam HTML dokumanı
-    2. <html> etiketi içeren HTML dokumanı
-    3. <body> etiketi içeren HTML parçası (bu durumda eksik kısımlar tamamlanır)
-    
+    Modele gönderilecek zenginleştirilmiş prompt'u oluşturur
+
+    Promptlar combine_prompts ile birleştirilir ve sonuna sabit talimat metni eklenir.
+    Uzun geçmişler önce fit_prompts ile sıkıştırılmalıdır.
+
     Args:
-        text (str): Model tarafından üretilen metin
-    
+        prompts (list[str]): Kullanıcı promptları listesi
+
     Returns:
-        str: Ayıklanmış HTML kodu
+        str: Modele gönderilecek prompt
     """
-    # 1. Tam HTML dokumanı (doctype) ile arama
-    m = re.search(r"<!DOCTYPE html>.*?</html>", text, re.DOTALL | re.IGNORECASE)
-    if m:
-        return m.group(0)
-    
-    # 2. HTML tag'leri ile arama yapmayı dene (doctype yoksa)
-    m = re.search(r"<html.*?>.*?</html>", text, re.DOTALL | re.IGNORECASE)
-    if m:
-        return "<!DOCTYPE html>\n" + m.group(0)
-        
-    # 3. Body tag'leri ile arama yapmayı dene (html etiketi yoksa)
-    m = re.search(r"<body.*?>.*?</body>", text, re.DOTALL | re.IGNORECASE)
-    if m:
-        # Eksik html ve head etiketlerini ekle
-        return f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset='UTF-8'>\n<title>Generated Page</title>\n</head>\n{m.group(0)}\n</html>"
-    
-    return text  # HTML bulunamadı, tüm içeriği kullan (son çare)
+    return f"{combine_prompts(prompts)}\n\n{INSTRUCTION_SUFFIX}"
 
-def generate_html_with_history(prompts):
+def save_html(html_content, note=""):
+    """
+    Üretilen HTML'i yerel geliştirme ve debug için website/index.html olarak kaydeder
+
+    Yalnızca SAVE_LOCAL_HTML açıksa yazılır; deploy'lar bu dosyayı kullanmaz.
+
+    Args:
+        html_content (str): Kaydedilecek HTML içeriği
+        note (str, optional): Log mesajına eklenecek not (örn. "llama-server")
+    """
+    if not SAVE_LOCAL_HTML:
+        return
+    os.makedirs("website", exist_ok=True)  # website klasörü yoksa oluştur
+    with open("website/index.html", "w", encoding="utf-8") as f:
+        f.write(html_content)
+    suffix = f" ({note})" if note else ""
+    print(f"✅ HTML dosyası 'website/index.html' olarak kaydedildi{suffix}.")
+
+def result_cache_key(prompts, previous_html=None, variant=None):
+    """
+    Prompt listesi, örnekleme parametreleri ve model dosyasından önbellek anahtarı üretir
+
+    Model dosyası yol, boyut ve değiştirilme zamanı ile temsil edilir; böylece
+    model güncellendiğinde eski sonuçlar kullanılmaz. Bağlam boyutu ve çıktıya
+    ayrılan en az token sayısı prompt sıkıştırmasını (dolayısıyla modele giden
+    prompt'u) belirlediği için onlar da anahtara eklenir. Revizyon modunda sonuç
+    önceki HTML'e de bağlı olduğu için onun hash'i de anahtara eklenir.
+
+    Args:
+        prompts (list[str]): Kullanıcı promptları listesi
+        previous_html (str, optional): Revizyon modunda düzenlenen önceki HTML
+        variant (optional): Bölüm bazlı üretimde işin türü ve girdileri (plan, bölüm, ortak CSS)
+
+    Returns:
+        str: SHA-256 hash anahtarı
+    """
+    try:
+        st = os.stat(MODEL_PATH)
+        model_id = [os.path.abspath(MODEL_PATH), st.st_size, st.st_mtime_ns]
+    except OSError:
+        model_id = [MODEL_PATH]
+    previous = hashlib.sha256(previous_html.encode("utf-8")).hexdigest() if previous_html else None
+    payload = json.dumps(
+        {"prompts": prompts, "sampling": SAMPLING_PARAMS, "model": model_id, "previous": previous, "variant": variant,
+         "stop": HTML_STOP_SEQUENCES, "grammar": HTML_GRAMMAR_MODE,
+         "context_tokens": CONTEXT_TOKENS, "min_completion_tokens": MIN_COMPLETION_TOKENS},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def restore_site_state(site_name, prompts, mode="html"):
+    """
+    Site için saklanan model durumunu modele yükler
+
+    Model zaten bu sitenin durumunu taşıyorsa diskten yükleme yapılmaz.
+    Hata durumunda üretim normal şekilde (önbelleksiz) devam eder.
+
+    Args:
+        site_name (str or None): Site adı
+        prompts (list[str]): Kullanıcı promptları listesi
+        mode (str): İsabet istatistikleri için üretim modu ("html" veya "stream")
+    """
+    if not site_name or model is None:
+        return
+    if loaded_site == site_name:
+        state_cache.record(mode, True)
+        return
+    try:
+        state = state_cache.lookup(site_name, combine_prompts(prompts), mode)
+        if state is not None:
+            model.load_state(state)
+            print(f"♻️ {site_name} için model durumu yüklendi ({state.n_tokens} token)")
+    except Exception as e:
+        print(f"Model durumu yüklenemedi: {e}")
+
+def save_site_state(site_name, prompts):
+    """
+    Üretimden sonraki model durumunu site için saklar
+
+    Args:
+        site_name (str or None): Site adı
+        prompts (list[str]): Kullanıcı promptları listesi
+    """
+    global loaded_site
+    if not site_name or model is None:
+        return
+    try:
+        state_cache.store(site_name, combine_prompts(prompts), model.save_state())
+        loaded_site = site_name
+    except Exception as e:
+        loaded_site = None
+        print(f"Model durumu kaydedilemedi: {e}")
+
+def generate_html_revision(prompts, previous_html):
+    """
+    Önceki HTML'i yeni revizyona göre düzenleyerek günceller (revizyon modu)
+
+    Model tüm prompt geçmişi yerine yalnızca önceki HTML'i ve en son revizyonu görür
+    ve sayfayı baştan yazmak yerine ARA/DEGISTIR blokları döndürür. Bloklar
+    uygulanır ve sonuç doğrulanır; böylece üretilen token sayısı sayfanın
+    boyutuyla değil değişikliğin boyutuyla orantılı olur.
+
+    Bu prompt önceki HTML ile başladığından sitenin saklanan model durumuyla
+    (prompt geçmişi) ortak öneki yoktur: durum geri yüklenmez ve sonraki durum
+    saklanmaz, sayfa her revizyonda yeniden prefill edilir. Revizyon çıktısı
+    tam üretime göre çok daha kısa olduğundan bu bilerek kabul edilen bir
+    ödünleşimdir; bedeli state_cache istatistiklerinde "revision" modunun
+    ıskaları olarak görülür.
+
+    Args:
+        prompts (list[str]): Kullanıcı promptları listesi (son eleman yeni revizyon)
+        previous_html (str): Düzenlenecek önceki HTML
+
+    Returns:
+        str: Güncellenmiş HTML
+
+    Raises:
+        html_patch.PatchError: Değişiklikler uygulanamazsa veya sonuç geçersizse
+    """
+    global loaded_site
+    # Önceki sayfa zaten bozuksa düzenleme sonucunu doğrulamak mümkün değil
+    html_patch.validate_html(previous_html)
+
+    edit_prompt = (
+        f"Mevcut HTML:\n{previous_html}\n\n"
+        f"İstenen değişiklik: {prompts[-1]}\n\n"
+        f"{EDIT_INSTRUCTION}"
+    )
+    print("\n[AI modeli HTML kodunu düzenliyor (revizyon modu)...]\n")
+
+    # Bu üretim modelin belleğindeki site durumunu değiştirir
+    loaded_site = None
+    # Değişiklik blokları büyük ölçüde prompt'taki HTML'in kopyası: prompt-lookup ile hızlandır
+    # Sayfa context'e değişikliğe yer bırakmayacak kadar büyükse tam üretime düşülür
+    try:
+        response = chat_completion(edit_prompt, speculative=True, kind="revision", max_tokens=EDIT_MAX_TOKENS)
+    except ValueError as e:
+        raise html_patch.PatchError(str(e))
+    output = response["choices"][0]["message"]["content"]
+    usage = response.get("usage", {})
+    print(f"Model yanıtı alındı! ({usage.get('completion_tokens', '?')} token)")
+
+    blocks = html_patch.parse_edit_blocks(output)
+    if not blocks and re.search(r"<!DOCTYPE html>", output, re.IGNORECASE):
+        # Model değişiklik yerine tam sayfa döndürdüyse onu kullan
+        html_content = extract_html(output)
+    else:
+        html_content = html_patch.apply_edit_blocks(previous_html, blocks)
+        print(f"{len(blocks)} değişiklik bloğu uygulandı.")
+    html_patch.validate_html(html_content)
+    return html_content
+
+def generate_html_with_history(prompts, site_name=None, fresh=False, previous_html=None, incremental=True):
     """
     llama-cpp-python kullanarak HTML kodu üretir
     
     Bu fonksiyon, verilen promptları kullanarak AI modeli ile HTML kodu oluşturur.
-    Öncelikli olarak llama-cpp-python API'sini kullanır, hata olursa CLI'a düşer.
+    Öncelikli olarak llama-cpp-python API'sini kullanır, hata olursa llama-server'a düşer.
+    site_name verilirse sitenin önceki model durumu geri yüklenir ve
+    üretimden sonra tekrar saklanır. Aynı prompt geçmişi daha önce üretildiyse
+    sonuç önbellekten döndürülür. previous_html verilirse ve istek bir revizyonsa
+    önce revizyon modu (generate_html_revision) denenir; başarısız olursa
+    sayfa tüm prompt geçmişinden yeniden üretilir. Önceki bir sayfa varken
+    prompt-lookup speculative decoding (LLAMA_SPECULATIVE kapatmadıysa) otomatik olarak açılır.
     
     Args:
         prompts (list[str]): Kullanıcı promptları listesi
+        site_name (str, optional): Model durumu önbelleği için site adı
+        fresh (bool): True ise önbellek atlanır ve yeni bir varyasyon üretilir
+        previous_html (str, optional): Sitenin önceki HTML'i
+        incremental (bool): True ise revizyonlarda önceki HTML düzenlenir (revizyon modu)
     
     Returns:
         str: Oluşturulan HTML içeriği
@@ -99,107 +815,426 @@ def generate_html_with_history(prompts):
     if not prompts:
         raise ValueError("En az bir prompt(komut) verilmelidir.")
 
-    # Promptları birleştir
-    final_prompt = combine_prompts(prompts)
-    
-    # Prompt'a daha net bir yönlendirme ekle
-    # Bu ekleme, modele daha net talimatlar vererek istenen çıktıyı alma olasılığını artırır
-    enriched_prompt = (
-         f"{final_prompt}\n\n"
-        "Lütfen tam ve çalışan bir HTML kodu ile cevap ver. "
-        "Kodu tam ve eksiksiz olarak yaz. <!DOCTYPE html> ile başla ve tüm HTML, CSS, JavaScript kodunu içer. "
-        "Sayfayı responsive tasarla ve modern tasarım prensiplerini kullan. "
-        "Açıklamalar veya gerekçeler ekleme, doğrudan çalışan kodu ver."
-    )
+    # Revizyon modu sadece önceki bir sayfa varken ve yeni bir revizyon için kullanılır
+    if len(prompts) < 2:
+        previous_html = None
+
+    # Aynı istek daha önce üretildiyse önbellekten döndür (model yüklenmesini beklemeden)
+    cache_key = result_cache_key(prompts, previous_html if incremental else None)
+    if not fresh:
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            print("♻️ HTML önbellekten döndürüldü.")
+            return cached
+
+    # Model hâlâ yükleniyorsa fallback'e düşmek yerine yüklemenin bitmesini bekle
+    wait_for_model()
+
+    if incremental and previous_html and model is not None:
+        if site_name:
+            state_cache.record("revision", False)  # Revizyon modu model durumu önbelleğini kullanmaz
+        try:
+            html_content = generate_html_revision(prompts, previous_html)
+            save_html(html_content, "revizyon modu")
+            result_cache.put(cache_key, html_content)
+            return html_content
+        except Exception as e:
+            # Düzenleme uygulanamazsa sayfayı baştan üret
+            print(f"Revizyon modu başarısız, sayfa yeniden üretilecek: {e}")
+
+    # Promptları birleştir ve talimat metnini ekle - uzun geçmiş çıktıya yer kalacak şekilde sıkıştırılır
+    history, compacted = fit_prompts(prompts, MIN_COMPLETION_TOKENS, INSTRUCTION_SUFFIX)
+    enriched_prompt = build_prompt(history)
     
     print("\n[AI modeli HTML kodu üretiyor...]\n")
     
     # Model yüklenmiş ve çalışıyor mu kontrol et
     if model is not None:
         try:
+            restore_site_state(site_name, history)
+
             # llama-cpp-python API'si ile chat completion çağrısı yap
-            response = model.create_chat_completion(
-                messages=[
-                    {"role": "user", "content": enriched_prompt}
-                ],
-                temperature=0.7,        # Yaratıcılık parametresi (0-1 arası)
-                max_tokens=4000,        # Üretilecek maksimum token sayısı
-                repeat_penalty=1.1,     # Tekrarları önlemek için ceza faktörü
-                top_k=40,               # Olasılık dağılımında dikkate alınacak en iyi k token
-                top_p=0.95              # Nucleus sampling parametresi, çeşitliliği kontrol eder
+            # </html> yazılınca durulur, grammar modu açıksa çıktı <!DOCTYPE html> ile başlar
+            response = chat_completion(
+                enriched_prompt,
+                speculative=previous_html is not None,
+                compacted=compacted,
+                **html_generation_params()
             )
             
-            html_output = response["choices"][0]["message"]["content"]
+            choice = response["choices"][0]
+            html_output, stopped = close_stopped_html(choice["message"]["content"], choice["finish_reason"])
             print("Model yanıtı alındı!")
+            save_site_state(site_name, history)
             
         except Exception as e:
-            # API çağrısı başarısız olursa CLI'a düş
+            # API çağrısı başarısız olursa llama-server'a düş
             print(f"Model çalıştırma hatası: {e}")
-            return generate_html_with_cli(prompts)  # Fallback
+            return generate_html_with_server(prompts)  # Fallback
     else:
-        # Model yüklenemediyse CLI kullanalım
-        return generate_html_with_cli(prompts)
+        # Model yüklenemediyse llama-server kullanalım
+        return generate_html_with_server(prompts)
     
     # HTML içeriğini çıkar
-    html_content = extract_html(html_output)
+    extractor = HtmlExtractor().feed(html_output)
+    html_content = extractor.finish()
+    usage = response["usage"]
+    report_token_savings(html_output, extractor.span(), usage["completion_tokens"], stopped, usage["max_tokens"])
     
     # HTML dosyasını kaydet (yerel geliştirme ve debug için)
-    os.makedirs("website", exist_ok=True)  # website klasörü yoksa oluştur
-    with open("website/index.html", "w", encoding="utf-8") as f:
-        f.write(html_content)
-    print("✅ HTML dosyası 'website/index.html' olarak kaydedildi.")
+    save_html(html_content)
+    result_cache.put(cache_key, html_content)
 
     return html_content
 
-def generate_html_with_cli(prompts):
+def generate_html_stream(prompts, site_name=None, fresh=False, previous_html=None):
     """
-    Eski CLI temelli yöntem (fallback olarak)
-    
-    Ana API yöntemi başarısız olursa, bu fonksiyon komut satırı arabirimi aracılığıyla
-    modeli çalıştırarak HTML kodu üretir. Bu, sistem dirençliliği için önemli bir yedek mekanizmadır.
-    
+    HTML kodunu token token üreten streaming versiyon
+
+    model.create_chat_completion(stream=True) ile gelen parçalar üretildikçe
+    olay (event) sözlükleri olarak döndürülür. Parçalar aynı anda
+    HtmlExtractor'a beslenir, böylece akış kapandığında son HTML hazırdır.
+
+    Üretilen olaylar:
+    - {"type": "token", "text": ...}: Modelden gelen her metin parçası
+    - {"type": "first_token", "ttft": ...}: İlk token'a kadar geçen süre (saniye)
+    - {"type": "done", "html": ..., "ttft": ..., "elapsed": ..., "chunks": ..., "cached": ..., "usage": ...}:
+      Son HTML, ölçümler ve prompt/completion token sayıları
+
     Args:
         prompts (list[str]): Kullanıcı promptları listesi
-    
+        site_name (str, optional): Model durumu önbelleği için site adı
+        fresh (bool): True ise önbellek atlanır ve yeni bir varyasyon üretilir
+        previous_html (str, optional): Sitenin önceki HTML'i (varsa ve LLAMA_SPECULATIVE kapatmadıysa speculative decoding açılır)
+
+    Yields:
+        dict: Akış olayları
+
+    Raises:
+        ValueError: Prompt listesi boşsa hata verir
+    """
+    if not prompts:
+        raise ValueError("En az bir prompt(komut) verilmelidir.")
+
+    started = time.perf_counter()
+
+    cache_key = result_cache_key(prompts)
+    if not fresh:
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            print("♻️ HTML önbellekten döndürüldü.")
+            yield {"type": "done", "html": cached, "ttft": None,
+                   "elapsed": time.perf_counter() - started, "chunks": 0, "cached": True, "usage": None}
+            return
+
+    # Model hâlâ yükleniyorsa fallback'e düşmek yerine yüklemenin bitmesini bekle
+    wait_for_model()
+    if model is None:
+        # Model yüklenemediyse stream yapılamaz, llama-server sonucunu tek seferde döndür
+        html_content = generate_html_with_server(prompts)
+        yield {"type": "done", "html": html_content, "ttft": None,
+               "elapsed": time.perf_counter() - started, "chunks": 0, "cached": False, "usage": None}
+        return
+
+    history, compacted = fit_prompts(prompts, MIN_COMPLETION_TOKENS, INSTRUCTION_SUFFIX)
+    enriched_prompt = build_prompt(history)
+    print("\n[AI modeli HTML kodu üretiyor (stream)...]\n")
+    restore_site_state(site_name, history, "stream")
+    extractor = HtmlExtractor()
+    ttft = None
+    chunks = 0
+    finish_reason = None
+    raw_parts = []
+
+    stream = chat_completion_stream(
+        enriched_prompt,
+        speculative=previous_html is not None,
+        compacted=compacted,
+        **html_generation_params()
+    )
+    for chunk in stream:
+        # Stream parçalarında içerik "delta" altında gelir, ilk parça sadece role içerebilir
+        finish_reason = chunk["choices"][0].get("finish_reason") or finish_reason
+        text = chunk["choices"][0].get("delta", {}).get("content")
+        if not text:
+            continue
+        if ttft is None:
+            ttft = time.perf_counter() - started
+            print(f"İlk token süresi (TTFT): {ttft:.2f} sn")
+            yield {"type": "first_token", "ttft": ttft}
+        chunks += 1
+        raw_parts.append(text)
+        extractor.feed(text)
+        yield {"type": "token", "text": text}
+
+    elapsed = time.perf_counter() - started
+    usage = usage_log[-1]  # chat_completion_stream akış bitince kaydı ekler
+    save_site_state(site_name, history)
+    # Durdurma dizisi çıktıdan çıkarıldıysa kapanış etiketini geri ekle
+    raw_output = "".join(raw_parts)
+    closed_output, stopped = close_stopped_html(raw_output, finish_reason)
+    if stopped:
+        extractor.feed(closed_output[len(raw_output):])
+    html_content = extractor.finish()
+    report_token_savings(closed_output, extractor.span(), chunks, stopped, usage["max_tokens"])
+    print(f"Model yanıtı alındı! ({chunks} parça, {elapsed:.2f} sn)")
+    save_html(html_content, "stream")
+    result_cache.put(cache_key, html_content)
+
+    yield {"type": "done", "html": html_content, "ttft": ttft,
+           "elapsed": elapsed, "chunks": chunks, "cached": False, "usage": usage}
+
+def parse_section_plan(text):
+    """
+    Modelin ürettiği bölüm planı JSON'unu ayrıştırır
+
+    Args:
+        text (str): Model çıktısı
+
+    Returns:
+        dict: title, theme ve sections alanlarını içeren plan (ayrıştırılamazsa varsayılan plan)
+    """
+    plan = {}
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            plan = json.loads(text[start:end + 1])
+        except ValueError:
+            plan = {}
+
+    sections = []
+    for section in plan.get("sections") or []:
+        if not isinstance(section, dict) or not section.get("id"):
+            continue
+        section_id = re.sub(r"[^a-z0-9-]", "-", str(section["id"]).lower()).strip("-") or f"section-{len(sections)}"
+        sections.append({"id": section_id, "description": str(section.get("description", ""))})
+
+    return {
+        "title": str(plan.get("title") or "Web Sitesi"),
+        "theme": plan.get("theme") if isinstance(plan.get("theme"), dict) else {},
+        "sections": sections or DEFAULT_SECTIONS,
+    }
+
+def section_completion(content, kind, max_tokens, compacted=False):
+    """
+    Bölüm bazlı üretimin işleri (plan, bölüm, ortak CSS) için chat completion isteği gönderir
+
+    generate_html_with_history ile aynı yol izlenir: önce bu süreçteki model
+    kullanılır, model yüklenemediyse veya çağrı hata verirse istek llama-server'a gönderilir.
+
+    Args:
+        content (str): Kullanıcı mesajı
+        kind (str): Token kayıtlarında kullanılan istek türü
+        max_tokens (int): Üretilecek en fazla token
+        compacted (bool): Prompt geçmişi sıkıştırıldı mı? (token kayıtları için)
+
+    Returns:
+        str: Model yanıtının metni
+
+    Raises:
+        llama_server.ServerUnavailableError: Model yoksa ve sunucu başlatılamazsa
+    """
+    global loaded_site
+    if wait_for_model() is not None:
+        try:
+            loaded_site = None  # Bölüm işleri modeldeki site durumunun üzerine yazar
+            response = chat_completion(content, kind=kind, compacted=compacted, max_tokens=max_tokens)
+            return response["choices"][0]["message"]["content"]
+        except Exception as e:
+            print(f"Model çalıştırma hatası ({kind}): {e}")
+
+    prompt_tokens, params = completion_overrides(content, {"max_tokens": max_tokens})
+    response = fallback_server.chat(content, **{**SAMPLING_PARAMS, **params})
+    usage = response.get("usage", {})
+    record_usage(kind, usage.get("prompt_tokens", prompt_tokens), usage.get("completion_tokens", 0),
+                 params["max_tokens"], compacted)
+    return response["choices"][0]["message"]["content"]
+
+def generate_section_plan(prompts, fresh=False):
+    """
+    Bölüm bazlı üretim için kısa bir sayfa planı üretir
+
+    Plan sonuç önbelleğinde saklanır; böylece aynı istek tekrarlandığında bölümler
+    de aynı plana göre önbellekten gelir. Plan üretilemezse varsayılan plan kullanılır.
+
+    Args:
+        prompts (list[str]): Kullanıcı promptları listesi
+        fresh (bool): True ise önbellek atlanır ve yeni bir plan üretilir
+
+    Returns:
+        dict: parse_section_plan çıktısı
+    """
+    if not prompts:
+        raise ValueError("En az bir prompt(komut) verilmelidir.")
+
+    cache_key = result_cache_key(prompts, variant="section_plan")
+    if not fresh:
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return json.loads(cached)
+
+    history, compacted = fit_prompts(prompts, SECTION_PLAN_MAX_TOKENS, SECTION_PLAN_INSTRUCTION)
+    try:
+        text = section_completion(f"{combine_prompts(history)}\n\n{SECTION_PLAN_INSTRUCTION}",
+                                  "section_plan", SECTION_PLAN_MAX_TOKENS, compacted)
+    except Exception as e:
+        print(f"Bölüm planı üretilemedi, varsayılan plan kullanılıyor: {e}")
+        return parse_section_plan("")
+
+    plan = parse_section_plan(text)
+    print(f"Bölüm planı: {', '.join(section['id'] for section in plan['sections'])}")
+    result_cache.put(cache_key, json.dumps(plan, ensure_ascii=False))
+    return plan
+
+def section_context(prompts, plan):
+    """
+    Bölüm ve ortak CSS üretiminde kullanılan ortak bağlam metnini oluşturur
+
+    Prompt geçmişi bölüm çıktısına yer kalacak şekilde sıkıştırılır.
+
+    Args:
+        prompts (list[str]): Kullanıcı promptları listesi
+        plan (dict): Sayfa planı
+
+    Returns:
+        str: İstek, sayfa başlığı, tema ve bölüm listesi
+    """
+    section_ids = ", ".join(section["id"] for section in plan["sections"])
+    history, _ = fit_prompts(prompts, SECTION_MAX_TOKENS, SECTION_INSTRUCTION)
+    return (
+        f"İstek: {combine_prompts(history)}\n"
+        f"Sayfa başlığı: {plan['title']}\n"
+        f"Tema: {json.dumps(plan['theme'], ensure_ascii=False)}\n"
+        f"Sayfanın bölümleri (sırayla): {section_ids}\n"
+    )
+
+def extract_fragment(text):
+    """
+    Model çıktısından tek bir bölümün HTML parçasını ayıklar
+
+    Kod blokları (```) temizlenir; model yine de tam doküman yazdıysa body içeriği alınır.
+
+    Args:
+        text (str): Model çıktısı
+
+    Returns:
+        str: HTML parçası
+    """
+    text = re.sub(r"```[a-zA-Z]*", "", text)
+    body = re.search(r"<body[^>]*>(.*)</body>", text, re.DOTALL | re.IGNORECASE)
+    if body:
+        text = body.group(1)
+    start = text.find("<")
+    end = text.rfind(">")
+    return text[start:end + 1].strip() if start != -1 and end > start else text.strip()
+
+def generate_section(prompts, plan, section, fresh=False):
+    """
+    Planın tek bir bölümünü üretir
+
+    Bölüm üretilemezse (model ve llama-server başarısız) yerine bölüm açıklamasını
+    içeren bir yer tutucu döndürülür; yer tutucu önbelleğe alınmaz.
+
+    Args:
+        prompts (list[str]): Kullanıcı promptları listesi
+        plan (dict): Sayfa planı
+        section (dict): Üretilecek bölüm (id, description)
+        fresh (bool): True ise önbellek atlanır
+
+    Returns:
+        str: Bölümün HTML parçası
+    """
+    cache_key = result_cache_key(prompts, variant={"plan": plan, "section": section})
+    if not fresh:
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        text = section_completion(
+            f"{section_context(prompts, plan)}\n"
+            f"Şimdi sadece \"{section['id']}\" bölümünü yaz: {section['description']}\n\n"
+            f"{SECTION_INSTRUCTION}",
+            "section", SECTION_MAX_TOKENS
+        )
+    except Exception as e:
+        print(f"{section['id']} bölümü üretilemedi: {e}")
+        return (f'<section id="{html.escape(section["id"])}">'
+                f'<p>{html.escape(section["description"])}</p></section>')
+
+    fragment = extract_fragment(text)
+    result_cache.put(cache_key, fragment)
+    return fragment
+
+def generate_shared_css(prompts, plan, fresh=False):
+    """
+    Tüm bölümlerin paylaşacağı ortak CSS'i üretir
+
+    Args:
+        prompts (list[str]): Kullanıcı promptları listesi
+        plan (dict): Sayfa planı
+        fresh (bool): True ise önbellek atlanır
+
+    Returns:
+        str: CSS kodu (üretilemezse boş metin)
+    """
+    cache_key = result_cache_key(prompts, variant={"plan": plan, "css": True})
+    if not fresh:
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    try:
+        text = section_completion(f"{section_context(prompts, plan)}\n{SHARED_CSS_INSTRUCTION}",
+                                  "css", SHARED_CSS_MAX_TOKENS)
+    except Exception as e:
+        print(f"Ortak CSS üretilemedi: {e}")
+        return ""
+
+    css = re.sub(r"```[a-zA-Z]*", "", text)
+    css = re.sub(r"</?style[^>]*>", "", css, flags=re.IGNORECASE).strip()
+    result_cache.put(cache_key, css)
+    return css
+
+def generate_html_with_server(prompts):
+    """
+    llama-server temelli yöntem (fallback olarak)
+
+    Model bu süreçte yüklenemezse veya çalıştırma hatası verirse HTML, arka planda
+    sürekli çalışan llama.cpp sunucusuna (llama_server.LlamaServer) gönderilen
+    bir chat completion isteğiyle üretilir. Sunucu modeli yalnızca ilk başlatmada
+    yükler; sonraki fallback istekleri yerel bir HTTP isteğine mal olur.
+
+    Args:
+        prompts (list[str]): Kullanıcı promptları listesi
+
     Returns:
         str: Oluşturulan HTML içeriği
-    
+
     Raises:
         ValueError: Prompt listesi boşsa hata verir
+        llama_server.ServerUnavailableError: Sunucu başlatılamazsa
     """
-    import subprocess
-    
     if not prompts:
         raise ValueError("En az bir prompt(komut) verilmelidir.")
 
-    # Promptları birleştir
-    final_prompt = combine_prompts(prompts)
-    
-    # CLI komutunu hazırla
-    command = [
-        OLD_LLAMA_CLI,           # CLI yürütülebilir dosyası
-        "-m", OLD_MODEL_PATH,    # Model dosyası
-        "-p", final_prompt,      # Prompt
-        "-n", "4096"             # Maksimum token sayısı
-    ]
-    print("\n[AI modeli HTML kodu üretiyor (CLI yöntemi)...]\n")
-    
-    # Alt süreci başlat ve çıktıyı bekle
-    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    
-    # Çıktıyı UTF-8'e dönüştür, hata olursa hataları görmezden gel
-    try:
-        html_output = result.stdout.decode('utf-8')
-    except UnicodeDecodeError:
-        html_output = result.stdout.decode('utf-8', errors='ignore')
+    # Promptları birleştir ve talimat metnini ekle
+    history, compacted = fit_prompts(prompts, MIN_COMPLETION_TOKENS, INSTRUCTION_SUFFIX)
+    enriched_prompt = build_prompt(history)
+    prompt_tokens, params = completion_overrides(enriched_prompt, {"stop": HTML_STOP_SEQUENCES})
+    print("\n[AI modeli HTML kodu üretiyor (llama-server)...]\n")
+
+    response = fallback_server.chat(enriched_prompt, **{**SAMPLING_PARAMS, **params})
+    choice = response["choices"][0]
+    html_output, _ = close_stopped_html(choice["message"]["content"], choice.get("finish_reason"))
+    usage = response.get("usage", {})
+    record_usage("server", usage.get("prompt_tokens", prompt_tokens), usage.get("completion_tokens", 0),
+                 params["max_tokens"], compacted)
 
     # HTML içeriğini çıkar
     html_content = extract_html(html_output)
 
     # HTML dosyasını kaydet
-    os.makedirs("website", exist_ok=True)
-    with open("website/index.html", "w", encoding="utf-8") as f:
-        f.write(html_content)
-    print("✅ HTML dosyası 'website/index.html' olarak kaydedildi (CLI yöntemi).")
+    save_html(html_content, "llama-server")
 
     return html_content
@@ -0,0 +1,173 @@
+import re
+
+# Doküman sınırlarını belirleyen işaretler - büyük/küçük harf duyarsız tek bir desen
+# Metin bu desenle yalnızca bir kez, baştan sona taranır
+MARKER_PATTERN = re.compile(r"<!doctype html>|</html>|<html|</body>|<body", re.IGNORECASE)
+
+# Parça sınırında bölünmüş bir işareti yakalamak için geriye doğru bırakılan örtüşme
+MARKER_OVERLAP = len("<!doctype html>") - 1
+
+# Sadece <body> bulunduğunda eksik html ve head etiketleri ile tamamlanır
+BODY_WRAPPER = "<!DOCTYPE html>\n<html>\n<head>\n<meta charset='UTF-8'>\n<title>Generated Page</title>\n</head>\n{body}\n</html>"
+
+
+class HtmlExtractor:
+    """
+    Model çıktısından HTML dokümanını tek geçişte ayıklayan tarayıcı
+
+    Metin parça parça beslenebilir (feed); her parçada yalnızca yeni gelen kısım
+    (ve bölünmüş işaretler için kısa bir örtüşme) taranır, bu yüzden toplam iş
+    metin uzunluğuyla doğrusaldır. Öncelik sırası eski regex tabanlı sürümle aynıdır:
+
+    1. <!DOCTYPE html> ... </html> tam dokümanı
+    2. <html ...> ... </html> (başına doctype eklenir)
+    3. <body ...> ... </body> (html ve head ile sarılır)
+
+    Hiçbiri tam değilse kesilmiş (truncated) çıktı kabul edilir: bulunan ilk
+    başlangıçtan metnin sonuna kadar alınır ve eksik kapanış etiketleri eklenir.
+    """
+
+    def __init__(self):
+        self.parts = []         # Gelen parçalar - metin sadece finish() çağrısında birleştirilir
+        self.length = 0         # Şimdiye kadar gelen metnin uzunluğu
+        self.tail = ""          # Metnin son MARKER_OVERLAP karakteri
+        self.next_match = 0     # Bir sonraki işaretin başlayabileceği en küçük konum
+
+        self.doc_start = self.doc_end = -1
+        self.html_start = self.html_end = self.html_gt = -1
+        self.body_start = self.body_end = self.body_gt = -1
+
+    @property
+    def complete(self):
+        """Tam bir <!DOCTYPE html> ... </html> dokümanı bulundu mu? (sonuç artık değişmez)"""
+        return self.doc_end != -1
+
+    def feed(self, chunk):
+        """
+        Yeni bir metin parçasını tarar
+
+        Args:
+            chunk (str): Model çıktısının bir parçası
+
+        Returns:
+            HtmlExtractor: Zincirleme kullanım için kendisi
+        """
+        self.parts.append(chunk)
+        if self.complete:
+            self.length += len(chunk)
+            return self
+
+        # Taranacak pencere: önceki metnin son birkaç karakteri + yeni parça
+        window_start = max(self.next_match, self.length - len(self.tail))
+        window = self.tail[len(self.tail) - (self.length - window_start):] + chunk
+        self.length += len(chunk)
+        self.tail = window[-MARKER_OVERLAP:]
+
+        for m in MARKER_PATTERN.finditer(window):
+            self.next_match = window_start + m.end()
+            self._mark(m.group(0).lower(), window, window_start, m.start(), m.end())
+            if self.complete:
+                return self
+
+        # Açılış etiketlerinin kapanan ">" karakteri bu pencerede gelmiş olabilir
+        self._find_tag_ends(window, window_start)
+        return self
+
+    def _find_tag_ends(self, window, window_start):
+        if self.html_start != -1 and self.html_gt == -1:
+            pos = window.find(">", max(0, self.html_start + len("<html") - window_start))
+            self.html_gt = window_start + pos if pos != -1 else -1
+        if self.body_start != -1 and self.body_gt == -1:
+            pos = window.find(">", max(0, self.body_start + len("<body") - window_start))
+            self.body_gt = window_start + pos if pos != -1 else -1
+
+    def _mark(self, marker, window, window_start, start, end):
+        pos, end = window_start + start, window_start + end
+        if marker == "<!doctype html>":
+            if self.doc_start == -1:
+                self.doc_start = pos
+        elif marker == "<html":
+            if self.html_start == -1:
+                self.html_start = pos
+        elif marker == "<body":
+            if self.body_start == -1:
+                self.body_start = pos
+        elif marker == "</html>":
+            if self.doc_start != -1:
+                self.doc_end = end
+            if self.html_start != -1 and self.html_end == -1:
+                self._find_tag_ends(window, window_start)
+                if -1 < self.html_gt < pos:
+                    self.html_end = end
+        elif marker == "</body>":
+            if self.body_start != -1 and self.body_end == -1:
+                self._find_tag_ends(window, window_start)
+                if -1 < self.body_gt < pos:
+                    self.body_end = end
+
+    def finish(self):
+        """
+        Ayıklanmış HTML'i döndürür
+
+        Returns:
+            str: Ayıklanmış HTML kodu (HTML bulunamazsa metnin tamamı)
+        """
+        text = "".join(self.parts)
+        if self.doc_end != -1:
+            return text[self.doc_start:self.doc_end]
+        if self.html_end != -1:
+            return "<!DOCTYPE html>\n" + text[self.html_start:self.html_end]
+        if self.body_end != -1:
+            return BODY_WRAPPER.format(body=text[self.body_start:self.body_end])
+
+        # Kesilmiş çıktı: kapanış etiketleri hiç gelmemiş
+        if self.doc_start != -1:
+            return self._close(text[self.doc_start:].rstrip(), self.body_start >= self.doc_start)
+        if self.html_start != -1:
+            return "<!DOCTYPE html>\n" + self._close(text[self.html_start:].rstrip(), self.body_start >= self.html_start)
+        if self.body_start != -1:
+            return BODY_WRAPPER.format(body=text[self.body_start:].rstrip() + "\n</body>")
+        return text  # HTML bulunamadı, tüm içeriği kullan (son çare)
+
+    def span(self):
+        """
+        finish() sonucunun ham metinde kapladığı aralığı döndürür
+
+        Eklenen doctype, sarmalayıcı ve kapanış etiketleri ham metinde olmadığından
+        aralık yalnızca modelin ürettiği kısmı kapsar; aralık dışındaki metin
+        ayıklayıcının attığı açıklamadır.
+
+        Returns:
+            tuple: (başlangıç, bitiş) - HTML bulunamazsa metnin tamamı
+        """
+        if self.doc_end != -1:
+            return self.doc_start, self.doc_end
+        if self.html_end != -1:
+            return self.html_start, self.html_end
+        if self.body_end != -1:
+            return self.body_start, self.body_end
+        for start in (self.doc_start, self.html_start, self.body_start):
+            if start != -1:
+                return start, self.length
+        return 0, self.length
+
+    def _close(self, fragment, has_body):
+        closing = "\n</body>" if has_body and self.body_end == -1 else ""
+        return f"{fragment}{closing}\n</html>"
+
+
+def extract_html(text):
+    """
+    HTML içeriğini metin içinden çıkarır
+
+    Model genellikle HTML koduyla birlikte açıklamalar da verebilir. Bu fonksiyon,
+    sadece HTML kodunu ayıklayarak kullanılabilir bir web sayfası elde etmeyi sağlar.
+    Metin HtmlExtractor ile tek geçişte taranır (öncelik sırası için sınıfa bakın).
+
+    Args:
+        text (str): Model tarafından üretilen metin
+
+    Returns:
+        str: Ayıklanmış HTML kodu
+    """
+    return HtmlExtractor().feed(text).finish()
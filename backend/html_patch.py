@@ -0,0 +1,87 @@
+import re
+
+# Modelin revizyon modunda döndürdüğü değişiklik bloğu formatı:
+#
+# <<<<<<< ARA
+# (mevcut HTML'den birebir alınmış kısım)
+# =======
+# (yerine gelecek yeni kısım)
+# >>>>>>> DEGISTIR
+EDIT_BLOCK_PATTERN = re.compile(
+    r"<<<<<<< ARA\n(.*?)\n?=======\n(.*?)\n?>>>>>>> DEGISTIR",
+    re.DOTALL
+)
+
+
+class PatchError(Exception):
+    """Değişiklik blokları uygulanamadığında veya sonuç geçersiz olduğunda fırlatılır"""
+
+
+def parse_edit_blocks(text):
+    """
+    Model çıktısındaki ARA/DEGISTIR bloklarını ayıklar
+
+    Args:
+        text (str): Model tarafından üretilen metin
+
+    Returns:
+        list: (aranan_metin, yeni_metin) çiftlerinden oluşan liste
+    """
+    text = text.replace("\r\n", "\n")
+    return [(m.group(1), m.group(2)) for m in EDIT_BLOCK_PATTERN.finditer(text)]
+
+
+def apply_edit_blocks(html, blocks):
+    """
+    Değişiklik bloklarını sırayla HTML'e uygular
+
+    Aranan metin önce birebir, bulunamazsa baştaki/sondaki boşluklar
+    kırpılarak aranır. Aranan metin HTML'de hiç yoksa veya birden fazla kez
+    geçiyorsa değişiklik belirsiz kabul edilir.
+
+    Args:
+        html (str): Mevcut HTML
+        blocks (list): parse_edit_blocks çıktısı
+
+    Returns:
+        str: Değişiklikler uygulanmış HTML
+
+    Raises:
+        PatchError: Blok yoksa, aranan metin bulunamazsa veya belirsizse
+    """
+    if not blocks:
+        raise PatchError("Model çıktısında değişiklik bloğu bulunamadı.")
+
+    for search, replace in blocks:
+        if not search.strip():
+            raise PatchError("Boş arama metni içeren değişiklik bloğu.")
+        count = html.count(search)
+        if count == 0:
+            # Model baştaki/sondaki boşlukları farklı yazmış olabilir
+            search, replace = search.strip(), replace.strip()
+            count = html.count(search)
+        if count == 0:
+            raise PatchError(f"Aranan metin HTML'de bulunamadı: {search[:80]!r}")
+        if count > 1:
+            raise PatchError(f"Aranan metin HTML'de birden fazla kez geçiyor: {search[:80]!r}")
+        html = html.replace(search, replace, 1)
+
+    return html
+
+
+def validate_html(html):
+    """
+    Değişiklik sonrası HTML'in hâlâ tam bir doküman olduğunu doğrular
+
+    Args:
+        html (str): Kontrol edilecek HTML
+
+    Raises:
+        PatchError: Doküman yapısı bozulmuşsa
+    """
+    lowered = html.lower()
+    for tag in ("<html", "</html>", "<body", "</body>"):
+        if lowered.count(tag) != 1:
+            raise PatchError(f"Değişiklik sonrası HTML geçersiz: {tag} etiketi {lowered.count(tag)} kez geçiyor.")
+    if lowered.find("<html") > lowered.find("<body") or lowered.find("</body>") > lowered.find("</html>"):
+        raise PatchError("Değişiklik sonrası HTML etiket sırası bozuk.")
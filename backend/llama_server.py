@@ -0,0 +1,275 @@
+import atexit
+import os
+import subprocess
+import threading
+import time
+
+try:
+    import fcntl  # Süreçler arası dosya kilidi (Windows'ta yok)
+except ImportError:
+    fcntl = None
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# llama.cpp sunucusunun yürütülebilir dosyası ve dinleyeceği yerel adres
+SERVER_BIN = os.environ.get("LLAMA_SERVER_BIN", "llama-server")
+SERVER_HOST = os.environ.get("LLAMA_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("LLAMA_SERVER_PORT", 8081))
+
+# Sunucunun yükleyeceği model dosyası (boşsa uygulamanın modeli kullanılır). Ana model
+# yüklenemediğinde (bozuk dosya, yetersiz bellek vb.) yedeğin işe yaraması için farklı bir model verilebilir.
+SERVER_MODEL = os.environ.get("LLAMA_SERVER_MODEL", "")
+
+# Ayrı çalışan bir llama-server adresi (örn. "http://gpu-host:8080"). Verilirse sunucu
+# süreci başlatılmaz ve yeniden başlatılmaz, yalnızca bu adrese istek gönderilir.
+SERVER_URL = os.environ.get("LLAMA_SERVER_URL", "")
+
+# Sunucu komutuna eklenecek ek argümanlar (örn. "--threads 8 --flash-attn")
+SERVER_EXTRA_ARGS = os.environ.get("LLAMA_SERVER_ARGS", "").split()
+
+# Sunucunun modeli yükleyip hazır olmasının en fazla ne kadar bekleneceği (saniye)
+STARTUP_TIMEOUT = float(os.environ.get("LLAMA_SERVER_STARTUP_TIMEOUT", 300))
+
+# Sağlık kontrolü aralığı ve art arda kaç başarısız kontrolden sonra yeniden başlatılacağı
+HEALTH_INTERVAL = float(os.environ.get("LLAMA_SERVER_HEALTH_INTERVAL", 10))
+MAX_HEALTH_FAILURES = 3
+
+# Sunucuyu başlatma ve denetleme hakkını tek bir sürece veren kilit dosyalarının klasörü
+LOCK_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+# Tek bir üretim isteğinin zaman aşımı (saniye)
+REQUEST_TIMEOUT = float(os.environ.get("LLAMA_SERVER_TIMEOUT", 600))
+
+
+class ServerUnavailableError(Exception):
+    """Sunucu başlatılamadığında veya hazır hale gelmediğinde fırlatılır"""
+
+
+class LlamaServer:
+    """
+    Arka planda sürekli çalışan llama.cpp sunucusu (llama-server) ve ona bağlı istemci
+
+    Sunucu ilk ihtiyaçta başlatılır ve model bir kez yüklenir; sonraki istekler
+    yalnızca yerel bir HTTP isteğine mal olur. İstekler bağlantı havuzlu tek bir
+    requests.Session üzerinden gönderilir (keep-alive). Arka plandaki denetim
+    thread'i /health ile sunucuyu kontrol eder; süreç ölürse veya art arda
+    MAX_HEALTH_FAILURES kontrol başarısız olursa sunucu yeniden başlatılır.
+
+    Model worker'larının her biri kendi LlamaServer örneğini taşır; sunucuyu
+    yalnızca port için kilit dosyasını (fcntl) alan sahip süreç başlatır,
+    denetler ve kapanışta sonlandırır. Diğer süreçler sunucunun hazır olmasını
+    bekleyip ona istek gönderir; sahip süreç sonlanırsa kilit serbest kalır ve
+    sunucuya ilk ihtiyaç duyan süreç sahipliği devralır.
+    base_url verilirse (LLAMA_SERVER_URL) sunucu dışarıda yönetilir; süreç
+    başlatılmaz ve denetlenmez.
+    """
+
+    def __init__(self, model_path, n_ctx, host=SERVER_HOST, port=SERVER_PORT, base_url=SERVER_URL):
+        self.model_path = model_path
+        self.n_ctx = n_ctx
+        self.external = bool(base_url)
+        self.base_url = base_url.rstrip("/") if base_url else f"http://{host}:{port}"
+        self.host = host
+        self.port = port
+        self.process = None
+        self.owner_file = None  # Sahiplik kilidinin tutulduğu dosya (sahip süreçte açık kalır)
+        self.lock = threading.Lock()
+        self.supervisor = None
+        self.restarts = 0
+        self.requests = 0
+        self.failures = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+
+    def command(self):
+        """
+        Sunucuyu başlatan komutu döndürür
+
+        Returns:
+            list[str]: Komut ve argümanları
+        """
+        return [
+            SERVER_BIN,
+            "-m", self.model_path,       # Model dosyası
+            "-c", str(self.n_ctx),       # Context boyutu
+            "-ngl", "999",               # Tüm katmanları GPU'ya yükle (GPU yoksa etkisiz)
+            "--host", self.host,
+            "--port", str(self.port),
+            *SERVER_EXTRA_ARGS
+        ]
+
+    def status(self):
+        """
+        Sunucunun durumunu /health ile kontrol eder
+
+        Returns:
+            str: "ok" (hazır), "loading" (model yükleniyor, 503) veya "down" (yanıt yok)
+        """
+        try:
+            code = self.session.get(f"{self.base_url}/health", timeout=2).status_code
+        except requests.RequestException:
+            return "down"
+        return "ok" if code == 200 else "loading" if code == 503 else "down"
+
+    def healthy(self):
+        """Sunucu modeli yükleyip istek kabul ediyor mu?"""
+        return self.status() == "ok"
+
+    def _acquire_ownership(self):
+        """
+        Sunucuyu bu sürecin başlatıp başlatamayacağını belirler
+
+        Returns:
+            bool: Bu süreç sunucunun sahibiyse True
+        """
+        if self.owner_file is not None:
+            return True
+        if fcntl is None:
+            return True  # Kilit yoksa (Windows) worker havuzu da yoktur, tek süreç sahiptir
+        os.makedirs(LOCK_DIR, exist_ok=True)
+        lock_file = open(os.path.join(LOCK_DIR, f"llama_server-{self.port}.lock"), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self.owner_file = lock_file
+        # Süreç normal şekilde sonlanırken sunucu da kapatılsın (model belleği yetim kalmasın)
+        atexit.register(self.stop_process)
+        return True
+
+    def _spawn(self):
+        print(f"llama-server başlatılıyor: {' '.join(self.command())}")
+        self.process = subprocess.Popen(self.command(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def _wait_ready(self, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.healthy():
+                return True
+            # Süreç sonlandıysa port başka bir süreç tarafından başlatılmış (yüklenmekte olan)
+            # bir sunucu tarafından kullanılıyor olabilir; o da yoksa beklemenin anlamı yok
+            if self.process is not None and self.process.poll() is not None and self.status() == "down":
+                return False
+            time.sleep(0.5)
+        return False
+
+    def ensure_running(self, timeout=STARTUP_TIMEOUT):
+        """
+        Sunucu çalışmıyorsa başlatır ve hazır olmasını bekler
+
+        Args:
+            timeout (float): Maksimum bekleme süresi (saniye)
+
+        Raises:
+            ServerUnavailableError: Model dosyası yoksa, dış sunucu yanıt vermiyorsa
+                veya sunucu (başka bir süreç başlattıysa o da) süre içinde hazır olmazsa
+        """
+        with self.lock:
+            status = self.status()
+            if status == "ok":
+                return
+            if self.external:
+                # Dış sunucu yalnızca model yüklüyorsa beklenir
+                if status == "down" or not self._wait_ready(timeout):
+                    raise ServerUnavailableError(f"llama-server ({self.base_url}) yanıt vermiyor.")
+                return
+            if not os.path.isfile(self.model_path):
+                # Başlatılacak süreç modeli yükleyemez, STARTUP_TIMEOUT kadar beklemeye gerek yok
+                raise ServerUnavailableError(f"llama-server model dosyası bulunamadı: {self.model_path}")
+            if not self._acquire_ownership():
+                # Sunucuyu başka bir süreç başlatır ve denetler, yalnızca hazır olması beklenir
+                if not self._wait_ready(timeout):
+                    raise ServerUnavailableError("Başka bir sürecin yönettiği llama-server zamanında hazır olmadı.")
+                return
+            if self.process is None or self.process.poll() is not None:
+                try:
+                    self._spawn()
+                except OSError as e:
+                    raise ServerUnavailableError(f"llama-server başlatılamadı: {e}")
+            if not self._wait_ready(timeout):
+                raise ServerUnavailableError("llama-server zamanında hazır olmadı.")
+            print("✅ llama-server hazır.")
+            if self.supervisor is None:
+                self.supervisor = threading.Thread(target=self._supervise, name="llama-server-supervisor", daemon=True)
+                self.supervisor.start()
+
+    def restart(self):
+        """Sunucu sürecini sonlandırır ve yeniden başlatır"""
+        with self.lock:
+            print("⚠️ llama-server yeniden başlatılıyor...")
+            self.stop_process()
+            self.restarts += 1
+            try:
+                self._spawn()
+            except OSError as e:
+                print(f"llama-server başlatılamadı: {e}")
+
+    def stop_process(self):
+        """Bu sürecin başlattığı sunucuyu sonlandırır"""
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+    def _supervise(self):
+        failures = 0
+        while True:
+            time.sleep(HEALTH_INTERVAL)
+            # Model yüklenirken /health 503 döner, bu bir hata sayılmaz
+            if self.status() != "down":
+                failures = 0
+                continue
+            died = self.process is not None and self.process.poll() is not None
+            failures += 1
+            if died or failures >= MAX_HEALTH_FAILURES:
+                self.failures += 1
+                failures = 0
+                self.restart()
+
+    def chat(self, content, **params):
+        """
+        Sunucunun OpenAI uyumlu chat completion endpoint'ine istek gönderir
+
+        Args:
+            content (str): Kullanıcı mesajı
+            **params: Örnekleme parametreleri (temperature, max_tokens, stop vb.)
+
+        Returns:
+            dict: OpenAI formatında chat completion yanıtı
+
+        Raises:
+            ServerUnavailableError: Sunucu başlatılamazsa
+            requests.RequestException: İstek başarısız olursa
+        """
+        self.ensure_running()
+        response = self.session.post(
+            f"{self.base_url}/v1/chat/completions",
+            json={"messages": [{"role": "user", "content": content}], **params},
+            timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        self.requests += 1
+        return response.json()
+
+    def stats(self):
+        """
+        Sunucu durumunu döndürür
+
+        Returns:
+            dict: Bu sürecin sunucu sahibi olup olmadığı, çalışma durumu, istek, hata ve yeniden başlatma sayıları
+        """
+        return {
+            "url": self.base_url if self.external else None,
+            "owner": self.owner_file is not None,
+            "running": self.process is not None and self.process.poll() is None,
+            "requests": self.requests,
+            "failures": self.failures,
+            "restarts": self.restarts,
+        }
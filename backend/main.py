@@ -1,15 +1,62 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
+import asyncio
+import json
+import time
 import traceback
 
 import generator  # Site HTML içeriğini oluşturan modül
 import deploy     # Netlify deployment işlemlerini yöneten modül
 import site_storage  # Site verilerini persistent olarak saklayan modül
+import scheduler  # Model üretim işlerini sıraya koyan zamanlayıcı
+import worker_pool  # Çok süreçli model worker havuzu
+import sections     # Bölüm bazlı (section-parallel) sayfa üretimi
+import deploy_tracker  # Deploy'ların yayına girme takibi
+from deploy_coalescer import DeployCoalescer
 
 app = FastAPI()
 
+# Üretim zamanlayıcısı - modele yalnızca bu zamanlayıcının worker thread'leri erişir
+# Worker havuzu açıksa her model worker süreci için bir thread çalışır
+generation_scheduler = scheduler.GenerationScheduler(workers=max(1, worker_pool.worker_count()))
+
+@app.on_event("startup")
+async def start_scheduler():
+    """
+    Uygulama başlarken model yüklemesini arka planda başlatır ve üretim thread'lerini çalıştırır
+
+    Model (veya worker havuzu) sunucu ayağa kalktıktan sonra yüklenir; bu sürede
+    gelen istekler yüklemenin bitmesini bekler.
+    """
+    if not worker_pool.start_pool():
+        generator.start_background_load()
+    generation_scheduler.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Uygulama kapanırken Netlify istemcisinin bağlantı havuzunu kapatır ve model süreçlerini sonlandırır
+
+    Worker'lar ve bu süreç başlattıkları llama-server'ı kapatır; böylece modeli
+    bellekte tutan sunucu backend'den sonra yetim kalmaz.
+    """
+    await deploy.client.aclose()
+    await run_in_threadpool(worker_pool.stop_pool)
+    generator.fallback_server.stop_process()
+
+@app.get("/api/health/ready")
+async def health_ready():
+    """
+    Hazır olma (readiness) endpoint'i
+    - Model yüklenip warm-up çıkarımı tamamlandıysa 200, aksi halde 503 döndürür
+    """
+    state = worker_pool.readiness()
+    return JSONResponse(status_code=200 if state["ready"] else 503, content=state)
+
 # CORS ayarları - Farklı domainlerden gelen isteklere izin vermek için
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +83,18 @@ session = UserSession()
 class PromptRequest(BaseModel):
     prompt: str                # Kullanıcının gönderdiği içerik isteği
     site_name: Optional[str] = None  # Site adı (opsiyonel)
+    fresh: bool = False        # True ise önbellek atlanır, yeni bir varyasyon üretilir
+    incremental: bool = True   # True ise revizyonlarda önceki HTML düzenlenir (revizyon modu)
+    sectioned: bool = False    # True ise sayfa bölüm bölüm, bölümler paralel üretilir
+
+class BatchItem(BaseModel):
+    site_name: str             # Üretilecek sitenin adı
+    prompts: List[str]         # Sitenin prompt geçmişi (ilk eleman temel istek)
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = []  # Üretilecek siteler
+    all_sites: bool = False    # True ise yerel depodaki tüm siteler kayıtlı promptlarıyla yeniden üretilir
+    fresh: bool = False        # True ise önbellek atlanır
 
 class ApproveRequest(BaseModel):
     approve: bool              # Kullanıcı sitenin onayını verdi mi?
@@ -80,7 +139,7 @@ async def check_site_name(req: SiteNameRequest):
             )
         
         # Yerel depoda yoksa Netlify'da var mı kontrol et
-        existing_site_id = deploy.find_existing_site(site_name)
+        existing_site_id = await deploy.find_existing_site(site_name)
         if existing_site_id:
             # Site Netlify'da var ama yerel kayıtta yok - belki farklı bir cihazdan oluşturulmuş
             return SiteInfoResponse(
@@ -103,6 +162,172 @@ async def check_site_name(req: SiteNameRequest):
             message=f"Site kontrolü sırasında hata: {str(e)}"
         )
 
+async def prepare_session(site_name, prompt):
+    """
+    Prompt isteği için session'ı hazırlar
+
+    Site yerel depoda varsa bilgileri ve prompt geçmişi yüklenir, yoksa
+    Netlify'da site bulunur veya oluşturulur. Yeni prompt geçmişe eklenir.
+
+    Üretim sürerken başka bir istek session'ı değiştirebilir; bu yüzden istek
+    boyunca (üretim, deploy ve kayıt) session yerine döndürülen bilgiler kullanılır.
+
+    Args:
+        site_name (str): Normalize edilmiş site adı
+        prompt (str): Kullanıcının gönderdiği yeni prompt
+
+    Returns:
+        dict: İsteğin site bilgileri (site_name, site_id, prompts, previous_html)
+
+    Raises:
+        ValueError: Site adı geçersizse
+        RuntimeError: Netlify sitesi bulunamadı veya oluşturulamadıysa
+    """
+    if not valid_site_name(site_name):
+        raise ValueError("Site adı sadece harfler, rakamlar ve tire (-) içerebilir.")
+
+    # İlk kez mi oluşturuluyor yoksa var olan site mi güncelleniyor?
+    local_site = await run_in_threadpool(site_storage.get_site, site_name)
+
+    if local_site:
+        # Var olan site - önceki promptları yükle
+        site_id = local_site["site_id"]
+        prompts = local_site["prompts"] + [prompt]
+    else:
+        # Yeni site - site yoksa Netlify'da oluştur
+        site_id = await deploy.find_or_create_site(site_name)
+        prompts = [prompt]
+    if not site_id:
+        # Site ID'siz deploy'lar birleştirici (deploy_coalescer) içinde aynı anahtara düşer
+        raise RuntimeError("Netlify sitesi bulunamadı veya oluşturulamadı.")
+
+    # Revizyon modunda düzenlenecek HTML: aynı sitede kalındıysa session'daki son kod,
+    # yoksa yerel depoda saklanan HTML (önceki sitenin HTML'i kullanılmaz)
+    base_html = session.last_code if session.site_name == site_name else ""
+    if not base_html:
+        base_html = await run_in_threadpool(site_storage.get_site_html, site_name)
+
+    # Farklı bir siteye geçildiyse önceki sitenin HTML'i revizyon modunda kullanılmasın
+    if session.site_name != site_name:
+        session.last_code = ""
+    session.site_name = site_name
+    session.site_id = site_id
+    if local_site:
+        session.deploy_url = local_site["deploy_url"]
+    session.prompts = prompts
+
+    return {"site_name": site_name, "site_id": site_id, "prompts": prompts, "previous_html": base_html}
+
+def discard_prompt(context):
+    """
+    Kuyruk dolu olduğu için reddedilen prompt'u session'daki geçmişten çıkarır
+
+    Session bu arada başka bir isteğe geçtiyse dokunulmaz.
+
+    Args:
+        context (dict): prepare_session'ın döndürdüğü istek bilgileri
+    """
+    if session.prompts is context["prompts"]:
+        session.prompts = context["prompts"][:-1]
+
+async def deploy_site(site_name, site_id, prompts, html_code):
+    """
+    HTML'i siteye deploy eder, HTML'i ve site bilgilerini yerel depoya kaydeder
+
+    Aynı siteye art arda gelen deploy'lar birleştirilir: bir deploy sürerken
+    gelen sürümlerden yalnızca en sonuncusu yüklenir (bkz. DeployCoalescer).
+
+    Args:
+        site_name (str): Site adı
+        site_id (str): Netlify site ID'si
+        prompts (list[str]): Sitenin prompt geçmişi
+        html_code (str): Üretilen HTML kodu
+
+    Returns:
+        tuple: (deploy URL'i, deploy ID'si) - sürüm daha yenisiyle birleştirildiyse onu yükleyen deploy'un bilgileri
+    """
+    return await deploy_coalescer.submit(site_id, (site_name, list(prompts), html_code))
+
+async def run_site_deploy(site_id, job):
+    """
+    Birleştirilmiş deploy işini çalıştırır (yalnızca sitenin en son sürümü için çağrılır)
+
+    Args:
+        site_id (str): Netlify site ID'si
+        job (tuple): (site adı, prompt geçmişi, HTML kodu)
+
+    Returns:
+        tuple: (deploy URL'i, deploy ID'si)
+    """
+    site_name, prompts, html_code = job
+    await run_in_threadpool(site_storage.save_site_html, site_name, html_code)
+
+    # Oluşturulan HTML kodunu Netlify'a deploy et
+    details = {}
+    deploy_url = await deploy.deploy_to_site(site_id, html_code, details)
+    
+    # Güncellenmiş site bilgilerini yerel depoya kaydet
+    await run_in_threadpool(
+        site_storage.save_site,
+        site_name=site_name,
+        site_id=site_id,
+        deploy_url=deploy_url,
+        prompts=prompts
+    )
+    return deploy_url, details.get("deploy_id")
+
+# Site bazında deploy birleştirici - hızlı ardışık revizyonlarda ara sürümler yüklenmez
+deploy_coalescer = DeployCoalescer(run_site_deploy)
+
+async def publish_html(context, html_code):
+    """
+    Üretilen HTML'i isteğin sitesine deploy eder ve site bilgilerini kaydeder
+
+    Session hâlâ aynı sitedeyse son kod ve URL session'a da yazılır.
+
+    Args:
+        context (dict): prepare_session'ın döndürdüğü istek bilgileri
+        html_code (str): Üretilen HTML kodu
+
+    Returns:
+        tuple: (deploy URL'i, deploy ID'si)
+    """
+    if session.site_name == context["site_name"]:
+        session.last_code = html_code
+    deploy_url, deploy_id = await deploy_site(context["site_name"], context["site_id"], context["prompts"], html_code)
+    if session.site_name == context["site_name"]:
+        session.deploy_url = deploy_url
+    return deploy_url, deploy_id
+
+def queue_full_response(e):
+    """
+    Kuyruk dolu olduğunda 429 yanıtı oluşturur
+
+    Args:
+        e (scheduler.QueueFullError): Zamanlayıcının fırlattığı hata
+
+    Returns:
+        JSONResponse: Retry-After header'ı içeren 429 yanıtı
+    """
+    return JSONResponse(
+        status_code=429,
+        headers={"Retry-After": str(e.retry_after)},
+        content={"status": "error", "message": str(e), "retry_after": e.retry_after}
+    )
+
+def sse_event(event, data):
+    """
+    Server-Sent Events formatında tek bir olay metni oluşturur
+
+    Args:
+        event (str): Olay adı (token, first_token, done, error)
+        data (dict): JSON olarak gönderilecek veri
+
+    Returns:
+        str: SSE formatında olay metni
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.post("/api/prompt")
 async def handle_prompt(req: PromptRequest):
     """
@@ -117,43 +342,43 @@ async def handle_prompt(req: PromptRequest):
             return {"status": "error", "message": "Site adı zorunludur."}
         
         site_name = req.site_name.strip().lower()
+        if not valid_site_name(site_name):
+            return {"status": "error", "message": "Site adı sadece harfler, rakamlar ve tire (-) içerebilir."}
+        context = await prepare_session(site_name, req.prompt)
+        prompts = context["prompts"]
         
-        # İlk kez mi oluşturuluyor yoksa var olan site mi güncelleniyor?
-        local_site = site_storage.get_site(site_name)
-        
-        if local_site:
-            # Var olan site için session'ı güncelle
-            session.site_name = site_name
-            session.site_id = local_site["site_id"]
-            session.deploy_url = local_site["deploy_url"]
-            session.prompts = local_site["prompts"].copy()  # Önceki promptları yükle
-        else:
-            # Yeni site için session'ı ayarla - site yoksa Netlify'da oluştur
-            session.site_name = site_name
-            session.site_id = deploy.find_or_create_site(site_name)
-            session.prompts = []
-        
-        # Yeni prompt'u geçmişe ekle
-        session.prompts.append(req.prompt)
-        
-        # Tüm prompt geçmişini kullanarak yeni HTML kodu üret
-        html_code = generator.generate_html_with_history(session.prompts)
-        session.last_code = html_code
+        # Tüm prompt geçmişini kullanarak yeni HTML kodu üret (zamanlayıcı thread'inde)
+        try:
+            if req.sectioned:
+                # Bölüm bazlı üretim: plan + paralel bölüm işleri + birleştirme; plan ve her
+                # bölüm zamanlayıcıya bu isteğin önceliğiyle ayrı bir iş olarak girer
+                html_code = await sections.generate_sectioned_page(
+                    generation_scheduler, prompts, site_name, req.fresh,
+                    priority=scheduler.PRIORITY_NEW_SITE
+                )
+            else:
+                future = generation_scheduler.submit(
+                    worker_pool.run_generator, "generate_html_with_history", {
+                        "prompts": prompts,
+                        "site_name": site_name,
+                        "fresh": req.fresh,
+                        "previous_html": context["previous_html"],
+                        "incremental": req.incremental
+                    },
+                    priority=scheduler.priority_for(prompts)
+                )
+                html_code = await asyncio.wrap_future(future)
+        except scheduler.QueueFullError as e:
+            discard_prompt(context)  # Reddedilen prompt geçmişe eklenmesin
+            return queue_full_response(e)
 
-        # Oluşturulan HTML kodunu Netlify'a deploy et
-        session.deploy_url = deploy.deploy_to_site(session.site_id, html_code)
-        
-        # Güncellenmiş site bilgilerini yerel depoya kaydet
-        site_storage.save_site(
-            site_name=session.site_name,
-            site_id=session.site_id,
-            deploy_url=session.deploy_url,
-            prompts=session.prompts
-        )
+        # Netlify'a deploy et ve site bilgilerini kaydet
+        deploy_url, deploy_id = await publish_html(context, html_code)
         
         return {
             "status": "ok",
-            "deploy_url": session.deploy_url,
+            "deploy_url": deploy_url,
+            "deploy_id": deploy_id,
             "message": "Site başarıyla oluşturuldu/güncellendi."
         }
     except Exception as e:
@@ -162,13 +387,188 @@ async def handle_prompt(req: PromptRequest):
         traceback.print_exc()
         return {"status": "error", "message": f"İşlem sırasında hata: {str(e)}"}
 
+@app.post("/api/prompt/stream")
+async def handle_prompt_stream(req: PromptRequest):
+    """
+    /api/prompt endpoint'inin streaming versiyonu
+    - Üretilen token'ları Server-Sent Events olarak anında istemciye iletir
+    - İlk token süresini (TTFT) "first_token" olayıyla bildirir
+    - Akış bitince siteyi deploy eder ve "done" olayıyla URL ve ölçümleri döndürür
+    """
+    if not req.site_name:
+        return {"status": "error", "message": "Site adı zorunludur."}
+
+    site_name = req.site_name.strip().lower()
+    if not valid_site_name(site_name):
+        return {"status": "error", "message": "Site adı sadece harfler, rakamlar ve tire (-) içerebilir."}
+    try:
+        context = await prepare_session(site_name, req.prompt)
+    except Exception as e:
+        print(f"Hata oluştu: {str(e)}")
+        traceback.print_exc()
+        return {"status": "error", "message": f"İşlem sırasında hata: {str(e)}"}
+    prompts = context["prompts"]
+
+    # Üretim olayları zamanlayıcı thread'inden event loop'a bu kuyruk ile aktarılır
+    loop = asyncio.get_running_loop()
+    stream_events = asyncio.Queue()
+
+    def push_event(event):
+        loop.call_soon_threadsafe(stream_events.put_nowait, event)
+
+    try:
+        future = generation_scheduler.submit(
+            worker_pool.run_generator, "generate_html_stream",
+            {"prompts": prompts, "site_name": site_name, "fresh": req.fresh, "previous_html": context["previous_html"]},
+            push_event,
+            priority=scheduler.priority_for(prompts)
+        )
+    except scheduler.QueueFullError as e:
+        discard_prompt(context)  # Reddedilen prompt geçmişe eklenmesin
+        return queue_full_response(e)
+    # İş bittiğinde (başarılı veya hatalı) akışı sonlandırmak için None gönder
+    future.add_done_callback(lambda f: loop.call_soon_threadsafe(stream_events.put_nowait, None))
+
+    async def events():
+        try:
+            yield sse_event("queued", generation_scheduler.stats())
+            while True:
+                event = await stream_events.get()
+                if event is None:
+                    break
+                if event["type"] == "token":
+                    yield sse_event("token", {"text": event["text"]})
+                elif event["type"] == "first_token":
+                    yield sse_event("first_token", {"ttft": event["ttft"]})
+                elif event["type"] == "done":
+                    deploy_url, deploy_id = await publish_html(context, event["html"])
+                    yield sse_event("done", {
+                        "status": "ok",
+                        "deploy_url": deploy_url,
+                        "deploy_id": deploy_id,
+                        "ttft": event["ttft"],
+                        "elapsed": event["elapsed"],
+                        "cached": event["cached"],
+                        "usage": event["usage"],
+                        "message": "Site başarıyla oluşturuldu/güncellendi."
+                    })
+            future.result()  # Üretim sırasında oluşan hatayı yükselt
+        except Exception as e:
+            print(f"Stream hatası: {str(e)}")
+            traceback.print_exc()
+            yield sse_event("error", {"status": "error", "message": f"İşlem sırasında hata: {str(e)}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+def valid_site_name(site_name):
+    """Site adı sadece harf, rakam ve tire içerebilir"""
+    return bool(site_name) and all(c.isalnum() or c == '-' for c in site_name)
+
+async def run_batch_item(index, item, fresh, slots):
+    """
+    Toplu üretimde tek bir siteyi üretir ve deploy eder
+
+    Global session kullanılmaz; site bilgileri doğrudan yerel depodan okunur.
+    Kuyruk doluysa Retry-After süresi kadar beklenip tekrar denenir.
+
+    Args:
+        index (int): Öğenin istekteki sırası
+        item (BatchItem): Site adı ve promptları
+        fresh (bool): True ise önbellek atlanır
+        slots (asyncio.Semaphore): Aynı anda kuyruğa verilecek iş sayısını sınırlar
+
+    Returns:
+        dict: Öğenin sonucu (NDJSON satırı olarak gönderilir)
+    """
+    site_name = item.site_name.strip().lower()
+    started = time.perf_counter()
+    result = {"type": "item", "index": index, "site_name": site_name}
+    try:
+        if not valid_site_name(site_name):
+            raise ValueError("Site adı sadece harfler, rakamlar ve tire (-) içerebilir.")
+        if not item.prompts:
+            raise ValueError("En az bir prompt(komut) verilmelidir.")
+
+        local_site = await run_in_threadpool(site_storage.get_site, site_name)
+        site_id = local_site["site_id"] if local_site else await deploy.find_or_create_site(site_name)
+        if not site_id:
+            # Site ID'siz deploy'lar birleştirici (deploy_coalescer) içinde aynı anahtara düşer
+            raise RuntimeError("Netlify sitesi bulunamadı veya oluşturulamadı.")
+
+        async with slots:
+            while True:
+                try:
+                    future = generation_scheduler.submit(
+                        worker_pool.run_generator, "generate_html_with_history", {
+                            "prompts": item.prompts,
+                            "site_name": site_name,
+                            "fresh": fresh,
+                            "incremental": False
+                        },
+                        priority=scheduler.PRIORITY_BATCH
+                    )
+                    break
+                except scheduler.QueueFullError as e:
+                    await asyncio.sleep(e.retry_after)
+            html_code = await asyncio.wrap_future(future)
+        generated = time.perf_counter() - started
+
+        # Bir sonraki site üretilirken bu site deploy edilir
+        deploy_url, deploy_id = await deploy_site(site_name, site_id, item.prompts, html_code)
+        if session.site_name == site_name:
+            session.last_code = html_code  # Revizyon modu eski HTML'i düzenlemesin
+        result.update({"status": "ok", "deploy_url": deploy_url, "deploy_id": deploy_id,
+                       "generation_seconds": generated, "elapsed": time.perf_counter() - started})
+    except Exception as e:
+        print(f"Toplu üretim hatası ({site_name}): {str(e)}")
+        traceback.print_exc()
+        result.update({"status": "error", "message": str(e), "elapsed": time.perf_counter() - started})
+    return result
+
+@app.post("/api/batch_generate")
+async def batch_generate(req: BatchRequest):
+    """
+    Birden fazla siteyi toplu olarak üreten ve deploy eden endpoint
+    - Her öğe (site_name, prompts) ayrı bir üretim işi olarak zamanlayıcıya verilir
+    - Kuyrukta aynı anda en fazla worker sayısı kadar toplu iş bulunur; biri bitince sıradaki eklenir
+    - Toplu işler etkileşimli isteklerin arkasında bekler (PRIORITY_BATCH)
+    - Her site üretilir üretilmez deploy edilir ve sonucu NDJSON satırı olarak döndürülür
+    """
+    items = list(req.items)
+    if req.all_sites:
+        sites = await run_in_threadpool(site_storage.get_all_sites)
+        items.extend(BatchItem(site_name=name, prompts=info["prompts"])
+                     for name, info in sites.items() if info.get("prompts"))
+    if not items:
+        return {"status": "error", "message": "Üretilecek site bulunamadı."}
+
+    slots = asyncio.Semaphore(generation_scheduler.workers)
+
+    async def results():
+        started = time.perf_counter()
+        yield json.dumps({"type": "accepted", "items": len(items)}) + "\n"
+        tasks = [asyncio.ensure_future(run_batch_item(i, item, req.fresh, slots)) for i, item in enumerate(items)]
+        ok = 0
+        try:
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                ok += result["status"] == "ok"
+                yield json.dumps(result, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()  # İstemci bağlantıyı kapattıysa kalan işler başlatılmasın
+        yield json.dumps({"type": "summary", "ok": ok, "failed": len(items) - ok,
+                          "elapsed": time.perf_counter() - started}) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 @app.post("/api/approve")
 async def approve_site(req: ApproveRequest):
     """
     Kullanıcı site önizlemesini onayladığında çağrılan endpoint
     - Netlify'da sitenin kalıcı kurulumunu tamamlar
     - Özel ayarları yapılandırır
-    - Kalıcı URL'i döndürür
+    - Kalıcı URL'i ve kurulum adımlarının sürelerini döndürür
     """
     try:
         if not session.site_id:
@@ -179,7 +579,7 @@ async def approve_site(req: ApproveRequest):
         
         if req.approve:
             # Kullanıcı onayladı, site kurulum işlemlerini tamamla
-            final_url = deploy.finalize_site_setup(session.site_id)
+            final_url = await deploy.finalize_site_setup(session.site_id)
             
             if final_url:
                 session.deploy_url = final_url
@@ -195,12 +595,14 @@ async def approve_site(req: ApproveRequest):
                 return {
                     "status": "approved", 
                     "deploy_url": final_url,
+                    "setup": deploy.site_setup.report(session.site_id),
                     "message": "Site kurulumu tamamlandı ve yayına alındı."
                 }
             else:
                 return {
                     "status": "error",
                     "deploy_url": session.deploy_url,
+                    "setup": deploy.site_setup.report(session.site_id),
                     "message": "Site kurulum işlemi sırasında hata oluştu."
                 }
         else:
@@ -229,13 +631,103 @@ async def get_status():
     """
     Mevcut oturum durumunu getiren endpoint
     - Geçerli site adı, URL ve prompt sayısını döndürür
+    - llama-server yedeğinin istek, hata ve yeniden başlatma sayılarını (worker'lardan toplanarak) döndürür
     """
     return {
         "site_name": session.site_name,
         "deploy_url": session.deploy_url,
-        "prompts_count": len(session.prompts)
+        "prompts_count": len(session.prompts),
+        "queue": generation_scheduler.stats(),
+        "workers": worker_pool.pool.stats() if worker_pool.pool else None,
+        "llama_server": worker_pool.process_stats().get("llama_server"),
+        "netlify": deploy.client.stats(),
+        "site_index": deploy.site_index.stats(),
+        "deploys": deploy_coalescer.stats(),
+        "deploy_tracking": deploy.deploy_tracker.stats()
+    }
+
+@app.get("/api/cache")
+async def get_cache_stats():
+    """
+    Önbellek istatistiklerini getiren endpoint
+    - Site bazında model durumu önbelleğinin isabet/ıska sayılarını toplamda ve üretim
+      moduna göre (by_mode: html, stream, revision) döndürür
+    - Üretim sonucu önbelleğinin katman bazında istatistiklerini döndürür
+    - Worker havuzu açıksa sayaçlar tüm worker'lardan toplanır (her worker son işinden sonraki durumunu bildirir)
+    """
+    stats = worker_pool.process_stats()
+    return {
+        "prompt_state": stats.get("prompt_state", {}),
+        "results": stats.get("results", {}),
+        "processes": stats["processes"]
     }
 
+@app.get("/api/metrics")
+async def get_metrics():
+    """
+    Üretim metriklerini getiren endpoint
+    - Decode moduna (standart / prompt-lookup) göre istek, token ve token/sn değerlerini döndürür
+    - Prompt-lookup taslak kabul oranını tahmin olarak (acceptance_rate_estimate) döndürür
+    - </html> ile erken durmanın token tasarrufunu üst sınır olarak (tokens_saved_upper_bound) döndürür
+    - Worker havuzu açıksa sayaçlar tüm worker'lardan toplanır
+    """
+    stats = worker_pool.process_stats()
+    return {
+        **generator.decoding_report(stats.get("decoding", {})),
+        "token_savings": stats.get("token_savings", {}),
+        "processes": stats["processes"]
+    }
+
+@app.get("/api/tokens")
+async def get_token_usage():
+    """
+    Token kullanım istatistiklerini getiren endpoint
+    - İstek bazında prompt ve completion token sayılarını döndürür
+    - Prompt geçmişinin kaç istekte sıkıştırıldığını döndürür
+    """
+    return worker_pool.usage.report()
+
+@app.get("/api/queue")
+async def get_queue():
+    """
+    Üretim kuyruğunun durumunu getiren endpoint
+    - Kuyruk derinliği, çalışan iş sayısı ve bekleme sürelerini döndürür
+    """
+    return generation_scheduler.stats()
+
+@app.get("/api/deploys/{deploy_id}")
+async def get_deploy_status(deploy_id: str, wait: float = 0):
+    """
+    Deploy'un Netlify'daki durumunu getiren endpoint
+    - Durumu (uploaded, processing, ready, error...) ve yükleme, işleme ve yayına girme sürelerini döndürür
+    - wait verilirse deploy sonuçlanana kadar en fazla wait saniye (en fazla 60) bekler (long polling)
+    """
+    if wait > 0:
+        record = await deploy.deploy_tracker.wait(deploy_id, min(wait, 60))
+    else:
+        record = deploy.deploy_tracker.get(deploy_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Deploy bulunamadı.")
+    return record
+
+@app.post("/api/netlify/deploy_hook")
+async def netlify_deploy_hook(request: Request):
+    """
+    Netlify deploy bildirimlerini (outgoing webhook) alan endpoint
+    - NETLIFY_WEBHOOK_SECRET tanımlıysa X-Webhook-Signature imzası doğrulanır
+    - Takip edilen deploy'un durumu sorgu beklenmeden güncellenir
+    """
+    body = await request.body()
+    if not deploy_tracker.WEBHOOK_SECRET:
+        raise HTTPException(status_code=404, detail="Webhook bildirimleri kapalı.")
+    if not deploy_tracker.verify_signature(body, request.headers.get("X-Webhook-Signature", "")):
+        raise HTTPException(status_code=401, detail="Geçersiz imza.")
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Geçersiz JSON.")
+    return {"status": "ok", "tracked": deploy.deploy_tracker.notify(payload)}
+
 @app.post("/api/reset")
 async def reset_session():
     """
@@ -270,7 +762,7 @@ async def add_custom_domain(req: DomainRequest):
             return {"status": "error", "message": "Geçersiz domain formatı. Örnek: example.com"}
         
         # Domain'i Netlify'a ekle
-        success = deploy.add_custom_domain(session.site_id, domain)
+        success = await deploy.add_custom_domain(session.site_id, domain)
         
         if success:
             return {"status": "ok", "message": f"{domain} başarıyla eklendi ve birincil domain olarak ayarlandı."}
@@ -350,7 +842,8 @@ async def reset_site_content():
         
         # Site içeriğini sıfırla - deploy_to_site fonksiyonu ile
         print(f"Site sıfırlanıyor: {session.site_id}")
-        deploy_url = deploy.deploy_to_site(session.site_id, varsayilan_html)
+        details = {}
+        deploy_url = await deploy.deploy_to_site(session.site_id, varsayilan_html, details)
         
         if deploy_url:
             # Oturumdaki site bilgilerini koru ama prompt geçmişini temizle
@@ -358,6 +851,7 @@ async def reset_site_content():
             session.prompts = []  # Prompt geçmişini temizle
             session.last_code = varsayilan_html
             session.deploy_url = deploy_url
+            site_storage.save_site_html(session.site_name, varsayilan_html)
             
             print(f"Site sıfırlandı, eski prompt sayısı: {len(old_prompts)}")
             
@@ -372,6 +866,7 @@ async def reset_site_content():
             return {
                 "status": "ok",
                 "deploy_url": deploy_url,
+                "deploy_id": details.get("deploy_id"),
                 "message": "Site içeriği başarıyla sıfırlandı ve prompt geçmişi temizlendi."
             }
         else:
@@ -0,0 +1,303 @@
+import asyncio
+import os
+import random
+import time
+
+import httpx
+
+# Netlify API adresi - testler ve yerel sahte sunucu için değiştirilebilir
+NETLIFY_API_URL = os.environ.get("NETLIFY_API_URL", "https://api.netlify.com/api/v1").rstrip("/")
+
+# İstek zaman aşımları (saniye) - dosya yüklemelerinde okuma/yazma süresi daha uzun tutulur
+CONNECT_TIMEOUT = float(os.environ.get("NETLIFY_CONNECT_TIMEOUT", 5))
+REQUEST_TIMEOUT = float(os.environ.get("NETLIFY_TIMEOUT", 30))
+UPLOAD_TIMEOUT = float(os.environ.get("NETLIFY_UPLOAD_TIMEOUT", 120))
+
+# Bağlantı havuzu boyutu - aynı anda açık tutulacak en fazla bağlantı
+MAX_CONNECTIONS = int(os.environ.get("NETLIFY_MAX_CONNECTIONS", 16))
+
+# Geçici hatalarda (bağlantı hatası, 429, 5xx) en fazla deneme sayısı ve bekleme süreleri
+MAX_ATTEMPTS = int(os.environ.get("NETLIFY_MAX_ATTEMPTS", 4))
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 30.0
+
+# Başlık bilgisi gelene kadar kullanılan istek hızı (dakikada) - Netlify'ın genel sınırı 500/dk
+RATE_LIMIT_PER_MINUTE = int(os.environ.get("NETLIFY_RATE_LIMIT", 500))
+
+# Tekrar denenecek HTTP durum kodları
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Tekrarlanması yan etki oluşturmayan (idempotent) metotlar - yalnızca bunlar zaman aşımı ve
+# 5xx sonrasında tekrar denenir. POST (site/deploy oluşturma, restore, domain ekleme) Netlify'a
+# ulaşıp işlenmiş olabileceğinden yalnızca isteğin gönderilmediği kesin olan durumlarda
+# (bağlantı kurulamadı, 429) tekrar denenir; aksi halde çift site veya deploy oluşabilir
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "PATCH", "DELETE"}
+
+# İstek sunucuya hiç gönderilmeden oluşan bağlantı hataları - her metotta tekrar denenebilir
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class NetlifyError(Exception):
+    """Netlify API'sine tüm denemelere rağmen ulaşılamadığında fırlatılır"""
+
+
+class RateLimiter:
+    """
+    Netlify'ın X-RateLimit-* başlıklarına uyan token bucket sınırlayıcı
+
+    Her istek bir token harcar; token'lar saniyede rate kadar yenilenir. Yanıtlarda
+    X-RateLimit-Remaining ve X-RateLimit-Reset gelirse kalan istek hakkı
+    sıfırlanma anına kadar eşit aralıklarla dağıtılır; hak bittiyse (veya 429
+    alındıysa) sıfırlanma anına kadar yeni istek gönderilmez.
+    """
+
+    def __init__(self, per_minute=RATE_LIMIT_PER_MINUTE):
+        self.capacity = max(1.0, per_minute / 60 * 10)  # En fazla ~10 saniyelik ani istek
+        self.base_rate = self.rate = per_minute / 60
+        self.rate_until = 0.0  # Başlıklardan gelen hız bu ana (sınırın sıfırlanması) kadar geçerlidir
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = asyncio.Lock()
+        self.waited = 0.0
+
+    def _refill(self, now):
+        if self.rate_until and now >= self.rate_until:
+            self.rate, self.rate_until = self.base_rate, 0.0
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        """Bir istek hakkı alınana kadar bekler"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                delay = self.blocked_until - now
+                if delay <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                if delay <= 0:
+                    delay = (1 - self.tokens) / self.rate
+                self.waited += delay
+                await asyncio.sleep(delay)
+
+    def update(self, headers):
+        """
+        Yanıt başlıklarındaki sınır bilgisini uygular
+
+        Args:
+            headers (httpx.Headers): Yanıt başlıkları
+        """
+        try:
+            remaining = int(headers["X-RateLimit-Remaining"])
+            reset_in = max(1.0, float(headers["X-RateLimit-Reset"]) - time.time())
+        except (KeyError, ValueError):
+            return
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = min(self.tokens, remaining)
+        if remaining <= 0:
+            self.blocked_until = now + reset_in
+        else:
+            self.rate = max(remaining / reset_in, 0.1)
+            self.rate_until = now + reset_in
+
+    def block(self, seconds):
+        """429 alındığında sınırlayıcıyı verilen süre kadar durdurur"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+def retry_delay(response, attempt):
+    """
+    Bir sonraki denemeden önce beklenecek süreyi hesaplar
+
+    429 yanıtlarında Retry-After veya X-RateLimit-Reset başlığına uyulur,
+    diğer durumlarda "full jitter" ile üstel bekleme kullanılır.
+
+    Args:
+        response (httpx.Response or None): Son yanıt (bağlantı hatasında None)
+        attempt (int): Kaçıncı deneme olduğu (0'dan başlar)
+
+    Returns:
+        float: Bekleme süresi (saniye)
+    """
+    if response is not None and response.status_code == 429:
+        try:
+            return min(BACKOFF_MAX, float(response.headers["Retry-After"]))
+        except (KeyError, ValueError):
+            pass
+        try:
+            return min(BACKOFF_MAX, max(0.0, float(response.headers["X-RateLimit-Reset"]) - time.time()))
+        except (KeyError, ValueError):
+            pass
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class NetlifyClient:
+    """
+    Netlify API'si için asenkron istemci
+
+    Tüm istekler bağlantı havuzlu tek bir httpx.AsyncClient üzerinden
+    gönderilir. Her isteğin zaman aşımı vardır; geçici hatalar jitter'lı üstel
+    bekleme ile MAX_ATTEMPTS kez denenir ve istekler RateLimiter ile Netlify'ın
+    istek sınırının altında tutulur. İdempotent metotlar bağlantı hataları, 429
+    ve 5xx yanıtlarında, POST istekleri ise yalnızca gönderilemediğinde veya
+    429 aldığında tekrar denenir (bkz. IDEMPOTENT_METHODS).
+
+    Metotlar son yanıtı (httpx.Response) döndürür; durum kodunu çağıran kontrol
+    eder. İstek bağlantı hatasıyla sonuçlanırsa NetlifyError fırlatılır.
+
+    Args:
+        token (str): Netlify kişisel erişim tokeni
+        base_url (str): API adresi
+        transport (httpx.AsyncBaseTransport, optional): Özel transport (benchmark ve testlerde sahte API için)
+    """
+
+    def __init__(self, token, base_url=NETLIFY_API_URL, transport=None):
+        self.token = token
+        self.base_url = base_url
+        self.transport = transport
+        self.limiter = RateLimiter()
+        self.client = None
+        self.loop = None
+        self.requests = 0
+        self.retries = 0
+        self.throttled = 0
+
+    def _client(self):
+        # İstemci ilk istekte, çalışan event loop içinde oluşturulur; bağlantılar ve kilitler
+        # loop'a bağlı olduğundan farklı bir loop'ta (örn. asyncio.run ile betiklerde) yeniden oluşturulur
+        loop = asyncio.get_running_loop()
+        if self.client is None or self.client.is_closed or self.loop is not loop:
+            self.loop = loop
+            self.limiter.lock = asyncio.Lock()
+            self.client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.token}"},
+                timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+                transport=self.transport,
+            )
+        return self.client
+
+    async def request(self, method, path, **kwargs):
+        """
+        API'ye istek gönderir, geçici hatalarda tekrar dener
+
+        Args:
+            method (str): HTTP metodu
+            path (str): API yolu (örn. "/sites")
+            **kwargs: httpx isteği parametreleri (json, content, params, timeout vb.)
+
+        Returns:
+            httpx.Response: Son yanıt
+
+        Raises:
+            NetlifyError: İstek bağlantı hatası veya zaman aşımıyla biterse (tekrar denenebiliyorsa tüm denemelerden sonra)
+        """
+        client = self._client()
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(MAX_ATTEMPTS):
+            await self.limiter.acquire()
+            self.requests += 1
+            try:
+                response = await client.request(method, path, **kwargs)
+            except httpx.TransportError as e:
+                response = None
+                error = e
+                print(f"Netlify isteği başarısız ({method} {path}): {e!r}")
+                retryable = idempotent or isinstance(e, NOT_SENT_ERRORS)
+            else:
+                self.limiter.update(response.headers)
+                if response.status_code not in RETRY_STATUSES:
+                    return response
+                print(f"Netlify geçici hata ({method} {path}): {response.status_code}")
+                retryable = idempotent or response.status_code == 429
+
+            if attempt == MAX_ATTEMPTS - 1 or not retryable:
+                break
+            delay = retry_delay(response, attempt)
+            if response is not None and response.status_code == 429:
+                self.throttled += 1
+                self.limiter.block(delay)
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+        if response is None:
+            raise NetlifyError(f"Netlify API'sine ulaşılamadı ({method} {path}): {error}")
+        return response
+
+    # --- Siteler ---
+
+    async def list_sites(self, page=1, per_page=100, name=None):
+        params = {"page": page, "per_page": per_page}
+        if name:
+            params["name"] = name
+        return await self.request("GET", "/sites", params=params)
+
+    async def get_site(self, site_id):
+        return await self.request("GET", f"/sites/{site_id}")
+
+    async def create_site(self, name):
+        return await self.request("POST", "/sites", json={"name": name})
+
+    async def update_site(self, site_id, settings):
+        return await self.request("PATCH", f"/sites/{site_id}", json=settings)
+
+    # --- Deploy'lar ve dosyalar ---
+
+    async def create_deploy(self, site_id, files):
+        return await self.request("POST", f"/sites/{site_id}/deploys", json={"files": files})
+
+    async def deploy_zip(self, site_id, archive):
+        return await self.request(
+            "POST", f"/sites/{site_id}/deploys",
+            content=archive,
+            headers={"Content-Type": "application/zip"},
+            timeout=httpx.Timeout(UPLOAD_TIMEOUT, connect=CONNECT_TIMEOUT)
+        )
+
+    async def get_deploy(self, deploy_id):
+        return await self.request("GET", f"/deploys/{deploy_id}")
+
+    async def upload_file(self, deploy_id, path, content):
+        return await self.request(
+            "PUT", f"/deploys/{deploy_id}/files/{path}",
+            content=content,
+            headers={"Content-Type": "application/octet-stream"},
+            timeout=httpx.Timeout(UPLOAD_TIMEOUT, connect=CONNECT_TIMEOUT)
+        )
+
+    async def restore_deploy(self, site_id, deploy_id):
+        return await self.request("POST", f"/sites/{site_id}/deploys/{deploy_id}/restore")
+
+    # --- Domainler ---
+
+    async def add_domain(self, site_id, hostname):
+        return await self.request("POST", f"/sites/{site_id}/domains", json={"hostname": hostname})
+
+    async def set_primary_domain(self, site_id, hostname):
+        return await self.request("POST", f"/sites/{site_id}/domain_aliases/{hostname}/primary")
+
+    async def aclose(self):
+        """Bağlantı havuzunu kapatır"""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def stats(self):
+        """
+        İstemci istatistiklerini döndürür
+
+        Returns:
+            dict: İstek, tekrar deneme ve 429 sayıları ile sınırlayıcı durumu
+        """
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "rate_per_sec": self.limiter.rate,
+            "rate_limit_wait_seconds": self.limiter.waited,
+        }
@@ -0,0 +1,192 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+
+try:
+    import fcntl  # Süreçler arası dosya kilidi (Windows'ta yok)
+except ImportError:
+    fcntl = None
+
+# Model durumlarının (KV-cache) saklanacağı klasör
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "prompt_cache")
+
+# Diskte tutulacak toplam durum boyutu - aşılınca en eski kullanılan durumlar silinir
+CAPACITY_BYTES = int(os.environ.get("PROMPT_CACHE_BYTES", 2 * 1024 ** 3))
+
+
+class PromptStateCache:
+    """
+    Site bazında llama.cpp model durumunu (save_state/load_state) diskte saklayan önbellek
+
+    Her site için son üretimden sonraki model durumu ve o üretimde kullanılan
+    birleştirilmiş prompt saklanır. Yeni revizyonun birleştirilmiş prompt'u saklanan
+    prompt ile başlıyorsa (önek eşleşmesi) durum geri yüklenir. Llama, yüklenen
+    durumdaki token'lar ile yeni prompt'un token'larının en uzun ortak önekini
+    kendisi bulur ve yalnızca kalan son eki değerlendirir.
+
+    Dosyalar toplam boyut sınırına göre LRU mantığıyla silinir; son kullanım
+    zamanı dosyanın mtime değeri ile takip edilir.
+
+    İsabetler üretim moduna göre de sayılır (by_mode). Revizyon modu (değişiklik
+    blokları) prompt'u önceki HTML ile başlattığından prompt geçmişiyle ortak
+    öneki yoktur; bu modda durum ne yüklenir ne saklanır ve her revizyon ıska
+    olarak sayılır. Böylece revizyon modunun prefill tasarrufu ile KV-cache'i
+    kullanmamasının bedeli /api/cache'te yan yana görülür.
+
+    Klasör worker süreçleri arasında paylaşılır: her yazma benzersiz bir geçici
+    dosyaya yapılıp atomik olarak yerine taşınır; yazma ve silme adımları süreç
+    içinde thread kilidi, süreçler arasında (destekleniyorsa) fcntl dosya kilidi
+    ile sıraya girer.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, capacity_bytes=CAPACITY_BYTES):
+        self.cache_dir = cache_dir
+        self.capacity_bytes = capacity_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.by_mode = {}  # Üretim modu -> {"hits": ..., "misses": ...}
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, site_name):
+        key = hashlib.sha1(site_name.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.state")
+
+    def _count(self, mode, hit):
+        counts = self.by_mode.setdefault(mode, {"hits": 0, "misses": 0})
+        if hit:
+            self.hits += 1
+            counts["hits"] += 1
+        else:
+            self.misses += 1
+            counts["misses"] += 1
+
+    def record(self, mode, hit):
+        """
+        Diske bakılmadan sonuçlanan bir kullanımı sayar
+
+        Model durumu zaten bellekteyse (isabet) veya mod önbelleği hiç kullanmıyorsa
+        (ıska, örn. revizyon modu) lookup çağrılmaz; hit_rate yine de tüm üretimleri
+        yansıtsın diye sonuç burada sayılır.
+
+        Args:
+            mode (str): Üretim modu (örn. "html", "stream", "revision")
+            hit (bool): Model durumu yeniden kullanıldı mı?
+        """
+        with self.lock:
+            self._count(mode, hit)
+
+    def lookup(self, site_name, prompt_text, mode="html"):
+        """
+        Site için saklanan model durumunu getirir
+
+        Args:
+            site_name (str): Site adı
+            prompt_text (str): Yeni üretimin birleştirilmiş prompt'u
+            mode (str): İstatistikler için üretim modu
+
+        Returns:
+            llama_cpp.LlamaState or None: Önek eşleşirse saklanan durum, yoksa None
+        """
+        path = self._path(site_name)
+        with self.lock:
+            try:
+                with open(path, "rb") as f:
+                    entry = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                self._count(mode, False)
+                return None
+
+            if not prompt_text.startswith(entry["prompt"]):
+                # Prompt geçmişi değişmiş (örn. site sıfırlanmış), durum kullanılamaz
+                self._count(mode, False)
+                return None
+
+            self._count(mode, True)
+            try:
+                os.utime(path)  # LRU için son kullanım zamanını güncelle
+            except OSError:
+                pass  # Okunduktan sonra başka bir süreç tarafından silinmiş olabilir
+            return entry["state"]
+
+    def store(self, site_name, prompt_text, state):
+        """
+        Site için model durumunu diske kaydeder ve kapasite aşıldıysa eski durumları siler
+
+        Args:
+            site_name (str): Site adı
+            prompt_text (str): Üretimde kullanılan birleştirilmiş prompt
+            state (llama_cpp.LlamaState): model.save_state() çıktısı
+        """
+        path = self._path(site_name)
+        with self.lock, open(os.path.join(self.cache_dir, ".lock"), "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump({"prompt": prompt_text, "state": state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, path)  # Yarım yazılmış dosya okunmasın
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".state"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        # En eski kullanılan durumlardan başlayarak kapasite altına inene kadar sil
+        # (son yazılan durum her zaman korunur)
+        for _, size, name in sorted(entries)[:-1]:
+            if total <= self.capacity_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Önbellek istatistiklerini döndürür
+
+        Returns:
+            dict: İsabet/ıska sayıları, oran, mod bazında isabet/ıska/oran (by_mode)
+                ve diskteki toplam boyut
+        """
+        with self.lock:
+            sizes = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".state"):
+                    continue
+                try:
+                    sizes.append(os.path.getsize(os.path.join(self.cache_dir, name)))
+                except OSError:
+                    pass  # Başka bir süreç tarafından silinmiş
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "by_mode": {
+                    mode: {**counts, "hit_rate": counts["hits"] / (counts["hits"] + counts["misses"])}
+                    for mode, counts in self.by_mode.items()
+                },
+                "evictions": self.evictions,
+                "entries": len(sizes),
+                "bytes": sum(sizes),
+                "capacity_bytes": self.capacity_bytes,
+            }
@@ -0,0 +1,168 @@
+import os
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    import fcntl  # Süreçler arası dosya kilidi (Windows'ta yok)
+except ImportError:
+    fcntl = None
+
+# Sıkıştırılmış üretim sonuçlarının saklanacağı klasör
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "result_cache")
+
+# Bellek ve disk katmanlarının toplam boyut sınırları
+MEMORY_CAPACITY_BYTES = int(os.environ.get("RESULT_CACHE_MEMORY_BYTES", 32 * 1024 ** 2))
+DISK_CAPACITY_BYTES = int(os.environ.get("RESULT_CACHE_DISK_BYTES", 512 * 1024 ** 2))
+
+
+class ResultCache:
+    """
+    Üretilen HTML sonuçlarını içerik adresli (hash anahtarlı) saklayan iki katmanlı önbellek
+
+    1. Bellek katmanı: Toplam byte sınırına göre LRU ile tutulan sözlük
+    2. Disk katmanı: zlib ile sıkıştırılmış dosyalar, toplam byte sınırı aşılınca
+       en eski kullanılanlar (mtime) silinir
+
+    Diskten okunan sonuçlar bellek katmanına geri yüklenir. Disk katmanı worker
+    süreçleri arasında paylaşılır; yazma ve silme adımları prompt_cache'teki gibi
+    benzersiz geçici dosya ve fcntl kilidi ile yapılır.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, memory_capacity=MEMORY_CAPACITY_BYTES,
+                 disk_capacity=DISK_CAPACITY_BYTES):
+        self.cache_dir = cache_dir
+        self.memory_capacity = memory_capacity
+        self.disk_capacity = disk_capacity
+        self.memory = OrderedDict()  # key -> HTML (str)
+        self.memory_bytes = 0
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.html.z")
+
+    def get(self, key):
+        """
+        Anahtara ait sonucu önce bellekten, sonra diskten getirir
+
+        Args:
+            key (str): Sonucun hash anahtarı
+
+        Returns:
+            str or None: Saklanan HTML veya bulunamazsa None
+        """
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return self.memory[key]
+
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    html = zlib.decompress(f.read()).decode("utf-8")
+            except (OSError, zlib.error):
+                self.misses += 1
+                return None
+
+            try:
+                os.utime(path)  # LRU için son kullanım zamanını güncelle
+            except OSError:
+                pass  # Okunduktan sonra başka bir süreç tarafından silinmiş olabilir
+            self.disk_hits += 1
+            self._put_memory(key, html)
+            return html
+
+    def put(self, key, html):
+        """
+        Sonucu her iki katmana da kaydeder
+
+        Args:
+            key (str): Sonucun hash anahtarı
+            html (str): Saklanacak HTML
+        """
+        data = zlib.compress(html.encode("utf-8"), 6)
+        path = self._path(key)
+        with self.lock, open(os.path.join(self.cache_dir, ".lock"), "w") as lock_file:
+            self._put_memory(key, html)
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+            self._evict_disk()
+
+    def _put_memory(self, key, html):
+        size = len(html.encode("utf-8"))
+        if key in self.memory:
+            self.memory_bytes -= len(self.memory.pop(key).encode("utf-8"))
+        self.memory[key] = html
+        self.memory_bytes += size
+        # En eski kullanılanlardan başlayarak bellek sınırının altına in
+        while self.memory_bytes > self.memory_capacity and len(self.memory) > 1:
+            _, old = self.memory.popitem(last=False)
+            self.memory_bytes -= len(old.encode("utf-8"))
+            self.evictions += 1
+
+    def _evict_disk(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".html.z"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries)[:-1]:
+            if total <= self.disk_capacity:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def stats(self):
+        """
+        Önbellek istatistiklerini döndürür
+
+        Returns:
+            dict: Katman bazında isabet sayıları ve boyutlar
+        """
+        with self.lock:
+            disk_sizes = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith(".html.z"):
+                    continue
+                try:
+                    disk_sizes.append(os.path.getsize(os.path.join(self.cache_dir, name)))
+                except OSError:
+                    pass  # Başka bir süreç tarafından silinmiş
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self.memory),
+                "memory_bytes": self.memory_bytes,
+                "disk_entries": len(disk_sizes),
+                "disk_bytes": sum(disk_sizes),
+            }
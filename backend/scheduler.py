@@ -0,0 +1,151 @@
+import itertools
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+# Kuyrukta bekleyebilecek maksimum iş sayısı - dolduğunda yeni işler 429 ile reddedilir
+MAX_QUEUE_SIZE = int(os.environ.get("GENERATION_QUEUE_SIZE", 8))
+
+# İş öncelikleri - küçük değer önce çalışır
+PRIORITY_REVISION = 0   # Var olan siteye revizyon (kısa iş)
+PRIORITY_NEW_SITE = 1   # Sıfırdan yeni site üretimi
+PRIORITY_BATCH = 2      # Toplu üretim işleri - etkileşimli isteklerin arkasında bekler
+
+
+class QueueFullError(Exception):
+    """
+    Kuyruk dolu olduğunda fırlatılan hata
+
+    retry_after, istemcinin tekrar denemeden önce beklemesi önerilen süredir (saniye).
+    """
+    def __init__(self, retry_after):
+        super().__init__("Üretim kuyruğu dolu, lütfen daha sonra tekrar deneyin.")
+        self.retry_after = retry_after
+
+
+def priority_for(prompts):
+    """
+    Prompt geçmişine göre işin önceliğini belirler
+
+    Args:
+        prompts (list[str]): Kullanıcı promptları listesi
+
+    Returns:
+        int: İş önceliği (PRIORITY_REVISION veya PRIORITY_NEW_SITE)
+    """
+    return PRIORITY_REVISION if len(prompts) > 1 else PRIORITY_NEW_SITE
+
+
+class GenerationScheduler:
+    """
+    Model üretim işlerini sıraya koyan ve ayrı bir worker thread'de çalıştıran zamanlayıcı
+
+    Tek Llama örneğine yalnızca bu zamanlayıcının worker thread'i erişir; böylece
+    FastAPI event loop'u üretim sırasında bloklanmaz ve model aynı anda iki
+    isteği işlemeye çalışmaz. İşler sınırlı bir öncelik kuyruğunda bekler:
+    revizyonlar önce, yeni siteler sonra, toplu üretim işleri en son çalışır.
+    Kuyruk dolduğunda submit QueueFullError fırlatır.
+    """
+
+    def __init__(self, max_queue=MAX_QUEUE_SIZE, workers=1):
+        self.max_queue = max_queue
+        self.workers = workers
+        self.jobs = queue.PriorityQueue()
+        self.counter = itertools.count()  # Aynı öncelikte FIFO sırası için
+        self.lock = threading.Lock()
+        self.threads = []
+
+        # İstatistikler
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.last_wait = 0.0
+        self.total_run = 0.0
+
+    def start(self):
+        """Worker thread'lerini başlatır (birden fazla çağrılırsa etkisizdir)"""
+        with self.lock:
+            if self.threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f"generation-worker-{i}", daemon=True)
+                t.start()
+                self.threads.append(t)
+
+    def submit(self, func, *args, priority=PRIORITY_NEW_SITE, **kwargs):
+        """
+        Yeni bir işi kuyruğa ekler
+
+        Args:
+            func (callable): Worker thread'de çalıştırılacak fonksiyon
+            *args: Fonksiyon argümanları
+            priority (int): İş önceliği
+            **kwargs: Fonksiyon keyword argümanları
+
+        Returns:
+            concurrent.futures.Future: İşin sonucunu taşıyan future
+
+        Raises:
+            QueueFullError: Kuyruk doluysa
+        """
+        future = Future()
+        with self.lock:
+            if self.jobs.qsize() >= self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(self._retry_after())
+            self.jobs.put((priority, next(self.counter), time.monotonic(), future, func, args, kwargs))
+        return future
+
+    def _retry_after(self):
+        # Kuyruktaki işlerin ve çalışan işlerin bitmesi için tahmini süre
+        avg_run = self.total_run / self.completed if self.completed else 60.0
+        pending = self.jobs.qsize() + self.running
+        return max(1, int(avg_run * pending / self.workers))
+
+    def _worker(self):
+        while True:
+            _, _, enqueued, future, func, args, kwargs = self.jobs.get()
+            if not future.set_running_or_notify_cancel():
+                self.jobs.task_done()
+                continue
+
+            wait = time.monotonic() - enqueued
+            with self.lock:
+                self.running += 1
+                self.total_wait += wait
+                self.last_wait = wait
+
+            started = time.monotonic()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self.lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self.total_run += time.monotonic() - started
+                self.jobs.task_done()
+
+    def stats(self):
+        """
+        Kuyruk istatistiklerini döndürür
+
+        Returns:
+            dict: Kuyruk derinliği, çalışan iş sayısı ve bekleme süreleri
+        """
+        with self.lock:
+            started = self.completed + self.running
+            return {
+                "queue_depth": self.jobs.qsize(),
+                "max_queue": self.max_queue,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_seconds": self.total_wait / started if started else 0.0,
+                "last_wait_seconds": self.last_wait,
+                "avg_run_seconds": self.total_run / self.completed if self.completed else 0.0,
+            }
@@ -0,0 +1,165 @@
+import asyncio
+import html
+import os
+import re
+import time
+
+import scheduler
+import worker_pool
+
+# Bölüm parçalarının içindeki <style> blokları sayfanın <head> kısmına taşınır
+STYLE_PATTERN = re.compile(r"<style[^>]*>(.*?)</style>", re.DOTALL | re.IGNORECASE)
+
+# Kuyruk doluyken bir bölüm işinin kaç kez tekrar deneneceği ve denemeler arasında
+# en fazla kaç saniye bekleneceği - denemeler tükenirse istek 429 ile reddedilir
+SUBMIT_RETRIES = int(os.environ.get("SECTION_SUBMIT_RETRIES", 5))
+SUBMIT_RETRY_MAX_SECONDS = float(os.environ.get("SECTION_SUBMIT_RETRY_MAX_SECONDS", 5))
+
+
+def stitch_page(plan, shared_css, fragments):
+    """
+    Ortak CSS ve bölüm parçalarını tek bir HTML dokümanında birleştirir
+
+    Args:
+        plan (dict): Sayfa planı (title, theme, sections)
+        shared_css (str): Tüm bölümlerin paylaştığı CSS
+        fragments (list[str]): Plan sırasına göre bölüm HTML parçaları
+
+    Returns:
+        str: Tam HTML dokümanı
+    """
+    theme = plan["theme"]
+    # Model ortak CSS'te değişkenleri tanımlamasa bile planın renkleri kullanılsın
+    variables = "".join(
+        f"--{name}: {theme[name]}; " for name in ("primary", "secondary", "background") if theme.get(name)
+    )
+    styles = [f":root {{ {variables}}}" if variables else "", shared_css]
+    bodies = []
+    for section, fragment in zip(plan["sections"], fragments):
+        styles.extend(STYLE_PATTERN.findall(fragment))
+        bodies.append(f"<!-- {section['id']} -->\n{STYLE_PATTERN.sub('', fragment).strip()}")
+
+    css = "\n".join(style.strip() for style in styles if style.strip())
+    body = "\n".join(bodies)
+    return (
+        "<!DOCTYPE html>\n"
+        "<html lang=\"tr\">\n"
+        "<head>\n"
+        "<meta charset=\"UTF-8\">\n"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">\n"
+        f"<title>{html.escape(plan['title'])}</title>\n"
+        f"<style>\n{css}\n</style>\n"
+        "</head>\n"
+        f"<body>\n{body}\n</body>\n"
+        "</html>"
+    )
+
+
+def run_timed(method, kwargs):
+    """
+    Bir generator işini worker havuzunda çalıştırır ve süresini ölçer
+
+    Args:
+        method (str): Çağrılacak generator fonksiyonunun adı
+        kwargs (dict): Fonksiyon keyword argümanları
+
+    Returns:
+        tuple: (işin sonucu, süre (saniye))
+    """
+    started = time.perf_counter()
+    result = worker_pool.run_generator(method, kwargs)
+    return result, time.perf_counter() - started
+
+
+async def run_job(generation_scheduler, priority, method, kwargs, retries=SUBMIT_RETRIES):
+    """
+    Bir generator işini zamanlayıcıya gönderir ve sonucunu bekler
+
+    Kuyruk doluysa zamanlayıcının önerdiği süre kadar (en fazla
+    SUBMIT_RETRY_MAX_SECONDS) beklenip tekrar denenir.
+
+    Args:
+        generation_scheduler (scheduler.GenerationScheduler): İşlerin gönderileceği zamanlayıcı
+        priority (int): İş önceliği
+        method (str): Çağrılacak generator fonksiyonunun adı
+        kwargs (dict): Fonksiyon keyword argümanları
+        retries (int): Kuyruk doluyken en fazla kaç kez tekrar deneneceği
+
+    Returns:
+        tuple: (işin sonucu, süre (saniye))
+
+    Raises:
+        scheduler.QueueFullError: Kuyruk tüm denemelerde doluysa
+    """
+    for attempt in range(retries + 1):
+        try:
+            future = generation_scheduler.submit(run_timed, method, kwargs, priority=priority)
+            break
+        except scheduler.QueueFullError as e:
+            if attempt == retries:
+                raise
+            await asyncio.sleep(min(e.retry_after, SUBMIT_RETRY_MAX_SECONDS))
+    return await asyncio.wrap_future(future)
+
+
+async def generate_sectioned_page(generation_scheduler, prompts, site_name=None, fresh=False,
+                                  priority=scheduler.PRIORITY_NEW_SITE):
+    """
+    Sayfayı bölüm bölüm, bölümleri eş zamanlı üreterek oluşturur
+
+    1. Model kısa bir bölüm planı üretir (başlık, tema, bölüm listesi)
+    2. Her bölüm ve ortak CSS ayrı bir iş olarak zamanlayıcıya gönderilir
+    3. Sonuçlar ortak CSS ile tek bir dokümanda birleştirilir
+
+    Plan, bölümler ve ortak CSS zamanlayıcıya isteğin önceliğiyle ayrı işler
+    olarak girer; böylece öncelik sırası, kuyruk sınırı ve 429 geri basıncı
+    bölüm işleri için de geçerlidir. Birleştirme event loop'ta beklenir, bu
+    yüzden üst istek bölümlerini beklerken bir zamanlayıcı thread'ini tutmaz.
+    Worker havuzu açıksa bölümler boştaki worker'larda paralel çalışır ve toplam
+    süre en uzun bölüm tarafından belirlenir.
+
+    Plan, bölümler ve ortak CSS tam sayfa üretimi gibi sonuç önbelleğinden gelir
+    ve model yoksa llama-server ile üretilir (bkz. generator.section_completion).
+    Bölüm istekleri site geçmişiyle ortak bir önek taşımadığı için sitenin
+    model durumu önbelleği kullanılmaz.
+
+    Args:
+        generation_scheduler (scheduler.GenerationScheduler): İşlerin gönderileceği zamanlayıcı
+        prompts (list[str]): Kullanıcı promptları listesi
+        site_name (str, optional): Loglarda kullanılan site adı
+        fresh (bool): True ise önbellek atlanır ve yeni bir varyasyon üretilir
+        priority (int): Plan ve bölüm işlerinin önceliği
+
+    Returns:
+        str: Oluşturulan HTML içeriği
+
+    Raises:
+        scheduler.QueueFullError: Plan işi kuyruğa giremezse veya bölüm işleri
+            tekrar denemelere rağmen kuyruğa giremezse
+    """
+    started = time.perf_counter()
+    # Plan işi tekrar denenmez: kuyruk doluysa istek doğrudan 429 ile reddedilir
+    plan, plan_seconds = await run_job(generation_scheduler, priority, "generate_section_plan",
+                                       {"prompts": prompts, "fresh": fresh}, retries=0)
+
+    names = ["css"] + [section["id"] for section in plan["sections"]]
+    jobs = [run_job(generation_scheduler, priority, "generate_shared_css",
+                    {"prompts": prompts, "plan": plan, "fresh": fresh})]
+    jobs += [
+        run_job(generation_scheduler, priority, "generate_section",
+                {"prompts": prompts, "plan": plan, "section": section, "fresh": fresh})
+        for section in plan["sections"]
+    ]
+    results = await asyncio.gather(*jobs)
+    shared_css = results[0][0]
+    fragments = [fragment for fragment, _ in results[1:]]
+    timings = {name: seconds for name, (_, seconds) in zip(names, results)}
+
+    html_content = stitch_page(plan, shared_css, fragments)
+    elapsed = time.perf_counter() - started
+    slowest = max(timings, key=timings.get)
+    print(f"Bölüm bazlı üretim tamamlandı{f' ({site_name})' if site_name else ''}: {len(fragments)} bölüm, "
+          f"{generation_scheduler.workers} paralel iş, "
+          f"plan {plan_seconds:.1f} sn, en uzun iş {slowest} {timings[slowest]:.1f} sn, "
+          f"toplam {elapsed:.1f} sn (işlerin toplamı {sum(timings.values()):.1f} sn)")
+    return html_content
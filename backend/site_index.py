@@ -0,0 +1,139 @@
+import asyncio
+import os
+import time
+
+# Bir site kaydının (ve "bu isimde site yok" bilgisinin) ne kadar süre geçerli sayılacağı (saniye)
+SITE_INDEX_TTL = float(os.environ.get("SITE_INDEX_TTL", 300))
+NEGATIVE_TTL = float(os.environ.get("SITE_INDEX_NEGATIVE_TTL", 30))
+
+# Tam listeleme sırasında sayfa başına istenecek site sayısı (Netlify en fazla 100 kabul eder)
+PAGE_SIZE = 100
+
+
+class SiteIndex:
+    """
+    Netlify site adı -> site ID indeksi
+
+    İlk kullanımda hesaptaki tüm siteler sayfa sayfa bir kez listelenir; sonraki
+    aramalar bellekteki sözlükten O(1) yanıtlanır. Süresi (TTL) dolan kayıtlar ve
+    indekste olmayan isimler tüm listeyi yeniden çekmek yerine Netlify'ın name
+    filtresiyle tek bir istekle güncellenir. Bulunamayan isimler de kısa bir süre
+    (NEGATIVE_TTL) hatırlanır; yeni oluşturulan siteler add() ile hemen eklenir.
+
+    Args:
+        client (NetlifyClient): Netlify istemcisi
+        ttl (float): Bulunan sitelerin geçerlilik süresi (saniye)
+        negative_ttl (float): Bulunamayan isimlerin geçerlilik süresi (saniye)
+    """
+
+    def __init__(self, client, ttl=SITE_INDEX_TTL, negative_ttl=NEGATIVE_TTL):
+        self.client = client
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.sites = {}      # site adı -> (site ID veya None, kaydın zamanı)
+        self.loaded = False
+        self.lock = None
+        self.loop = None
+        self.hits = 0
+        self.misses = 0
+        self.pages = 0
+        self.lookups = 0
+
+    def _lock(self):
+        # Kilit event loop'a bağlıdır; farklı bir loop'ta yeniden oluşturulur (bkz. NetlifyClient)
+        loop = asyncio.get_running_loop()
+        if self.lock is None or self.loop is not loop:
+            self.lock, self.loop = asyncio.Lock(), loop
+        return self.lock
+
+    async def load(self):
+        """
+        Hesaptaki tüm siteleri sayfa sayfa listeleyip indeksi yeniden oluşturur
+
+        Returns:
+            bool: Listeleme başarılıysa True
+        """
+        sites = {}
+        page = 1
+        while True:
+            resp = await self.client.list_sites(page=page, per_page=PAGE_SIZE)
+            if resp.status_code != 200:
+                print("Sitelist alınamadı:", resp.text)
+                return False
+            batch = resp.json()
+            now = time.monotonic()
+            for site in batch:
+                sites[site["name"]] = (site["id"], now)
+            self.pages += 1
+            if len(batch) < PAGE_SIZE:
+                break
+            page += 1
+        self.sites = sites
+        self.loaded = True
+        print(f"Site indeksi oluşturuldu: {len(sites)} site, {page} sayfa")
+        return True
+
+    async def fetch(self, site_name):
+        """
+        Tek bir site adını Netlify'da name filtresiyle arar ve indeksi günceller
+
+        Args:
+            site_name (str): Site adı
+
+        Returns:
+            tuple: (arama başarılı mı (bool), site ID'si veya None)
+        """
+        self.lookups += 1
+        resp = await self.client.list_sites(per_page=PAGE_SIZE, name=site_name)
+        if resp.status_code != 200:
+            print("Site aranamadı:", resp.text)
+            return False, None
+        # name filtresi kısmi eşleşmeleri de döndürür; tam eşleşme aranır
+        site_id = next((site["id"] for site in resp.json() if site["name"] == site_name), None)
+        self.sites[site_name] = (site_id, time.monotonic())
+        return True, site_id
+
+    async def lookup(self, site_name):
+        """
+        Site adına karşılık gelen site ID'sini döndürür
+
+        Args:
+            site_name (str): Aranacak site adı
+
+        Returns:
+            str or None: Site bulunursa ID'si, bulunamazsa None
+        """
+        if not self.loaded:
+            async with self._lock():
+                if not self.loaded and not await self.load():
+                    return None
+
+        entry = self.sites.get(site_name)
+        if entry is not None:
+            site_id, stored = entry
+            if time.monotonic() - stored < (self.ttl if site_id else self.negative_ttl):
+                self.hits += 1
+                return site_id
+        self.misses += 1
+        return (await self.fetch(site_name))[1]
+
+    def add(self, site_name, site_id):
+        """Yeni oluşturulan siteyi indekse ekler"""
+        self.sites[site_name] = (site_id, time.monotonic())
+
+    def stats(self):
+        """
+        İndeks istatistiklerini döndürür
+
+        Returns:
+            dict: Kayıt sayısı, isabet/ıska sayıları, listelenen sayfa ve tekil arama sayıları
+        """
+        total = self.hits + self.misses
+        return {
+            "entries": sum(1 for site_id, _ in self.sites.values() if site_id),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "pages_listed": self.pages,
+            "name_lookups": self.lookups,
+        }
@@ -0,0 +1,183 @@
+import asyncio
+import os
+import time
+
+# Önbellekteki site bilgisinin (GET /sites/{id}) ne kadar süre güncel sayılacağı (saniye)
+SITE_CACHE_TTL = float(os.environ.get("SITE_CACHE_TTL", 60))
+
+# Onaylanan sitelerde olması gereken ayarlar - tek bir PATCH ile uygulanır
+DESIRED_SETTINGS = {
+    "ssl": True,        # SSL sertifikası oluştur (Let's Encrypt)
+    "force_ssl": True,  # HTTP isteklerini HTTPS'ye yönlendir
+    "processing_settings": {
+        "html": {
+            "pretty_urls": True,  # .html uzantılarını gizle (örn. /about.html → /about)
+        },
+        "css": {
+            "bundle": True,  # CSS dosyalarını tek dosya haline getir (daha az HTTP isteği)
+            "minify": True   # CSS dosyalarını küçült (boşlukları ve yorumları kaldır)
+        },
+        "js": {
+            "bundle": True,  # JS dosyalarını tek dosya haline getir
+            "minify": True   # JS dosyalarını küçült
+        },
+        "images": {
+            "optimize": True  # Görüntüleri sıkıştır ve optimize et
+        }
+    }
+}
+
+
+def settings_diff(desired, current):
+    """
+    İstenen ayarlardan mevcut ayarlarla uyuşmayanları döndürür
+
+    İç içe sözlükler alan alan karşılaştırılır; mevcut ayarlarda olup istenen
+    ayarlarda olmayan alanlar dikkate alınmaz.
+
+    Args:
+        desired (dict): İstenen ayarlar
+        current (dict): Sitenin mevcut ayarları
+
+    Returns:
+        dict: Uygulanması gereken ayarlar (hepsi uyuşuyorsa boş)
+    """
+    diff = {}
+    for key, value in desired.items():
+        if isinstance(value, dict):
+            nested = settings_diff(value, (current or {}).get(key) or {})
+            if nested:
+                diff[key] = nested
+        elif (current or {}).get(key) != value:
+            diff[key] = value
+    return diff
+
+
+class SiteSetup:
+    """
+    Site kurulum motoru: onaylanan sitenin ayarlarını ve production deploy'unu hazırlar
+
+    Adımlar:
+    1. site: Site bilgisi önbellekten (SITE_CACHE_TTL içinde) veya GET ile alınır
+    2. settings: DESIRED_SETTINGS'ten sitede uyuşmayanlar tek bir PATCH ile uygulanır
+    3. publish: Sitenin son deploy'u yayında değilse production'a yükseltilir (restore)
+
+    2. ve 3. adımlar birbirinden bağımsız olduğu için eş zamanlı çalışır; durumu
+    zaten istenen gibi olan adımlar atlanır. PATCH yanıtı güncel site bilgisini
+    içerdiğinden ayrıca GET yapılmaz. Her adımın süresi rapora yazılır.
+
+    Args:
+        client (NetlifyClient): Netlify istemcisi
+        ttl (float): Site bilgisi önbelleğinin geçerlilik süresi (saniye)
+    """
+
+    def __init__(self, client, ttl=SITE_CACHE_TTL):
+        self.client = client
+        self.ttl = ttl
+        self.sites = {}  # site ID -> (site bilgisi, kaydedilme zamanı)
+        self.reports = {}  # site ID -> son kurulum raporu
+
+    def remember(self, site):
+        """Netlify'dan gelen güncel site bilgisini önbelleğe alır"""
+        if site and site.get("id"):
+            self.sites[site["id"]] = (site, time.monotonic())
+
+    async def get_site(self, site_id):
+        """
+        Site bilgisini önbellekten veya Netlify'dan getirir
+
+        Returns:
+            tuple: (site bilgisi veya None, önbellekten mi geldi (bool))
+        """
+        cached = self.sites.get(site_id)
+        if cached and time.monotonic() - cached[1] < self.ttl:
+            return cached[0], True
+        resp = await self.client.get_site(site_id)
+        if resp.status_code != 200:
+            print(f"Hata: Site bulunamadı (ID: {site_id})")
+            return None, False
+        site = resp.json()
+        self.remember(site)
+        return site, False
+
+    async def _apply_settings(self, site_id, changes):
+        resp = await self.client.update_site(site_id, changes)
+        if resp.status_code not in [200, 201, 204]:
+            print(f"Site ayarları hatası: {resp.status_code}")
+            print(resp.text)
+            return False
+        if resp.status_code != 204:
+            self.remember(resp.json())
+        print(f"✅ Site ayarları güncellendi: {', '.join(changes)}")
+        return True
+
+    async def _publish(self, site_id, deploy_id):
+        # Bu, deploy'un önbelleğe alınmasını ve CDN üzerinde dağıtılmasını sağlar
+        resp = await self.client.restore_deploy(site_id, deploy_id)
+        if resp.status_code in [200, 201, 204]:
+            print("✅ Deploy production'a yükseltildi")
+            return True
+        print(f"Deploy yükseltme hatası: {resp.status_code}")
+        return False
+
+    async def _timed(self, report, name, coro):
+        started = time.perf_counter()
+        try:
+            return await coro
+        finally:
+            report["steps"][name] = {"seconds": time.perf_counter() - started, "skipped": False}
+
+    async def run(self, site_id):
+        """
+        Kurulum adımlarını çalıştırır
+
+        Args:
+            site_id (str): Netlify site ID'si
+
+        Returns:
+            tuple: (site URL'i veya başarısızsa None, rapor (dict): adım süreleri ve atlanan adımlar)
+        """
+        started = time.perf_counter()
+        report = {"site_id": site_id, "steps": {}}
+        self.reports[site_id] = report
+
+        step = time.perf_counter()
+        site, cached = await self.get_site(site_id)
+        report["steps"]["site"] = {"seconds": time.perf_counter() - step, "skipped": cached}
+        if site is None:
+            report["total"] = time.perf_counter() - started
+            return None, report
+
+        changes = settings_diff(DESIRED_SETTINGS, site)
+        deploy_id = site.get("deploy_id")
+        published_id = (site.get("published_deploy") or {}).get("id")
+
+        jobs = {}
+        if changes:
+            jobs["settings"] = self._timed(report, "settings", self._apply_settings(site_id, changes))
+        else:
+            report["steps"]["settings"] = {"seconds": 0.0, "skipped": True}
+        if deploy_id and deploy_id != published_id:
+            jobs["publish"] = self._timed(report, "publish", self._publish(site_id, deploy_id))
+        else:
+            report["steps"]["publish"] = {"seconds": 0.0, "skipped": True}
+
+        results = dict(zip(jobs, await asyncio.gather(*jobs.values())))
+        if results.get("publish") and site_id in self.sites:
+            # Yayındaki deploy değişti - PATCH yanıtı restore'dan önce üretilmiş olabilir
+            self.sites[site_id][0]["published_deploy"] = {"id": deploy_id}
+        report["total"] = time.perf_counter() - started
+        print("Site kurulum süreleri: " + ", ".join(
+            f"{name} " + ("atlandı" if info["skipped"] else f"{info['seconds'] * 1000:.0f} ms")
+            for name, info in report["steps"].items()) + f", toplam {report['total'] * 1000:.0f} ms")
+
+        if results.get("settings") is False:
+            return None, report
+        # PATCH yanıtı güncel site bilgisini içerir (URL SSL ile değişmiş olabilir)
+        site_url = self.sites.get(site_id, (site, 0))[0]["url"]
+        print(f"🌐 Site kurulumu tamamlandı: {site_url}")
+        return site_url, report
+
+    def report(self, site_id):
+        """Sitenin son kurulum raporu (yoksa None)"""
+        return self.reports.get(site_id)
@@ -1,10 +1,17 @@
 import json
 import os
+import threading
 from datetime import datetime
 
 # Depolama dosyası - sitelerin bilgilerinin saklanacağı JSON dosyası
 STORAGE_FILE = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "site_database.json")
 
+# Sitelerin son HTML içeriklerinin saklanacağı klasör - revizyon modunda düzenlenecek sayfa buradan okunur
+HTML_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "html")
+
+# Toplu üretimde siteler eş zamanlı kaydedilir - oku/güncelle/yaz adımları bu kilitle korunur
+storage_lock = threading.Lock()
+
 def init_storage():
     """
     Depolama dosyasını oluştur (yoksa)
@@ -59,22 +66,74 @@ def save_site(site_name, site_id, deploy_url, prompts):
         deploy_url (str): Site deploy URL'si
         prompts (list): Site oluşturmak için kullanılan promptların listesi
     """
-    init_storage()  # Dosyanın varlığını kontrol et
-    
-    # Mevcut verileri oku
-    with open(STORAGE_FILE, "r") as f:
-        data = json.load(f)
-    
-    # Site bilgilerini güncelle veya yeni oluştur
-    data["sites"][site_name] = {
-        "site_id": site_id,                 # Netlify site ID
-        "deploy_url": deploy_url,           # Site URL'si
-        "prompts": prompts,                 # Prompt geçmişi
-        "last_updated": datetime.now().isoformat(),  # Son güncelleme zamanı
-        # Site daha önce kaydedilmişse eski oluşturma tarihini koru, değilse yeni oluştur
-        "created_at": data["sites"].get(site_name, {}).get("created_at", datetime.now().isoformat())
-    }
-    
-    # Güncellenmiş verileri kaydet (indent=2 ile daha okunaklı JSON formatı)
-    with open(STORAGE_FILE, "w") as f:
-        json.dump(data, f, indent=2)
\ No newline at end of file
+    with storage_lock:
+        init_storage()  # Dosyanın varlığını kontrol et
+        
+        # Mevcut verileri oku
+        with open(STORAGE_FILE, "r") as f:
+            data = json.load(f)
+        
+        # Site bilgilerini güncelle veya yeni oluştur
+        data["sites"][site_name] = {
+            "site_id": site_id,                 # Netlify site ID
+            "deploy_url": deploy_url,           # Site URL'si
+            "prompts": prompts,                 # Prompt geçmişi
+            "last_updated": datetime.now().isoformat(),  # Son güncelleme zamanı
+            # Site daha önce kaydedilmişse eski oluşturma tarihini koru, değilse yeni oluştur
+            "created_at": data["sites"].get(site_name, {}).get("created_at", datetime.now().isoformat())
+        }
+        
+        # Güncellenmiş verileri kaydet (indent=2 ile daha okunaklı JSON formatı)
+        with open(STORAGE_FILE, "w") as f:
+            json.dump(data, f, indent=2)
+
+def site_html_path(site_name):
+    """
+    Sitenin HTML dosyasının yolunu döndürür
+
+    Args:
+        site_name (str): Site adı
+
+    Returns:
+        str: HTML_DIR içindeki dosya yolu
+
+    Raises:
+        ValueError: Site adı HTML_DIR dışına çıkan bir yol oluşturuyorsa (örn. "../x")
+    """
+    html_dir = os.path.realpath(HTML_DIR)
+    path = os.path.realpath(os.path.join(html_dir, f"{site_name}.html"))
+    if os.path.dirname(path) != html_dir:
+        raise ValueError(f"Geçersiz site adı: {site_name!r}")
+    return path
+
+def save_site_html(site_name, html):
+    """
+    Sitenin son HTML içeriğini kaydet
+
+    HTML, JSON veritabanını büyütmemek için ayrı bir dosyada saklanır.
+
+    Args:
+        site_name (str): Site adı
+        html (str): Sitenin son HTML içeriği
+    """
+    path = site_html_path(site_name)
+    os.makedirs(HTML_DIR, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+
+def get_site_html(site_name):
+    """
+    Sitenin son HTML içeriğini getir
+
+    Args:
+        site_name (str): Site adı
+
+    Returns:
+        str or None: Kaydedilmiş HTML veya yoksa None
+    """
+    path = site_html_path(site_name)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError:
+        return None
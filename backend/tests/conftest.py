@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Backend modülleri düz (paket olmayan) importlarla birbirini kullanır
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from deploy_coalescer import DeployCoalescer
+
+
+def test_versions_queued_behind_running_deploy_are_superseded():
+    async def scenario():
+        started = asyncio.Event()
+        release = asyncio.Event()
+        deployed = []
+
+        async def deploy_fn(key, payload):
+            deployed.append((key, payload))
+            if payload == "v1":
+                started.set()
+                await release.wait()
+            return f"{key}:{payload}"
+
+        coalescer = DeployCoalescer(deploy_fn)
+        first = asyncio.ensure_future(coalescer.submit("site", "v1"))
+        await started.wait()
+        # v1 çalışırken gelen v2, v3 tarafından yerine geçilir ve hiç deploy edilmez
+        second = asyncio.ensure_future(coalescer.submit("site", "v2"))
+        third = asyncio.ensure_future(coalescer.submit("site", "v3"))
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(first, second, third), deployed, coalescer.stats()
+
+    results, deployed, stats = asyncio.run(scenario())
+    assert results == ["site:v1", "site:v3", "site:v3"]
+    assert deployed == [("site", "v1"), ("site", "v3")]
+    assert stats["submitted"] == 3
+    assert stats["deploys"] == 2
+    assert stats["superseded"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_different_keys_deploy_independently():
+    async def scenario():
+        async def deploy_fn(key, payload):
+            await asyncio.sleep(0)
+            return payload
+
+        coalescer = DeployCoalescer(deploy_fn)
+        results = await asyncio.gather(coalescer.submit("a", 1), coalescer.submit("b", 2))
+        return results, coalescer.stats()
+
+    results, stats = asyncio.run(scenario())
+    assert results == [1, 2]
+    assert stats["deploys"] == 2
+    assert stats["superseded"] == 0
+
+
+def test_failure_is_raised_to_all_waiters_of_that_version():
+    async def scenario():
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def deploy_fn(key, payload):
+            if payload == "v1":
+                started.set()
+                await release.wait()
+                return "ok"
+            raise RuntimeError("deploy başarısız")
+
+        coalescer = DeployCoalescer(deploy_fn)
+        first = asyncio.ensure_future(coalescer.submit("site", "v1"))
+        await started.wait()
+        waiters = [asyncio.ensure_future(coalescer.submit("site", v)) for v in ("v2", "v3")]
+        await asyncio.sleep(0)
+        release.set()
+        assert await first == "ok"
+        for waiter in waiters:
+            with pytest.raises(RuntimeError):
+                await waiter
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("key", [None, ""])
+def test_empty_key_is_rejected(key):
+    async def scenario():
+        async def deploy_fn(key, payload):
+            return payload
+
+        coalescer = DeployCoalescer(deploy_fn)
+        with pytest.raises(ValueError):
+            await coalescer.submit(key, "html")
+        return coalescer.stats()
+
+    assert asyncio.run(scenario())["submitted"] == 0
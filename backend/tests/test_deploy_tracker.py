@@ -0,0 +1,94 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+import httpx
+import pytest
+
+import deploy_tracker
+from deploy_tracker import DeployTracker, verify_signature
+
+SECRET = "gizli-anahtar"
+
+
+def b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def sign(body, secret=SECRET, claims=None):
+    """Netlify'ın gönderdiği gibi HS256 JWS imzası oluşturur"""
+    header = b64url(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = b64url(json.dumps(claims or {"iss": "netlify", "sha256": hashlib.sha256(body).hexdigest()}).encode())
+    sig = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{b64url(sig)}"
+
+
+BODY = json.dumps({"id": "deploy-1", "state": "ready"}).encode()
+
+
+def test_valid_signature_is_accepted():
+    assert verify_signature(BODY, sign(BODY), SECRET)
+
+
+@pytest.mark.parametrize("signature", [
+    sign(BODY, secret="yanlis-anahtar"),
+    sign(b"baska govde"),
+    sign(BODY, claims={"iss": "baskasi", "sha256": hashlib.sha256(BODY).hexdigest()}),
+    "imza-degil",
+    "a.b.c",
+    None,
+])
+def test_invalid_signatures_are_rejected(signature):
+    assert not verify_signature(BODY, signature, SECRET)
+
+
+def test_webhook_marks_deploy_ready_without_polling(monkeypatch):
+    monkeypatch.setattr(deploy_tracker, "POLL_INITIAL", 60)
+    fetched = []
+
+    async def fetch(deploy_id):
+        fetched.append(deploy_id)
+        return httpx.Response(200, json={"state": "processing"})
+
+    async def scenario():
+        tracker = DeployTracker(fetch)
+        tracker.enabled = True
+        now = time.perf_counter()
+        tracker.track("deploy-1", "site-1", "files", now - 1, now)
+        assert tracker.notify({"id": "deploy-1", "state": "ready"})
+        assert not tracker.notify({"id": "bilinmeyen", "state": "ready"})
+        record = await tracker.wait("deploy-1", timeout=5)
+        await asyncio.sleep(0)
+        return record, tracker.stats()
+
+    record, stats = asyncio.run(scenario())
+    assert record["state"] == "ready"
+    assert record["source"] == "webhook"
+    assert record["timings"]["ready"] >= record["timings"]["upload"]
+    assert fetched == []
+    assert stats["ready"] == 1
+    assert stats["webhooks"] == 1
+    assert stats["pending"] == 0
+
+
+def test_polling_records_failed_deploy(monkeypatch):
+    monkeypatch.setattr(deploy_tracker, "POLL_INITIAL", 0.01)
+
+    async def fetch(deploy_id):
+        return httpx.Response(200, json={"state": "error", "error_message": "derleme hatası"})
+
+    async def scenario():
+        tracker = DeployTracker(fetch)
+        tracker.enabled = True
+        now = time.perf_counter()
+        tracker.track("deploy-2", "site-1", "zip", now, now)
+        return await tracker.wait("deploy-2", timeout=5), tracker.stats()
+
+    record, stats = asyncio.run(scenario())
+    assert record["state"] == "error"
+    assert record["source"] == "poll"
+    assert record["error_message"] == "derleme hatası"
+    assert stats["failed"] == 1
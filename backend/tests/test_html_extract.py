@@ -0,0 +1,87 @@
+import random
+import re
+
+import pytest
+
+from html_extract import HtmlExtractor, extract_html
+
+
+def regex_extract_html(text):
+    """Tek geçişli ayıklayıcıdan önceki regex tabanlı extract_html"""
+    m = re.search(r"<!DOCTYPE html>.*?</html>", text, re.DOTALL | re.IGNORECASE)
+    if m:
+        return m.group(0)
+    m = re.search(r"<html.*?>.*?</html>", text, re.DOTALL | re.IGNORECASE)
+    if m:
+        return "<!DOCTYPE html>\n" + m.group(0)
+    m = re.search(r"<body.*?>.*?</body>", text, re.DOTALL | re.IGNORECASE)
+    if m:
+        return f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset='UTF-8'>\n<title>Generated Page</title>\n</head>\n{m.group(0)}\n</html>"
+    return text
+
+
+def regex_finds_document(text):
+    """Regex sürümü desenlerinden biriyle eşleşme buldu mu? (kesilmiş çıktılar hariç)"""
+    patterns = (r"<!DOCTYPE html>.*?</html>", r"<html.*?>.*?</html>", r"<body.*?>.*?</body>")
+    return any(re.search(pattern, text, re.DOTALL | re.IGNORECASE) for pattern in patterns)
+
+
+CASES = [
+    "Açıklama:\n```html\n<!DOCTYPE html>\n<html><body><p>x</p></body></html>\n```\nUmarım beğenirsiniz.",
+    "<!doctype HTML><html lang='tr'><body>a</body></html> sonra <!DOCTYPE html><html></html>",
+    "Metin <html lang=\"tr\">\n<head></head><body>b</body></html> bitti",
+    "Sadece body: <body class='x'><h1>c</h1></body> ve açıklama",
+    "<BODY>büyük harf</BODY>",
+    "önce <body>iç</body> sonra <html><body>dış</body></html>",
+    "<html><body>ilk</body></html><!DOCTYPE html><html>ikinci</html>",
+]
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_extract_html_matches_regex_version(text):
+    assert extract_html(text) == regex_extract_html(text)
+
+
+@pytest.mark.parametrize("text", CASES)
+def test_streaming_matches_regex_version_for_any_chunking(text):
+    rng = random.Random(text)
+    for _ in range(20):
+        extractor = HtmlExtractor()
+        position = 0
+        while position < len(text):
+            size = rng.randint(1, 8)
+            extractor.feed(text[position:position + size])
+            position += size
+        assert extractor.finish() == regex_extract_html(text)
+
+
+def test_random_outputs_match_regex_version():
+    pieces = ["<!DOCTYPE html>", "<!doctype html>", "<html>", "<html lang='tr'>", "</html>", "<body>",
+              "<body class='a'>", "</body>", "<head></head>", "<p>metin</p>", "açıklama ", "\n", "```html", "<"]
+    rng = random.Random(12)
+    checked = 0
+    for _ in range(3000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 12)))
+        if not regex_finds_document(text):
+            continue  # Kesilmiş çıktılar yeni sürümde bilerek tamamlanıyor
+        assert extract_html(text) == regex_extract_html(text), text
+        checked += 1
+    assert checked > 500
+
+
+def test_truncated_output_is_closed():
+    assert extract_html("Sayfa: <!DOCTYPE html><html><body><p>yarım") == (
+        "<!DOCTYPE html><html><body><p>yarım\n</body>\n</html>")
+
+
+@pytest.mark.parametrize("text, html", [
+    ("Açıklama <!DOCTYPE html><html></html> son", "<!DOCTYPE html><html></html>"),
+    ("Açıklama <html lang='tr'><body>a</body></html> son", "<html lang='tr'><body>a</body></html>"),
+    ("Açıklama <body>b</body> son", "<body>b</body>"),
+    ("Açıklama <!DOCTYPE html><html><body>yarım", "<!DOCTYPE html><html><body>yarım"),
+    ("HTML yok", "HTML yok"),
+])
+def test_span_covers_only_generated_html(text, html):
+    extractor = HtmlExtractor().feed(text)
+    start, end = extractor.span()
+    assert text[start:end] == html
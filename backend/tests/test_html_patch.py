@@ -0,0 +1,63 @@
+import pytest
+
+from html_patch import PatchError, apply_edit_blocks, parse_edit_blocks, validate_html
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><title>Blog</title></head>
+<body>
+  <h1>Merhaba</h1>
+  <p>İlk yazı</p>
+</body>
+</html>"""
+
+
+def edit_block(search, replace):
+    return f"<<<<<<< ARA\n{search}\n=======\n{replace}\n>>>>>>> DEGISTIR"
+
+
+def test_parse_edit_blocks_reads_all_blocks_and_crlf():
+    text = ("Açıklama\r\n" + edit_block("<h1>Merhaba</h1>", "<h1>Selam</h1>").replace("\n", "\r\n")
+            + "\n\n" + edit_block("<p>İlk yazı</p>", "<p>İkinci yazı</p>"))
+    assert parse_edit_blocks(text) == [
+        ("<h1>Merhaba</h1>", "<h1>Selam</h1>"),
+        ("<p>İlk yazı</p>", "<p>İkinci yazı</p>"),
+    ]
+
+
+def test_apply_edit_blocks_replaces_in_order():
+    blocks = parse_edit_blocks(edit_block("<h1>Merhaba</h1>", "<h1>Selam</h1>")
+                               + edit_block("<h1>Selam</h1>", "<h1>Hoş geldiniz</h1>"))
+    result = apply_edit_blocks(PAGE, blocks)
+    assert "<h1>Hoş geldiniz</h1>" in result
+    assert "Merhaba" not in result
+    validate_html(result)
+
+
+def test_apply_edit_blocks_tolerates_surrounding_whitespace():
+    result = apply_edit_blocks(PAGE, [("    <p>İlk yazı</p>  ", "<p>Yeni</p>")])
+    assert "  <p>Yeni</p>\n" in result
+
+
+def test_apply_edit_blocks_allows_deleting_text():
+    result = apply_edit_blocks(PAGE, [("  <p>İlk yazı</p>\n", "")])
+    assert "<p>" not in result
+
+
+@pytest.mark.parametrize("blocks, message", [
+    ([], "bulunamadı"),
+    ([("   ", "<p>x</p>")], "Boş arama"),
+    ([("<h2>Yok</h2>", "<h2>x</h2>")], "bulunamadı"),
+    ([("<p", "<div")], "birden fazla"),
+])
+def test_apply_edit_blocks_rejects_missing_or_ambiguous_search(blocks, message):
+    page = PAGE.replace("</body>", "<p>İkinci</p>\n</body>")
+    with pytest.raises(PatchError, match=message):
+        apply_edit_blocks(page, blocks)
+
+
+def test_validate_html_rejects_broken_document():
+    with pytest.raises(PatchError):
+        validate_html(PAGE.replace("</body>", ""))
+    with pytest.raises(PatchError):
+        validate_html(PAGE.replace("<body>", "<body><body>"))
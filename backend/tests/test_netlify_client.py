@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import netlify_client
+from netlify_client import NetlifyClient, NetlifyError, RateLimiter
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    # Testlerde tekrar denemeler arasında beklenmez
+    monkeypatch.setattr(netlify_client, "retry_delay", lambda response, attempt: 0)
+
+
+def make_client(responses):
+    """Sırayla verilen yanıtları (veya fırlatılacak hataları) döndüren sahte API ile istemci"""
+    calls = []
+
+    def handler(request):
+        calls.append(request.method)
+        result = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(result, Exception):
+            raise result
+        return httpx.Response(result, json={})
+
+    return NetlifyClient("token", base_url="https://netlify.test", transport=httpx.MockTransport(handler)), calls
+
+
+def test_post_is_retried_after_429():
+    client, calls = make_client([429, 201])
+    response = asyncio.run(client.create_site("site"))
+    assert response.status_code == 201
+    assert calls == ["POST", "POST"]
+    assert client.stats()["throttled"] == 1
+    assert client.stats()["retries"] == 1
+
+
+def test_post_is_not_retried_after_server_error():
+    # 5xx alan POST Netlify'da işlenmiş olabilir; tekrarlanırsa çift site oluşabilir
+    client, calls = make_client([503, 201])
+    response = asyncio.run(client.create_site("site"))
+    assert response.status_code == 503
+    assert calls == ["POST"]
+
+
+def test_post_that_may_have_been_sent_is_not_retried():
+    client, calls = make_client([httpx.ReadTimeout("zaman aşımı"), 201])
+    with pytest.raises(NetlifyError):
+        asyncio.run(client.create_deploy("site-id", {}))
+    assert calls == ["POST"]
+
+
+def test_post_that_was_never_sent_is_retried():
+    client, calls = make_client([httpx.ConnectError("bağlantı yok"), 201])
+    response = asyncio.run(client.create_deploy("site-id", {}))
+    assert response.status_code == 201
+    assert calls == ["POST", "POST"]
+
+
+def test_get_is_retried_until_attempts_run_out():
+    client, calls = make_client([503])
+    response = asyncio.run(client.get_site("site-id"))
+    assert response.status_code == 503
+    assert len(calls) == netlify_client.MAX_ATTEMPTS
+
+
+def test_rate_limiter_follows_headers():
+    limiter = RateLimiter(per_minute=600)
+    limiter.update({"X-RateLimit-Remaining": "20", "X-RateLimit-Reset": str(time.time() + 10)})
+    assert limiter.tokens <= 20
+    assert limiter.rate == pytest.approx(2.0, rel=0.2)
+
+    limiter.update({"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 30)})
+    assert limiter.blocked_until - time.monotonic() == pytest.approx(30, abs=1)
+
+
+def test_rate_limiter_waits_when_tokens_run_out():
+    async def scenario():
+        limiter = RateLimiter(per_minute=6000)  # Saniyede 100 istek
+        limiter.tokens = 0
+        await limiter.acquire()
+        return limiter.waited
+
+    assert asyncio.run(scenario()) > 0
+
+
+def test_blocked_limiter_holds_requests():
+    limiter = RateLimiter()
+    limiter.block(5)
+    assert limiter.tokens == 0
+    assert limiter.blocked_until - time.monotonic() == pytest.approx(5, abs=1)
@@ -0,0 +1,58 @@
+import os
+import time
+
+from prompt_cache import PromptStateCache
+
+
+def state_files(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith(".state"))
+
+
+def test_state_is_restored_only_for_matching_prefix(tmp_path):
+    cache = PromptStateCache(str(tmp_path))
+    cache.store("site", "ilk prompt", {"tokens": [1, 2, 3]})
+
+    assert cache.lookup("site", "ilk prompt\nRevizyon: mavi") == {"tokens": [1, 2, 3]}
+    assert cache.lookup("site", "başka prompt") is None
+    assert cache.lookup("diger-site", "ilk prompt") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_hit_rate_is_reported_per_mode(tmp_path):
+    cache = PromptStateCache(str(tmp_path))
+    cache.store("site", "p", "durum")
+    cache.lookup("site", "p", "html")
+    cache.lookup("site", "x", "stream")
+    cache.record("revision", False)
+    cache.record("stream", True)
+
+    by_mode = cache.stats()["by_mode"]
+    assert by_mode["html"] == {"hits": 1, "misses": 0, "hit_rate": 1.0}
+    assert by_mode["stream"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    assert by_mode["revision"] == {"hits": 0, "misses": 1, "hit_rate": 0.0}
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_least_recently_used_state_is_evicted(tmp_path):
+    cache = PromptStateCache(str(tmp_path), capacity_bytes=1)
+    cache.store("eski", "p", b"x" * 100)
+    old_path = os.path.join(cache.cache_dir, state_files(cache)[0])
+    os.utime(old_path, (time.time() - 60, time.time() - 60))
+    cache.store("yeni", "p", b"y" * 100)
+
+    # Kapasite aşıldı: son yazılan korunur, en eski kullanılan silinir
+    assert cache.lookup("eski", "p") is None
+    assert cache.lookup("yeni", "p") == b"y" * 100
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 1
+
+
+def test_store_leaves_no_temporary_files(tmp_path):
+    cache = PromptStateCache(str(tmp_path))
+    cache.store("site", "p", "bir")
+    cache.store("site", "p", "iki")  # Aynı dosyanın üzerine atomik olarak yazılır
+
+    assert cache.lookup("site", "p") == "iki"
+    assert not [name for name in os.listdir(cache.cache_dir) if name.endswith(".tmp")]
+    assert len(state_files(cache)) == 1
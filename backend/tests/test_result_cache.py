@@ -0,0 +1,54 @@
+import os
+import time
+
+from result_cache import ResultCache
+
+
+def test_memory_then_disk_hits(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("a", "<html>a</html>")
+    assert cache.get("a") == "<html>a</html>"
+
+    # Yeni bir süreç gibi boş bellekle açılan önbellek sonucu diskten okur ve belleğe alır
+    other = ResultCache(str(tmp_path))
+    assert other.get("a") == "<html>a</html>"
+    assert other.get("a") == "<html>a</html>"
+    assert other.get("yok") is None
+    stats = other.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 2 / 3
+
+
+def test_memory_layer_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), memory_capacity=25)
+    cache.put("a", "a" * 10)
+    cache.put("b", "b" * 10)
+    cache.get("a")  # a en son kullanılan olur
+    cache.put("c", "c" * 10)
+
+    assert list(cache.memory) == ["a", "c"]
+    assert cache.memory_bytes == 20
+    # Bellekten düşen sonuç diskte durur
+    assert cache.get("b") == "b" * 10
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_disk_layer_evicts_oldest_files(tmp_path):
+    cache = ResultCache(str(tmp_path), disk_capacity=1)
+    cache.put("eski", "x" * 1000)
+    old_path = os.path.join(cache.cache_dir, "eski.html.z")
+    os.utime(old_path, (time.time() - 60, time.time() - 60))
+    cache.put("yeni", "y" * 1000)
+
+    assert not os.path.exists(old_path)
+    assert os.path.exists(os.path.join(cache.cache_dir, "yeni.html.z"))
+    assert cache.stats()["disk_entries"] == 1
+
+
+def test_put_leaves_no_temporary_files(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("a", "bir")
+    cache.put("a", "iki")
+
+    assert ResultCache(str(tmp_path)).get("a") == "iki"
+    assert sorted(os.listdir(cache.cache_dir)) == [".lock", "a.html.z"]
@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+import scheduler
+from scheduler import GenerationScheduler, QueueFullError
+
+
+def test_jobs_run_in_priority_order_then_fifo():
+    gen = GenerationScheduler(max_queue=10, workers=1)
+    order = []
+    # Worker başlamadan önce kuyruğa alınan işler öncelik sırasıyla çalışmalı
+    futures = [
+        gen.submit(order.append, "batch", priority=scheduler.PRIORITY_BATCH),
+        gen.submit(order.append, "new-1", priority=scheduler.PRIORITY_NEW_SITE),
+        gen.submit(order.append, "revision", priority=scheduler.PRIORITY_REVISION),
+        gen.submit(order.append, "new-2", priority=scheduler.PRIORITY_NEW_SITE),
+    ]
+    gen.start()
+    for future in futures:
+        future.result(timeout=5)
+    assert order == ["revision", "new-1", "new-2", "batch"]
+    assert gen.stats()["completed"] == 4
+
+
+def test_full_queue_rejects_with_retry_after():
+    gen = GenerationScheduler(max_queue=2, workers=1)
+    gen.submit(lambda: None)
+    gen.submit(lambda: None)
+    with pytest.raises(QueueFullError) as exc_info:
+        gen.submit(lambda: None)
+    assert exc_info.value.retry_after >= 1
+    stats = gen.stats()
+    assert stats["rejected"] == 1
+    assert stats["queue_depth"] == 2
+
+
+def test_running_job_frees_its_queue_slot():
+    gen = GenerationScheduler(max_queue=1, workers=1)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking():
+        started.set()
+        release.wait(5)
+        return "bitti"
+
+    gen.start()
+    first = gen.submit(blocking)
+    assert started.wait(5)
+    # Çalışan iş kuyrukta yer tutmaz, bir iş daha bekleyebilir
+    second = gen.submit(lambda: "ikinci")
+    with pytest.raises(QueueFullError):
+        gen.submit(lambda: None)
+    release.set()
+    assert first.result(timeout=5) == "bitti"
+    assert second.result(timeout=5) == "ikinci"
+
+
+def test_job_exception_is_set_on_future():
+    gen = GenerationScheduler(max_queue=2, workers=1)
+    gen.start()
+
+    def failing():
+        raise ValueError("hata")
+
+    with pytest.raises(ValueError, match="hata"):
+        gen.submit(failing).result(timeout=5)
+    assert gen.stats()["completed"] == 1
+
+
+def test_priority_for_prompt_history():
+    assert scheduler.priority_for(["ilk"]) == scheduler.PRIORITY_NEW_SITE
+    assert scheduler.priority_for(["ilk", "revizyon"]) == scheduler.PRIORITY_REVISION
@@ -0,0 +1,19 @@
+from site_setup import DESIRED_SETTINGS, settings_diff
+
+
+def test_settings_diff_is_empty_when_site_already_matches():
+    current = {**DESIRED_SETTINGS, "name": "blog", "processing_settings": {
+        **DESIRED_SETTINGS["processing_settings"], "skip": False}}
+    assert settings_diff(DESIRED_SETTINGS, current) == {}
+
+
+def test_settings_diff_returns_only_mismatched_nested_fields():
+    desired = {"ssl": True, "processing_settings": {"css": {"bundle": True, "minify": True}, "html": {"pretty_urls": True}}}
+    current = {"ssl": True, "processing_settings": {"css": {"bundle": True, "minify": False}, "html": {"pretty_urls": True}}}
+    assert settings_diff(desired, current) == {"processing_settings": {"css": {"minify": True}}}
+
+
+def test_settings_diff_handles_missing_current_values():
+    desired = {"force_ssl": True, "processing_settings": {"js": {"minify": True}}}
+    assert settings_diff(desired, {"processing_settings": None}) == desired
+    assert settings_diff(desired, None) == desired
@@ -0,0 +1,78 @@
+from token_budget import (REVISION_PREFIX, SUMMARY_PREFIX, TokenCounter, compact_prompts,
+                          completion_budget, merge_superseded)
+
+
+def words(text):
+    """Testlerde tokenizer yerine kelime sayısı kullanılır"""
+    return len(text.split())
+
+
+def test_completion_budget_is_limited_by_remaining_context():
+    assert completion_budget(prompt_tokens=1000, n_ctx=4096, max_tokens=4000, reserve=32) == 3064
+    assert completion_budget(prompt_tokens=100, n_ctx=4096, max_tokens=2000, reserve=32) == 2000
+
+
+def test_completion_budget_never_negative():
+    assert completion_budget(prompt_tokens=5000, n_ctx=4096, max_tokens=4000, reserve=32) == 0
+
+
+def test_compact_prompts_keeps_history_within_budget():
+    prompts = ["blog sitesi", "mavi tema"]
+    compacted, info = compact_prompts(prompts, budget=100, count=words)
+    assert compacted == prompts
+    assert info["tokens"] == info["original_tokens"] == words("blog sitesi") + words(REVISION_PREFIX + "mavi tema")
+    assert info["merged"] == info["summarized"] == info["dropped"] == 0
+
+
+def test_merge_superseded_drops_revisions_extended_later():
+    revisions = ["Mavi tema", "footer ekle", "mavi tema ve koyu yazı tipi", "footer ekle."]
+    assert merge_superseded(revisions) == ["mavi tema ve koyu yazı tipi", "footer ekle."]
+
+
+def test_compact_prompts_merges_superseded_before_summarizing():
+    prompts = ["blog sitesi", "mavi tema", "mavi tema ve koyu yazı tipi"]
+    full = sum(words(p) for p in prompts[:1]) + sum(words(REVISION_PREFIX + p) for p in prompts[1:])
+    compacted, info = compact_prompts(prompts, budget=full - 1, count=words)
+    assert compacted == ["blog sitesi", "mavi tema ve koyu yazı tipi"]
+    assert info["merged"] == 1
+    assert info["summarized"] == 0
+    assert info["tokens"] <= full - 1
+
+
+def test_compact_prompts_summarizes_old_revisions_and_keeps_recent():
+    revisions = [f"bölüm {i} için uzun bir açıklama. Ayrıntılar burada {i}" for i in range(6)]
+    prompts = ["portföy sitesi"] + revisions
+    compacted, info = compact_prompts(prompts, budget=60, count=words, keep_recent=2)
+
+    assert compacted[0] == "portföy sitesi"
+    assert compacted[-2:] == revisions[-2:]
+    assert compacted[1].startswith(SUMMARY_PREFIX)
+    assert "Ayrıntılar" not in compacted[1]  # Özet yalnızca ilk cümleyi tutar
+    assert info["summarized"] == 4
+    assert info["dropped"] == 0
+    assert info["tokens"] <= 60
+
+
+def test_compact_prompts_drops_oldest_summaries_when_still_over_budget():
+    revisions = [f"bölüm {i} için uzun bir açıklama" for i in range(6)]
+    prompts = ["portföy sitesi"] + revisions
+    compacted, info = compact_prompts(prompts, budget=25, count=words, keep_recent=2)
+
+    assert info["dropped"] > 0
+    assert info["summarized"] + info["dropped"] == 4
+    assert info["tokens"] <= 25
+    assert compacted[-2:] == revisions[-2:]
+    if info["summarized"]:
+        assert "bölüm 3" in compacted[1]  # En yeni eski revizyon özette kalır
+
+
+def test_token_counter_estimates_without_tokenizer_and_caches_with_it():
+    counter = TokenCounter(capacity=2)
+    assert counter.count("abcdef") == 3  # byte // 3 + 1
+
+    calls = []
+    counter.tokenize = lambda text: calls.append(text) or text.split()
+    assert counter.count("a b c") == 3
+    assert counter.count("a b c") == 3
+    assert calls == ["a b c"]
+    assert counter.stats()["hits"] == 1
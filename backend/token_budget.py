@@ -0,0 +1,244 @@
+import os
+import re
+import threading
+from collections import OrderedDict, deque
+
+# Token sayısı önbelleğinde tutulacak metin sayısı - prompt geçmişindeki her revizyon
+# bir kez tokenize edilir, sonraki isteklerde sayısı önbellekten gelir
+COUNT_CACHE_SIZE = int(os.environ.get("TOKEN_COUNT_CACHE_SIZE", 4096))
+
+# Sıkıştırmada olduğu gibi korunan en son revizyon sayısı
+KEEP_RECENT_REVISIONS = int(os.environ.get("PROMPT_KEEP_RECENT_REVISIONS", 2))
+
+# Özetlenen eski revizyonların her biri için tutulacak maksimum karakter sayısı
+SUMMARY_CHARS = 120
+
+# Birleştirilmiş prompt'ta revizyonlar ve özet bu ön eklerle yer alır (bkz. generator.combine_prompts)
+REVISION_PREFIX = " Revizyon: "
+SUMMARY_PREFIX = "Önceki revizyonların özeti: "
+
+# Model tokenizer'ı henüz yoksa kullanılan kaba tahmin: token başına byte (ihtiyatlı, düşük tutuldu)
+ESTIMATE_BYTES_PER_TOKEN = 3
+
+
+class TokenCounter:
+    """
+    Model tokenizer'ı ile token sayan ve sonuçları LRU mantığıyla önbelleğe alan sayaç
+
+    tokenize, model yüklendikten sonra atanır (metin -> token listesi). Atanmamışsa
+    byte uzunluğundan ihtiyatlı bir tahmin yapılır ve sonuç önbelleğe alınmaz.
+    """
+
+    def __init__(self, capacity=COUNT_CACHE_SIZE):
+        self.capacity = capacity
+        self.tokenize = None
+        self.counts = OrderedDict()  # metin -> token sayısı
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, text, cache=True):
+        """
+        Metnin token sayısını döndürür
+
+        Args:
+            text (str): Sayılacak metin
+            cache (bool): False ise sonuç önbelleğe alınmaz (tek seferlik büyük metinler için)
+
+        Returns:
+            int: Token sayısı
+        """
+        if not text:
+            return 0
+        if self.tokenize is None:
+            return len(text.encode("utf-8")) // ESTIMATE_BYTES_PER_TOKEN + 1
+        if not cache:
+            return len(self.tokenize(text))
+
+        with self.lock:
+            if text in self.counts:
+                self.counts.move_to_end(text)
+                self.hits += 1
+                return self.counts[text]
+            self.misses += 1
+
+        count = len(self.tokenize(text))
+        with self.lock:
+            self.counts[text] = count
+            while len(self.counts) > self.capacity:
+                self.counts.popitem(last=False)
+        return count
+
+    def stats(self):
+        """
+        Önbellek istatistiklerini döndürür
+
+        Returns:
+            dict: Kayıt sayısı, isabet/ıska sayıları ve isabet oranı
+        """
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.counts),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+def normalize(text):
+    """Revizyonları karşılaştırmak için küçük harf, noktalama ve boşluklardan arındırılmış metin"""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def merge_superseded(revisions):
+    """
+    Sonraki bir revizyon tarafından geçersiz kılınan revizyonları çıkarır
+
+    Bir revizyon, normalize edilmiş hâli daha sonraki bir revizyonla aynıysa
+    veya daha sonraki bir revizyonun başlangıcıysa (örn. "mavi tema" ->
+    "mavi tema ve koyu yazı tipi") sonraki revizyon tarafından kapsanmış sayılır.
+
+    Args:
+        revisions (list[str]): Revizyonlar (eskiden yeniye)
+
+    Returns:
+        list[str]: Kapsanmayan revizyonlar (sıra korunur)
+    """
+    normalized = [normalize(rev) for rev in revisions]
+    kept = []
+    for i, rev in enumerate(revisions):
+        later = normalized[i + 1:]
+        if normalized[i] and any(n == normalized[i] or n.startswith(normalized[i] + " ") for n in later):
+            continue
+        kept.append(rev)
+    return kept
+
+
+def summarize(revision):
+    """
+    Eski bir revizyonu ilk cümlesine, en fazla SUMMARY_CHARS karaktere kısaltır
+
+    Args:
+        revision (str): Revizyon metni
+
+    Returns:
+        str: Kısaltılmış revizyon
+    """
+    text = " ".join(revision.split())
+    sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    if len(sentence) > SUMMARY_CHARS:
+        sentence = sentence[:SUMMARY_CHARS].rsplit(" ", 1)[0] + "…"
+    return sentence.rstrip(".")
+
+
+def compact_prompts(prompts, budget, count, keep_recent=KEEP_RECENT_REVISIONS):
+    """
+    Prompt geçmişini token bütçesine sığacak şekilde sıkıştırır
+
+    İlk prompt (temel istek) ve son keep_recent revizyon her zaman olduğu gibi
+    korunur. Geçmiş bütçeyi aşıyorsa sırayla:
+
+    1. Sonraki revizyonlarca kapsanan revizyonlar çıkarılır (merge_superseded)
+    2. Eski revizyonlar tek bir "özet" revizyonunda kısaltılarak birleştirilir
+    3. Hâlâ sığmıyorsa özetten en eski revizyonlar atılır
+
+    Token sayısı parça parça hesaplanır; böylece her revizyon TokenCounter
+    önbelleği sayesinde yalnızca bir kez tokenize edilir.
+
+    Args:
+        prompts (list[str]): Kullanıcı promptları listesi
+        budget (int): Birleştirilmiş prompt için izin verilen token sayısı
+        count (callable): Metnin token sayısını döndüren fonksiyon
+        keep_recent (int): Olduğu gibi korunacak son revizyon sayısı
+
+    Returns:
+        tuple: (sıkıştırılmış prompt listesi, sıkıştırma bilgisi (dict))
+    """
+    def cost(candidate):
+        return count(candidate[0]) + sum(count(REVISION_PREFIX + rev) for rev in candidate[1:])
+
+    info = {"original_tokens": cost(prompts), "merged": 0, "summarized": 0, "dropped": 0}
+    info["tokens"] = info["original_tokens"]
+    if info["tokens"] <= budget or len(prompts) < 2:
+        return list(prompts), info
+
+    base, revisions = prompts[0], merge_superseded(prompts[1:])
+    info["merged"] = len(prompts) - 1 - len(revisions)
+    candidate = [base] + revisions
+
+    if cost(candidate) > budget:
+        recent = revisions[-keep_recent:] if keep_recent else []
+        old = [summarize(rev) for rev in revisions[:len(revisions) - len(recent)]]
+        while True:
+            candidate = [base] + ([SUMMARY_PREFIX + "; ".join(old)] if old else []) + recent
+            if cost(candidate) <= budget or not old:
+                break
+            # Özet bütçeyi aşıyorsa en eski revizyonlardan başlayarak atılır
+            old = old[1:]
+            info["dropped"] += 1
+        info["summarized"] = len(old)
+
+    info["tokens"] = cost(candidate)
+    return candidate, info
+
+
+def completion_budget(prompt_tokens, n_ctx, max_tokens, reserve):
+    """
+    Context'te kalan yere göre üretilecek maksimum token sayısını hesaplar
+
+    Args:
+        prompt_tokens (int): Prompt'un token sayısı
+        n_ctx (int): Modelin context boyutu
+        max_tokens (int): İzin verilen üst sınır
+        reserve (int): Chat şablonu gibi prompt dışı token'lar için ayrılan pay
+
+    Returns:
+        int: max_tokens değeri (context dolmuşsa 0)
+    """
+    return max(0, min(max_tokens, n_ctx - prompt_tokens - reserve))
+
+
+class UsageStats:
+    """
+    İstek bazında prompt ve completion token sayılarını toplayan istatistik
+
+    Model worker süreçlerinden gelen kayıtlar API sürecinde burada birleştirilir.
+    """
+
+    def __init__(self, recent=50):
+        self.lock = threading.Lock()
+        self.totals = {"requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "compactions": 0}
+        self.by_kind = {}
+        self.recent = deque(maxlen=recent)
+
+    def record(self, records):
+        """
+        İstek kayıtlarını istatistiğe ekler
+
+        Args:
+            records (list[dict]): kind, prompt_tokens, completion_tokens, max_tokens, compacted alanlı kayıtlar
+        """
+        with self.lock:
+            for record in records:
+                for stats in (self.totals, self.by_kind.setdefault(record["kind"], {
+                        "requests": 0, "prompt_tokens": 0, "completion_tokens": 0, "compactions": 0})):
+                    stats["requests"] += 1
+                    stats["prompt_tokens"] += record["prompt_tokens"]
+                    stats["completion_tokens"] += record["completion_tokens"]
+                    stats["compactions"] += int(record["compacted"])
+                self.recent.append(record)
+
+    def report(self):
+        """
+        İstatistikleri döndürür
+
+        Returns:
+            dict: Toplamlar, istek türüne göre toplamlar ve son istekler
+        """
+        with self.lock:
+            return {
+                "totals": dict(self.totals),
+                "by_kind": {kind: dict(stats) for kind, stats in self.by_kind.items()},
+                "recent": list(self.recent),
+            }
@@ -0,0 +1,486 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import traceback
+
+from token_budget import UsageStats
+
+# Model worker süreci sayısı:
+# - "0": Model API sürecinde yüklenir (havuz kapalı)
+# - "auto": Çekirdek sayısı ve kullanılabilir RAM'e göre hesaplanır
+# - N: N adet worker süreci başlatılır
+MODEL_WORKERS_SETTING = os.environ.get("MODEL_WORKERS", "0")
+
+# Worker başına model ağırlıkları dışında ayrılacak bellek (KV-cache, tamponlar vb.)
+WORKER_OVERHEAD_BYTES = int(os.environ.get("MODEL_WORKER_OVERHEAD_BYTES", 1024 ** 3))
+
+# Sisteme (işletim sistemi, API süreci vb.) bırakılacak bellek
+RESERVED_RAM_BYTES = int(os.environ.get("MODEL_RESERVED_RAM_BYTES", 2 * 1024 ** 3))
+
+
+class WorkerCrashedError(Exception):
+    """Worker süreci bir işi işlerken beklenmedik şekilde sonlandığında fırlatılır"""
+
+
+def total_ram_bytes():
+    """
+    Sistemdeki toplam fiziksel belleği döndürür
+
+    Returns:
+        int or None: Byte cinsinden toplam RAM (hesaplanamazsa None)
+    """
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def auto_worker_count(model_path):
+    """
+    Çekirdek sayısı ve RAM'e göre worker sayısını hesaplar
+
+    Her worker modelin tamamını ve WORKER_OVERHEAD_BYTES kadar ek belleği
+    kullanıyormuş gibi (ihtiyatlı olarak) hesaplanır.
+
+    Args:
+        model_path (str): GGUF model dosyasının yolu
+
+    Returns:
+        int: Önerilen worker sayısı (en az 1)
+    """
+    cpus = os.cpu_count() or 1
+    ram = total_ram_bytes()
+    try:
+        model_bytes = os.path.getsize(model_path)
+    except OSError:
+        model_bytes = 0
+    if not ram or not model_bytes:
+        return 1
+    by_ram = (ram - RESERVED_RAM_BYTES) // (model_bytes + WORKER_OVERHEAD_BYTES)
+    # Worker başına en az 2 thread kalsın
+    return max(1, min(cpus // 2 or 1, int(by_ram)))
+
+
+def worker_main(index, n_threads, conn):
+    """
+    Worker sürecinin ana döngüsü
+
+    Süreç kendi Llama örneğini yükler, ardından bağlantıdan gelen
+    (metot_adı, kwargs) isteklerini generator modülünde çalıştırır.
+    Metot bir iterator döndürürse her eleman ("event", ...) mesajı olarak
+    gönderilir. İş bitince token kayıtları ("usage", ...) ve önbellek
+    istatistikleri ("stats", ...), ardından sonuç ("result", ...) veya hata
+    ("error", ...) gönderilir. API süreci bağlantıyı kapatınca bu sürecin
+    başlattığı llama-server (varsa) sonlandırılır ve süreç çıkar.
+
+    Args:
+        index (int): Worker numarası
+        n_threads (int): Modelin kullanacağı CPU thread sayısı
+        conn (multiprocessing.connection.Connection): API süreciyle bağlantı
+    """
+    import generator
+    generator.load_model(n_threads=n_threads)
+    conn.send(("ready", generator.readiness()))
+
+    while True:
+        try:
+            method, kwargs = conn.recv()
+        except (EOFError, OSError):
+            break  # API süreci kapandı
+        try:
+            result = getattr(generator, method)(**kwargs)
+            if hasattr(result, "__next__"):
+                for event in result:
+                    conn.send(("event", event))
+                result = None
+            conn.send(("usage", generator.drain_usage()))
+            conn.send(("stats", generator.process_stats()))
+            conn.send(("result", result))
+        except Exception as e:
+            conn.send(("usage", generator.drain_usage()))
+            conn.send(("stats", generator.process_stats()))
+            conn.send(("error", (f"{type(e).__name__}: {e}", traceback.format_exc())))
+    generator.fallback_server.stop_process()
+
+
+class ModelWorker:
+    """Tek bir worker sürecini ve API tarafındaki bağlantısını temsil eder"""
+
+    def __init__(self, ctx, index, n_threads):
+        self.ctx = ctx
+        self.index = index
+        self.n_threads = n_threads
+        self.process = None
+        self.conn = None
+        self.restarts = 0
+        self.jobs = 0
+        self.readiness = None  # Worker'ın son bildirdiği model yükleme durumu
+        self.stats = None      # Worker'ın son işten sonra bildirdiği önbellek istatistikleri
+        self.lock = threading.Lock()  # İş sırasında tutulur, izleme thread'i meşgul worker'a dokunmaz
+
+    def start(self):
+        """Worker sürecini başlatır"""
+        parent_conn, child_conn = self.ctx.Pipe()
+        self.process = self.ctx.Process(
+            target=worker_main,
+            args=(self.index, self.n_threads, child_conn),
+            name=f"model-worker-{self.index}",
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+
+    def restart(self):
+        """Çökmüş veya yanıt vermeyen worker sürecini yeniden başlatır"""
+        print(f"⚠️ Model worker {self.index} yeniden başlatılıyor...")
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.restarts += 1
+        self.start()
+
+    def recv(self):
+        """
+        Worker'dan bir mesaj bekler, süreç ölürse WorkerCrashedError fırlatır
+
+        Returns:
+            tuple: (mesaj_tipi, veri)
+        """
+        try:
+            while not self.conn.poll(1.0):
+                if not self.process.is_alive():
+                    raise WorkerCrashedError(f"Model worker {self.index} çöktü (exit code: {self.process.exitcode})")
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise WorkerCrashedError(f"Model worker {self.index} bağlantısı koptu: {e}")
+
+
+class ModelWorkerPool:
+    """
+    Her biri kendi Llama örneğini yükleyen N worker sürecinden oluşan havuz
+
+    Çekirdekler worker'lar arasında paylaştırılır (n_threads = çekirdek / N).
+    call() boşta olan ilk worker'a işi yönlendirir; boşta worker yoksa biri
+    boşalana kadar bekler. Bir worker iş sırasında çökerse yeniden başlatılır
+    ve iş WorkerCrashedError ile sonlanır. Arka plandaki izleme thread'i boşta
+    bekleyen worker'ların da canlı olduğunu kontrol eder.
+
+    Worker'lar modeli yükleyip warm-up çıkarımını bitirene kadar boştaki
+    worker kuyruğuna alınmaz; bu sürede gelen işler yüklemenin bitmesini bekler.
+    """
+
+    def __init__(self, size, n_threads=None):
+        self.size = size
+        self.n_threads = n_threads or max(1, (os.cpu_count() or 1) // size)
+        self.ctx = multiprocessing.get_context("spawn")
+        self.workers = [ModelWorker(self.ctx, i, self.n_threads) for i in range(size)]
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.busy = 0
+        self.crashes = 0
+        self.stopping = False  # stop() çağrıldıysa worker'lar yeniden başlatılmaz
+
+    def start(self):
+        """Tüm worker süreçlerini başlatır ve izleme thread'ini çalıştırır"""
+        print(f"{self.size} model worker başlatılıyor ({self.n_threads} thread/worker)...")
+        for worker in self.workers:
+            self._launch(worker)
+        threading.Thread(target=self._monitor, name="model-worker-monitor", daemon=True).start()
+
+    def _launch(self, worker, restart=False):
+        """
+        Worker'ı arka planda başlatır, model yüklenince boştaki worker kuyruğuna ekler
+
+        Args:
+            worker (ModelWorker): Başlatılacak worker
+            restart (bool): True ise çalışan süreç önce sonlandırılır
+        """
+        def run():
+            with worker.lock:
+                worker.readiness = None
+                if restart:
+                    worker.restart()
+                else:
+                    worker.start()
+                try:
+                    kind, payload = worker.recv()
+                except WorkerCrashedError as e:
+                    if self.stopping:
+                        return
+                    print(f"Model worker {worker.index} yüklenirken çöktü: {e}")
+                    with self.lock:
+                        self.crashes += 1
+                    time.sleep(5)  # Sürekli çöken bir worker'ı hızlı döngüde başlatmamak için
+                    self._launch(worker, restart=True)
+                    return
+                if kind == "ready":
+                    worker.readiness = payload
+            self.idle.put(worker)
+
+        threading.Thread(target=run, name=f"model-worker-launch-{worker.index}", daemon=True).start()
+
+    def stop(self, timeout=10):
+        """
+        Worker süreçlerini kapatır
+
+        Bağlantılar kapatılınca worker'lar döngüden çıkar ve başlattıkları
+        llama-server'ı sonlandırır; süre içinde çıkmayan worker'lar öldürülür.
+
+        Args:
+            timeout (float): Worker başına çıkış için beklenecek en fazla süre (saniye)
+        """
+        self.stopping = True
+        for worker in self.workers:
+            if worker.conn is not None:
+                worker.conn.close()
+        for worker in self.workers:
+            if worker.process is None:
+                continue
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.kill()
+
+    def _monitor(self):
+        while not self.stopping:
+            time.sleep(5)
+            for worker in self.workers:
+                if self.stopping:
+                    break
+                # Meşgul worker'lar call() içinde izlenir
+                if not worker.lock.acquire(blocking=False):
+                    continue
+                try:
+                    if worker.process is not None and not worker.process.is_alive():
+                        with self.lock:
+                            self.crashes += 1
+                        worker.readiness = None
+                        worker.restart()
+                finally:
+                    worker.lock.release()
+
+    def call(self, method, kwargs, on_event=None):
+        """
+        generator modülündeki bir metodu boştaki bir worker'da çalıştırır
+
+        Args:
+            method (str): generator modülündeki fonksiyon adı
+            kwargs (dict): Fonksiyon argümanları
+            on_event (callable, optional): Iterator döndüren metotlarda her olay için çağrılır
+
+        Returns:
+            Fonksiyonun sonucu (iterator metotlarda None)
+
+        Raises:
+            WorkerCrashedError: Worker iş sırasında çökerse
+            RuntimeError: Fonksiyon worker içinde hata fırlatırsa
+        """
+        worker = self.idle.get()
+        worker.lock.acquire()
+        crashed = False
+        with self.lock:
+            self.busy += 1
+        try:
+            worker.conn.send((method, kwargs))
+            worker.jobs += 1
+            while True:
+                kind, payload = worker.recv()
+                if kind == "ready":
+                    worker.readiness = payload  # İzleme thread'inin yeniden başlattığı worker
+                elif kind == "event":
+                    if on_event:
+                        on_event(payload)
+                elif kind == "usage":
+                    usage.record(payload)
+                elif kind == "stats":
+                    worker.stats = payload
+                elif kind == "result":
+                    return payload
+                elif kind == "error":
+                    message, tb = payload
+                    print(tb)
+                    raise RuntimeError(message)
+        except WorkerCrashedError:
+            crashed = True
+            with self.lock:
+                self.crashes += 1
+            raise
+        finally:
+            with self.lock:
+                self.busy -= 1
+            worker.lock.release()
+            if crashed and not self.stopping:
+                # Yeniden başlatılan worker model yüklenince kuyruğa geri döner
+                self._launch(worker, restart=True)
+            else:
+                self.idle.put(worker)
+
+    def readiness(self):
+        """
+        Havuzdaki worker'ların model yükleme durumunu döndürür
+
+        Returns:
+            dict: Tüm worker'lar warm-up'ı bitirdiyse ready=True ve worker bazında durumlar
+        """
+        states = [w.readiness for w in self.workers]
+        return {
+            "ready": all(state and state["ready"] for state in states),
+            "workers": states,
+        }
+
+    def stats(self):
+        """
+        Havuz istatistiklerini döndürür
+
+        Returns:
+            dict: Worker sayısı, meşgul worker'lar, çökme ve yeniden başlatma sayıları
+        """
+        with self.lock:
+            return {
+                "workers": self.size,
+                "threads_per_worker": self.n_threads,
+                "busy": self.busy,
+                "crashes": self.crashes,
+                "restarts": sum(w.restarts for w in self.workers),
+                "jobs": [w.jobs for w in self.workers],
+            }
+
+
+# API sürecindeki havuz örneği - MODEL_WORKERS "0" ise None kalır
+pool = None
+
+# Tüm worker'lardan (veya havuz kapalıyken bu süreçten) toplanan token kullanımı
+usage = UsageStats()
+
+# Tüm süreçlerin paylaştığı önbellek klasörlerini ölçen alanlar - süreçler arasında toplanmaz
+SHARED_STAT_FIELDS = {"entries", "bytes", "capacity_bytes", "disk_entries", "disk_bytes"}
+
+
+def merge_stats(snapshots):
+    """
+    Süreçlerin istatistik özetlerini birleştirir
+
+    Sayaçlar toplanır, paylaşılan klasörleri ölçen alanlarda en büyük değer alınır
+    ve isabet oranı toplanan sayaçlardan yeniden hesaplanır. İç içe sözlükler
+    aynı şekilde birleştirilir.
+
+    Args:
+        snapshots (list[dict]): Süreç bazında istatistikler
+
+    Returns:
+        dict: Birleştirilmiş istatistikler
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for key, value in snapshot.items():
+            if isinstance(value, dict):
+                merged[key] = merge_stats([merged.get(key, {}), value])
+            elif key in SHARED_STAT_FIELDS:
+                merged[key] = max(merged.get(key, 0), value)
+            elif isinstance(value, (int, float)) and not key.endswith("rate"):
+                merged[key] = merged.get(key, 0) + value
+    if "misses" in merged:
+        hits = merged.get("hits", merged.get("memory_hits", 0) + merged.get("disk_hits", 0))
+        lookups = hits + merged["misses"]
+        merged["hit_rate"] = hits / lookups if lookups else 0.0
+    return merged
+
+
+def process_stats():
+    """
+    Modeli çalıştıran süreçlerin önbellek istatistiklerini birleştirir
+
+    Havuz açıksa worker'ların her işten sonra gönderdiği son özetler, kapalıysa bu
+    sürecin istatistikleri kullanılır. Henüz iş almamış worker'lar sayılmaz;
+    yeniden başlatılan bir worker'ın sayaçları sıfırdan başlar.
+
+    Returns:
+        dict: generator.process_stats alanlarının birleşimi ve özeti bulunan süreç sayısı (processes)
+    """
+    if pool is not None:
+        snapshots = [worker.stats for worker in pool.workers if worker.stats]
+    else:
+        import generator
+        snapshots = [generator.process_stats()]
+    return {**merge_stats(snapshots), "processes": len(snapshots)}
+
+
+def worker_count():
+    """
+    Ayarlara göre kullanılacak worker sayısını döndürür
+
+    Returns:
+        int: Worker sayısı (0 ise havuz kapalı)
+    """
+    if MODEL_WORKERS_SETTING == "auto":
+        import generator
+        return auto_worker_count(generator.MODEL_PATH)
+    return int(MODEL_WORKERS_SETTING)
+
+
+def start_pool():
+    """
+    Ayarlara göre worker havuzunu başlatır
+
+    Returns:
+        ModelWorkerPool or None: Başlatılan havuz, havuz kapalıysa None
+    """
+    global pool
+    size = worker_count()
+    if size > 0 and pool is None:
+        pool = ModelWorkerPool(size)
+        pool.start()
+    return pool
+
+
+def stop_pool():
+    """Worker havuzu açıksa worker süreçlerini (ve başlattıkları llama-server'ı) kapatır"""
+    if pool is not None:
+        pool.stop()
+
+
+def readiness():
+    """
+    Modelin (havuz açıksa tüm worker'ların) hazır olma durumunu döndürür
+
+    Returns:
+        dict: ready alanı ve yükleme ayrıntıları
+    """
+    if pool is not None:
+        return pool.readiness()
+    import generator
+    return generator.readiness()
+
+
+def run_generator(method, kwargs, on_event=None):
+    """
+    generator modülündeki bir metodu havuz açıksa bir worker'da, değilse bu süreçte çalıştırır
+
+    Args:
+        method (str): generator modülündeki fonksiyon adı
+        kwargs (dict): Fonksiyon argümanları
+        on_event (callable, optional): Iterator döndüren metotlarda her olay için çağrılır
+
+    Returns:
+        Fonksiyonun sonucu (iterator metotlarda None)
+    """
+    if pool is not None:
+        return pool.call(method, kwargs, on_event)
+
+    import generator
+    try:
+        result = getattr(generator, method)(**kwargs)
+        if hasattr(result, "__next__"):
+            for event in result:
+                if on_event:
+                    on_event(event)
+            return None
+        return result
+    finally:
+        usage.record(generator.drain_usage())
@@ -3,6 +3,7 @@ import requests
 import datetime
 import json
 import re
+import time
 
 # Backend API'sine bağlantı URL'si - geliştirme ortamında localhost kullanılıyor
 BACKEND_URL = "http://localhost:8000"
@@ -25,6 +26,8 @@ if 'history' not in st.session_state:
     st.session_state.history = ""     # İşlem geçmişi logu
 if 'prompts' not in st.session_state:
     st.session_state.prompts = []     # Kullanıcının girdiği prompt'lar
+if 'deploy_id' not in st.session_state:
+    st.session_state.deploy_id = ""   # Son deploy'un ID'si - önizleme bu sürüm için yenilenir
 if 'setup_stage' not in st.session_state:
     # Site kurulum aşaması: initial (başlangıç), domain_verification (domain doğrulama), 
     # ssl_setup (SSL kurulumu), completed (tamamlandı)
@@ -165,6 +168,35 @@ def setup_ssl():
     except Exception as e:
         return False, f"SSL kurulum hatası: {str(e)}"
 
+# Deploy'un yayına girmesini bekleme fonksiyonu
+def wait_for_deploy(deploy_id, timeout=180):
+    """
+    Deploy Netlify'da işlenip yayına girene kadar bekler
+
+    Backend'in /api/deploys/{id} endpoint'i long polling ile sorgulanır;
+    böylece önizleme eski sürümü göstermez.
+
+    Args:
+        deploy_id (str): Netlify deploy ID'si
+        timeout (float): Maksimum bekleme süresi (saniye)
+
+    Returns:
+        dict or None: Deploy durumu ve süreleri, alınamazsa None
+    """
+    deadline = time.time() + timeout
+    info = None
+    while time.time() < deadline:
+        try:
+            response = requests.get(f"{BACKEND_URL}/api/deploys/{deploy_id}", params={"wait": 25}, timeout=35)
+        except Exception:
+            return info
+        if response.status_code != 200:
+            return info
+        info = response.json()
+        if info["state"] not in ("new", "uploading", "uploaded", "preparing", "prepared", "processing", "processed"):
+            return info
+    return info
+
 # Adım göstergesi - kurulum aşamasını görsel olarak gösterir
 def show_progress_steps():
     """
@@ -401,6 +433,16 @@ with st.container():
                             data = response.json()
                             
                             if data["status"] == "ok":
+                                # Yeni sürüm yayına girmeden önizleme gösterilmez (eski sürüm görünmesin)
+                                if data.get("deploy_id"):
+                                    with st.spinner("Yeni sürüm yayına alınıyor..."):
+                                        deploy_info = wait_for_deploy(data["deploy_id"])
+                                    if deploy_info and deploy_info["state"] == "ready":
+                                        st.caption(f"Yayına girme süresi: {deploy_info['timings']['ready']:.1f} sn")
+                                    else:
+                                        st.warning("Yeni sürüm henüz yayında olmayabilir, önizleme birazdan güncellenecek.")
+                                    st.session_state.deploy_id = data["deploy_id"]
+
                                 # Başarılı yanıt - site URL ve bilgilerini güncelle
                                 st.session_state.deploy_url = data["deploy_url"]
                                 # Site ID'sini de kaydet (domain ve SSL kurulumu için gerekli)
@@ -435,6 +477,7 @@ with st.container():
                     st.session_state.site_name = ""
                     st.session_state.site_id = ""
                     st.session_state.prompts = []
+                    st.session_state.deploy_id = ""
                     st.session_state.setup_stage = "initial"
                     
                     # Backend session'ı da sıfırla
@@ -466,8 +509,11 @@ with st.container():
             # Site önizleme - eğer bir URL varsa iframe içinde göster
             if st.session_state.deploy_url:
                 st.subheader("Site Önizleme")
-                # iframe kullanarak site önizlemesini göster
-                st.components.v1.iframe(st.session_state.deploy_url, height=500)
+                # iframe kullanarak site önizlemesini göster - deploy ID'si tarayıcı önbelleğindeki eski sürümü atlatır
+                preview_url = st.session_state.deploy_url
+                if st.session_state.deploy_id:
+                    preview_url += f"?v={st.session_state.deploy_id}"
+                st.components.v1.iframe(preview_url, height=500)
                 
                 # URL'yi göster
                 st.success(f"Site URL: {st.session_state.deploy_url}")